@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+""" Benchmarks
+
+Performance benchmarks for the check execution path. The suite follows the layout of airspeed velocity (asv):
+
+- Every module bench_*.py contains benchmark classes
+- Methods starting with time_ are timed
+- setup and teardown are called around every measurement and are not timed
+- The class attributes params and param_names define the parameter combinations a benchmark is executed with
+
+No ABAP system is required. Table reads are served through the RFC replay transport from recordings of a synthetic
+system, see systemcheck.systems.ABAP.utils.rfc_recording.
+
+The suite is executed through the runner, which writes a JSON report that can be used as baseline for later runs::
+
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --compare baseline.json
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+""" Export and Import of the Checks Tree
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+import os
+import shutil
+import tempfile
+
+from systemcheck.checks.models import Check
+from systemcheck.checks.utils import exportChecks, importChecks
+from systemcheck.models.meta import Base
+from systemcheck.models.meta.base import engine_from_config, scoped_session, sessionmaker
+from systemcheck.systems.ABAP.models import ActionAbapFolder, ActionAbapCountTableEntries, \
+    ActionAbapCountTableEntries__params
+from systemcheck.utils import get_or_create
+
+
+#: Number of checks per folder of the synthetic checks tree
+CHECKS_PER_FOLDER = 50
+
+
+def create_session(filename:str):
+    """ A session for a new database """
+
+    engine = engine_from_config({'sqlalchemy.url': 'sqlite:///{}'.format(filename)})
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    get_or_create(session, Check, parent_id=None, name='RootNode')
+    session.commit()
+    return session
+
+
+def populate_checks(session, count:int):
+    """ Create count checks with two parameter sets each, CHECKS_PER_FOLDER checks per folder """
+
+    rootnode = session.query(Check).filter_by(parent_id=None).one()
+    folder = None
+    for counter in range(count):
+        if counter % CHECKS_PER_FOLDER == 0:
+            folder = ActionAbapFolder(name='Folder {:04d}'.format(counter // CHECKS_PER_FOLDER), parent_node=rootnode)
+
+        check = ActionAbapCountTableEntries(name='Check {:05d}'.format(counter),
+                                            description='Synthetic check {}'.format(counter))
+        for client in ('001', '066'):
+            check.params.append(ActionAbapCountTableEntries__params(param_set_name='Client {}'.format(client),
+                                                                    table_name='T000',
+                                                                    table_fields='MANDT',
+                                                                    expected_count=0,
+                                                                    operator='NE',
+                                                                    where_clause="MANDT EQ '{}'".format(client)))
+        folder.children.append(check)
+    session.commit()
+
+
+class ChecksTree:
+    """ Database with a synthetic checks tree and an export folder """
+
+    params = [[100, 1000]]
+    quick_params = [[100]]
+    param_names = ['checks']
+
+    def setup(self, count):
+        self.directory = tempfile.mkdtemp()
+        self.folder = os.path.join(self.directory, 'dump')
+        os.makedirs(self.folder)
+        self.session = create_session(os.path.join(self.directory, 'checks.sqlite'))
+        populate_checks(self.session, count)
+
+    def teardown(self, count):
+        self.session.remove()
+        self.session.bind.dispose()
+        shutil.rmtree(self.directory)
+
+
+class ExportChecks(ChecksTree):
+    """ Export of all checks to individual yaml files """
+
+    def time_exportChecks(self, count):
+        result = exportChecks(folder=self.folder, session=self.session)
+        if result.fail:
+            raise RuntimeError(result.message)
+
+
+class ImportChecks(ChecksTree):
+    """ Import of exported checks into an empty checks tree """
+
+    def setup(self, count):
+        super().setup(count)
+        exportChecks(folder=self.folder, session=self.session)
+        self.target = create_session(os.path.join(self.directory, 'import.sqlite'))
+
+    def teardown(self, count):
+        self.target.remove()
+        self.target.bind.dispose()
+        super().teardown(count)
+
+    def time_importChecks(self, count):
+        result = importChecks(path=self.folder, session=self.target)
+        if result.fail or result.data['failed']:
+            raise RuntimeError(result.message)
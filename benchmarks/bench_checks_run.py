@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+""" End to End Execution of Checks against a Fleet of Systems
+
+The checks are started through on_checksRun of the ABAP main widget. The widget's user interface isn't built, the
+checked systems and checks are provided directly. The systems are served by the RFC replay transport from recordings
+of synthetic systems, the results are inserted into a result tree model like in the application.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from contextlib import ExitStack
+import logging
+import shutil
+import tempfile
+
+from PyQt5 import QtCore, QtWidgets
+
+from systemcheck.results import ResultHandler
+from systemcheck.systems.ABAP.models import SystemAbap, SystemAbapClient, ActionAbapCountTableEntries, \
+    ActionAbapCountTableEntries__params
+from systemcheck.systems.ABAP.plugins.system.system_abap_plugin import AbapMainWidget
+
+from benchmarks.common import SyntheticSystem, config_override, qt_application, record_session, use_memory_keyring
+
+
+#: Tables read by the synthetic checks and their number of records
+TABLES = {'T000': 3, 'USR02': 500, 'AGR_USERS': 2000}
+
+
+class FleetMainWidget(AbapMainWidget):
+    """ AbapMainWidget without user interface that runs the specified checks against the specified systems """
+
+    def __init__(self, systems:set, checks:set):
+        QtWidgets.QWidget.__init__(self)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.systemType = 'ABAP'
+        self.initializePluginManager()
+        self.results = ResultHandler()
+        self.executionEngine = None
+        self._systems = systems
+        self._checks = checks
+
+    def checkedSystems(self)->set:
+        return self._systems
+
+    def checkedChecks(self)->set:
+        return self._checks
+
+
+def synthetic_fleet(count:int)->set:
+    """ count ABAP systems with the clients 000 and 100 """
+
+    clients = set()
+    for counter in range(count):
+        system = SystemAbap(sid='S{:02d}'.format(counter), name='S{:02d}'.format(counter), tier='Dev', rail='N',
+                            enabled=True, use_snc=False, default_client='100',
+                            as_hostname='s{:02d}.fleet{}.benchmark'.format(counter, count), as_sysnr='00')
+        for client in ('000', '100'):
+            systemClient = SystemAbapClient(client=client, username='BENCHMARK', password='benchmark', use_sso=False)
+            system.children.append(systemClient)
+            clients.add(systemClient)
+    return clients
+
+
+def synthetic_checks(count:int)->set:
+    """ count table count checks, every second one client specific """
+
+    checks = set()
+    tables = list(TABLES)
+    for counter in range(count):
+        check = ActionAbapCountTableEntries(name='Check {:03d}'.format(counter), description='Synthetic check')
+        check.type = 'ActionAbapCountTableEntries'
+        check.client_specific = counter % 2 == 0
+        for table in tables:
+            check.params.append(ActionAbapCountTableEntries__params(param_set_name=table, table_name=table,
+                                                                    expected_count=0, operator='GE'))
+        checks.add(check)
+    return checks
+
+
+def record_fleet(directory:str, systems:set):
+    """ Record the table counts of the synthetic checks for every system """
+
+    def countTables(connection):
+        for table in TABLES:
+            connection.count_table(table)
+
+    for system in systems:
+        record_session(directory, system.logon_info(), SyntheticSystem(max(TABLES.values())), countTables)
+
+
+class ChecksRun:
+    """ on_checksRun for a fleet of systems, sequential and on the thread pool
+
+    The shared connection pool is kept between the measurements like between two runs in the application. Only the
+    first measurement of a fleet establishes the connections.
+    """
+
+    params = [[10, 50], [False, True]]
+    quick_params = [[10], [False, True]]
+    param_names = ['systems', 'multithreading']
+
+    #: Number of checks that are executed
+    checks = 10
+
+    def setup(self, systems, multithreading):
+        self.app = qt_application()
+        use_memory_keyring()
+
+        self.directory = tempfile.mkdtemp()
+        self.systems = synthetic_fleet(systems)
+        record_fleet(self.directory, self.systems)
+
+        self.config = ExitStack()
+        self.config.enter_context(config_override('systemtype_ABAP', {'rfc.mode': 'replay',
+                                                                      'rfc.recording_path': self.directory}))
+        self.config.enter_context(config_override('application', {'app.multithreading': multithreading}))
+
+        self.widget = FleetMainWidget(self.systems, synthetic_checks(self.checks))
+        self.model = self.widget.results.buildTreeModel()
+        self.expected = len(self.widget.buildTaskList(self.widget.checkedSystems(), self.widget.checkedChecks()))
+
+        self.received = []
+        self.widget.results.resultAdded_signal.connect(self.received.append)
+
+    def teardown(self, systems, multithreading):
+        if self.widget.executionEngine is not None:
+            self.widget.executionEngine.shutdown()
+        self.config.close()
+        shutil.rmtree(self.directory)
+
+    def time_on_checksRun(self, systems, multithreading):
+        self.widget.on_checksRun()
+
+        engine = self.widget.executionEngine
+        if engine is not None and engine.isRunning():
+            loop = QtCore.QEventLoop()
+            engine.finished.connect(loop.quit)
+            loop.exec_()
+        self.widget.results.flush()
+
+        errors = [result.errorMessage for result in self.received if result.rating == 'error']
+        if len(self.received) != self.expected or errors:
+            raise RuntimeError('{} of {} checks completed, errors: {}'.format(len(self.received), self.expected,
+                                                                              errors[:3]))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+""" Table Downloads through RFC_READ_TABLE
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from functools import lru_cache
+import shutil
+import tempfile
+
+from systemcheck.systems.ABAP.utils import Connection, ReplayConnection, load_recording
+
+from benchmarks.common import SyntheticSystem, record_session
+
+
+TABLE = 'USR02'
+LOGON_INFO = dict(ashost='benchmark', sysnr='00', client='000', user='BENCHMARK')
+
+
+@lru_cache(maxsize=1)
+def table_recording(rows:int)->list:
+    """ The recorded calls of a download of a table with the specified number of rows """
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = record_session(directory, LOGON_INFO, SyntheticSystem(rows),
+                                  lambda connection: connection.download_table(TABLE))
+        return load_recording(filename)
+    finally:
+        shutil.rmtree(directory)
+
+
+@lru_cache(maxsize=1)
+def count_recording(rows:int)->list:
+    """ The recorded calls of counting a table with the specified number of rows """
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = record_session(directory, LOGON_INFO, SyntheticSystem(rows),
+                                  lambda connection: connection.count_table(TABLE))
+        return load_recording(filename)
+    finally:
+        shutil.rmtree(directory)
+
+
+class DownloadTable:
+    """ Connection.download_table with the default page size of 1000 records """
+
+    params = [[10000, 100000, 1000000], [False, True]]
+    quick_params = [[10000], [False, True]]
+    param_names = ['rows', 'columnar']
+
+    def setup(self, rows, columnar):
+        self.connection = Connection()
+        self.connection.logon(LOGON_INFO, mock=True)
+        self.connection.conn = ReplayConnection(table_recording(rows))
+
+    def teardown(self, rows, columnar):
+        self.connection.conn.close()
+
+    def time_download_table(self, rows, columnar):
+        result = self.connection.download_table(TABLE, columnar=columnar)
+        if result.fail or len(result.data['data']) != rows:
+            raise RuntimeError('download of {} failed: {}'.format(TABLE, result.message))
+
+
+class CountTable:
+    """ Connection.count_table, which only transfers the narrowest field """
+
+    params = [[10000, 100000, 1000000]]
+    quick_params = [[10000]]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        self.connection = Connection()
+        self.connection.logon(LOGON_INFO, mock=True)
+        self.connection.conn = ReplayConnection(count_recording(rows))
+
+    def teardown(self, rows):
+        self.connection.conn.close()
+
+    def time_count_table(self, rows):
+        result = self.connection.count_table(TABLE)
+        if result.fail or result.data != rows:
+            raise RuntimeError('counting {} failed: {}'.format(TABLE, result.message))
+
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+""" Rating of Parameter Sets
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from systemcheck.models.meta import Operators
+from systemcheck.plugins import rate_individual_results
+
+
+def synthetic_parameter_sets(count:int)->list:
+    """ Result records with integer, decimal and string values as returned by the checks """
+
+    values = [('8', '12', None), ('0.5', '1.25', None), ('SNC', 'SNC', None), ('3', '8', '10'), ('10', 10, None),
+              ('X', 'ABC', None)]
+    operators = ['GE', 'LT', 'EQ', 'BETWEEN', 'NE', 'MATCHES']
+
+    records = []
+    for counter in range(count):
+        expected, configured, upper = values[counter % len(values)]
+        records.append(dict(EXPECTED=expected, CONFIGURED=configured, UPPER=upper,
+                            OPERATOR=operators[counter % len(operators)]))
+    return records
+
+
+class Operation:
+    """ Operators.operation, which converts the values and compares them """
+
+    params = [[10000, 100000]]
+    quick_params = [[10000]]
+    param_names = ['parameter_sets']
+
+    def setup(self, count):
+        self.operators = Operators()
+        self.records = synthetic_parameter_sets(count)
+
+    def time_operation(self, count):
+        operation = self.operators.operation
+        for record in self.records:
+            operation(record['OPERATOR'], record['EXPECTED'], record['CONFIGURED'], record['UPPER'])
+
+    def time_rate_individual_results(self, count):
+        rate_individual_results([dict(record) for record in self.records], configuredFirst=False)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+""" Display, Sorting and Filtering of large Detail Results
+
+The result resembles an RSUSR002 result with one row per user. It is either kept as list of dictionaries, as
+ColumnarTable or in the result store.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from PyQt5 import QtCore
+
+from systemcheck.plugins import ActionResult
+from systemcheck.results import ResultStore
+from systemcheck.results.result_handler import ResultTableModel, arrange_rows
+from systemcheck.utils import ColumnarTable
+
+from benchmarks.common import qt_application
+
+
+USER_TYPES = ['A', 'B', 'C', 'L', 'S']
+
+
+def synthetic_users(count:int)->list:
+    return [dict(BNAME='USER{:06d}'.format((counter * 7919) % count), USTYP=USER_TYPES[counter % len(USER_TYPES)],
+                 CLASS='GROUP{:02d}'.format(counter % 40), GLTGB='99991231') for counter in range(count)]
+
+
+def user_result(rows)->ActionResult:
+    result = ActionResult()
+    result.checkName = 'Users with critical authorizations'
+    result.systeminfo = 'S00, Client 000'
+    result.resultDefinition = OrderedDict(BNAME='User', USTYP='User Type', CLASS='User Group', GLTGB='Valid To')
+    result.result = rows
+    return result
+
+
+@lru_cache()
+def stored_users(count:int):
+    """ A result store with the synthetic users and the id of the result """
+    store = ResultStore()
+    resultId = store.addResults(store.startRun(), [user_result(synthetic_users(count))])[0]
+    return store, resultId
+
+
+class ResultTable:
+    """ ResultTableModel for a result with many rows """
+
+    params = [[10000, 200000], ['list', 'columnar', 'stored']]
+    quick_params = [[10000], ['list', 'columnar', 'stored']]
+    param_names = ['rows', 'backing']
+
+    def setup(self, count, backing):
+        self.app = qt_application()
+        if backing == 'stored':
+            store, resultId = stored_users(count)
+            self.result = store.loadResult(resultId)
+        else:
+            rows = synthetic_users(count)
+            if backing == 'columnar':
+                rows = ColumnarTable.fromRows(rows)
+            self.result = user_result(rows)
+        self.columns = list(self.result.resultDefinition.keys())
+
+    def time_scroll(self, count, backing):
+        """ Fetch all rows and read every cell, like scrolling through the whole table """
+        model = ResultTableModel(self.result)
+        root = QtCore.QModelIndex()
+        while model.canFetchMore(root):
+            model.fetchMore(root)
+        for row in range(model.rowCount(root)):
+            for column in range(len(self.columns)):
+                model.data(model.index(row, column), QtCore.Qt.DisplayRole)
+
+    def time_sort(self, count, backing):
+        arrange_rows(self.result.result, self.columns, sortColumn='BNAME', descending=True)
+
+    def time_filter(self, count, backing):
+        arrange_rows(self.result.result, self.columns, filterText='group1')
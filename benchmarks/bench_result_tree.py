@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+""" Insertion of Check Results into the Result Tree
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import OrderedDict
+
+from systemcheck.plugins import ActionResult
+from systemcheck.results import ResultHandler
+
+from benchmarks.common import qt_application
+
+
+RATINGS = ['pass', 'fail', 'error', 'info']
+
+
+def synthetic_results(count:int, checks:int=100)->list:
+    """ Results of `checks` checks executed against count / checks systems """
+
+    results = []
+    for counter in range(count):
+        result = ActionResult()
+        result.rating = RATINGS[counter % len(RATINGS)]
+        result.resultDefinition = OrderedDict(RATING='Rating', TABLE='Table', EXPECTED='Expected',
+                                              OPERATOR='Operator', CONFIGURED='Configured')
+        result.addResult(dict(RATING=result.rating, TABLE='T000', EXPECTED=0, OPERATOR='EQ', CONFIGURED=counter))
+        result.checkName = 'Check {:04d}'.format(counter % checks)
+        result.systeminfo = 'S{:03d}, Client 000'.format(counter // checks)
+        result.errorMessage = 'synthetic error' if result.rating == 'error' else None
+        results.append(result)
+    return results
+
+
+class InsertResult:
+    """ ResultTreeModel.insertResult, grouped by rating, check and system """
+
+    params = [[1000, 10000]]
+    quick_params = [[1000]]
+    param_names = ['results']
+
+    def setup(self, count):
+        self.app = qt_application()
+        self.results = synthetic_results(count)
+        self.handler = ResultHandler()
+        self.model = self.handler.buildTreeModel()
+
+    def time_insertResult(self, count):
+        for result in self.results:
+            self.model.insertResult(result)
+
+    def time_insertResults(self, count):
+        self.model.insertResults(self.results)
+
+    def time_addResult(self, count):
+        for result in self.results:
+            self.handler.resultAdd_signal.emit(result)
+        self.handler.flush()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+""" Opening and Expanding the Systems Tree
+
+The systems are stored in an in memory SQLite database, in folders of 50 systems each.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from PyQt5 import QtCore
+from sqlalchemy import create_engine
+
+from systemcheck import models
+from systemcheck.gui.models import GenericTreeModel
+from systemcheck.models.meta.base import sessionmaker
+from systemcheck.systems.generic.models import GenericSystem, GenericSystemTreeNode
+
+from benchmarks.common import qt_application
+
+
+def synthetic_systems_tree(session, count:int, perFolder:int=50):
+    root = GenericSystemTreeNode(name='RootNode')
+    for folderNr in range(count // perFolder):
+        folder = GenericSystem(name='Folder {:03d}'.format(folderNr))
+        root.children.append(folder)
+        for systemNr in range(perFolder):
+            folder.children.append(GenericSystem(name='S{:03d}{:02d}'.format(folderNr, systemNr)))
+    session.add(root)
+    session.commit()
+
+
+class SystemsTree:
+    """ GenericTreeModel of the systems, every node is visited like by a fully expanded tree view """
+
+    params = [[2000, 10000]]
+    quick_params = [[2000]]
+    param_names = ['systems']
+
+    def setup(self, count, perFolder:int=50):
+        self.app = qt_application()
+        engine = create_engine('sqlite://')
+        models.meta.base.Base.metadata.create_all(engine)
+        synthetic_systems_tree(sessionmaker(bind=engine)(), count, perFolder)
+        self.session = sessionmaker(bind=engine, expire_on_commit=False)()
+        self.rootnode = self.session.query(GenericSystemTreeNode).filter_by(parent_id=None).one()
+
+    def teardown(self, count):
+        self.session.close()
+
+    def time_expandAll(self, count):
+        model = GenericTreeModel(self.rootnode)
+        self.visit(model, QtCore.QModelIndex())
+
+    def visit(self, model, parent):
+        if model.canFetchMore(parent):
+            model.fetchMore(parent)
+        for row in range(model.rowCount(parent)):
+            index = model.index(row, 0, parent)
+            model.data(index, QtCore.Qt.DisplayRole)
+            model.parent(index)
+            if model.hasChildren(index):
+                self.visit(model, index)
+
+
+class LargeFolder:
+    """ GenericTreeModel.parent for the clients of all systems of a single folder
+
+    The parent of a client is a system, which has to determine its row within the folder. Tree views do this
+    constantly while painting and selecting.
+    """
+
+    params = [[1000, 10000]]
+    quick_params = [[1000]]
+    param_names = ['systems']
+
+    def setup(self, count):
+        self.app = qt_application()
+        engine = create_engine('sqlite://')
+        models.meta.base.Base.metadata.create_all(engine)
+
+        session = sessionmaker(bind=engine)()
+        root = GenericSystemTreeNode(name='RootNode')
+        folder = GenericSystem(name='Folder', parent_node=root)
+        for systemNr in range(count):
+            system = GenericSystem(name='S{:05d}'.format(systemNr), parent_node=folder)
+            GenericSystemTreeNode(name='000', parent_node=system)
+        session.add(root)
+        session.commit()
+
+        self.session = sessionmaker(bind=engine, expire_on_commit=False)()
+        rootnode = self.session.query(GenericSystemTreeNode).filter_by(parent_id=None).one()
+        self.model = GenericTreeModel(rootnode)
+        folder = self.model.index(0, 0, QtCore.QModelIndex())
+        self.model.fetchMore(folder)
+
+        self.clients = []
+        for row in range(count):
+            system = self.model.index(row, 0, folder)
+            self.model.fetchMore(system)
+            self.clients.append(self.model.index(0, 0, system))
+
+    def teardown(self, count):
+        self.session.close()
+
+    def time_parent(self, count):
+        for index in self.clients:
+            self.model.parent(index)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+""" Shared Fixtures of the Benchmarks
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from contextlib import contextmanager
+import os
+
+import keyring
+import keyring.backend
+from PyQt5 import QtWidgets
+
+from systemcheck.config import CONFIG
+from systemcheck.systems.ABAP.utils import Connection, RecordingConnection, recording_filename
+
+
+#: Fields of the synthetic table as (FIELDNAME, LENGTH)
+SYNTHETIC_FIELDS = [('MANDT', 3), ('BNAME', 12), ('USTYP', 1), ('CLASS', 12), ('GLTGV', 8), ('GLTGB', 8),
+                    ('TRDAT', 8), ('LTIME', 6)]
+
+
+class SyntheticSystem:
+    """ Stands in for pyrfc.Connection of an ABAP system
+
+    Every table has `rows` records with the structure of SYNTHETIC_FIELDS. Only RFC_READ_TABLE is implemented, which
+    is sufficient for table downloads and counts.
+
+    :param rows: The number of records of every table
+    :param sysid: The SID reported in the connection attributes
+
+    """
+
+    def __init__(self, rows:int, sysid:str='BEN'):
+        self.rows = rows
+        self.sysid = sysid
+
+    def call(self, fm, **params):
+        if fm != 'RFC_READ_TABLE':
+            raise RuntimeError('FU_NOT_FOUND')
+
+        requested = [field['FIELDNAME'] for field in params.get('FIELDS', [])]
+        fields = []
+        offset = 0
+        for name, length in SYNTHETIC_FIELDS:
+            if requested and name not in requested:
+                continue
+            fields.append({'FIELDNAME': name, 'LENGTH': '{:06d}'.format(length), 'OFFSET': '{:06d}'.format(offset),
+                           'TYPE': 'C', 'FIELDTEXT': name})
+            offset += length + len(params.get('DELIMITER', ''))
+
+        response = {'DATA': [], 'FIELDS': fields, 'OPTIONS': params.get('OPTIONS', [])}
+        if params.get('NO_DATA') == 'X':
+            return response
+
+        start = params.get('ROWSKIPS', 0)
+        end = self.rows if not params.get('ROWCOUNT') else min(self.rows, start + params['ROWCOUNT'])
+        delimiter = params.get('DELIMITER', '')
+        for row in range(start, end):
+            values = [str(row).zfill(int(field['LENGTH']))[-int(field['LENGTH']):] for field in fields]
+            response['DATA'].append({'WA': delimiter.join(values)})
+        return response
+
+    def get_connection_attributes(self):
+        return {'sysId': self.sysid, 'kernelRel': '753'}
+
+    def close(self):
+        pass
+
+
+class MemoryKeyring(keyring.backend.KeyringBackend):
+    """ Keeps the passwords of the synthetic systems in memory instead of the keyring of the user """
+
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self._passwords = dict()
+
+    def get_password(self, service, username):
+        return self._passwords.get((service, username))
+
+    def set_password(self, service, username, password):
+        self._passwords[(service, username)] = password
+
+    def delete_password(self, service, username):
+        self._passwords.pop((service, username), None)
+
+
+def use_memory_keyring():
+    """ Store passwords in memory for the rest of the process """
+
+    if not isinstance(keyring.get_keyring(), MemoryKeyring):
+        keyring.set_keyring(MemoryKeyring())
+
+
+def qt_application():
+    """ The QApplication, which is required for the widgets and the signals of the result handling """
+
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@contextmanager
+def config_override(section:str, options:dict):
+    """ Temporarily change options of a section of settings.ini """
+
+    config = CONFIG[section]
+    previous = dict()
+    for option, value in options.items():
+        previous[option] = config.get(option)
+        config[option] = str(value)
+    try:
+        yield
+    finally:
+        for option, value in previous.items():
+            if value is None:
+                config.pop(option, None)
+            else:
+                config[option] = value
+
+
+def record_session(directory:str, logon_info:dict, system, calls)->str:
+    """ Record the function module calls of a session against a synthetic system
+
+    :param directory: The directory of the recordings
+    :param logon_info: The logon information the recording is created for
+    :param system: The synthetic system, for example SyntheticSystem
+    :param calls: A function that is executed with the systemcheck.systems.ABAP.utils.Connection
+    :return: The name of the recording file
+
+    """
+
+    filename = recording_filename(directory, logon_info)
+    if os.path.exists(filename):
+        os.remove(filename)
+
+    connection = Connection()
+    connection.logon(logon_info, mock=True)
+    connection.conn = RecordingConnection(system, filename)
+    try:
+        calls(connection)
+    finally:
+        connection.conn.close()
+    return filename
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+""" Benchmark Runner
+
+Executes the benchmarks of this package and writes a JSON report. If a baseline report is specified, the median of
+every benchmark is compared to the baseline and the runner exits with status 1 if a benchmark got slower than the
+threshold.
+
+Usage::
+
+    python -m benchmarks.run [--quick] [--filter PATTERN] [--repeat N] [--output FILE] [--compare FILE]
+
+A benchmark whose setup raises NotImplementedError is skipped, any other exception marks it as failed.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+import argparse
+import datetime
+import gc
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import benchmarks
+
+
+def discover(pattern:str=None)->list:
+    """ Find all benchmark methods
+
+    :param pattern: Regular expression the name of the benchmark, module.class.method, has to match
+    :return: A list of tuples (name, class, method name)
+
+    """
+
+    found = []
+    for module in pkgutil.iter_modules(benchmarks.__path__):
+        if not module.name.startswith('bench_'):
+            continue
+
+        moduleObject = importlib.import_module('{}.{}'.format(benchmarks.__name__, module.name))
+        for className, cls in inspect.getmembers(moduleObject, inspect.isclass):
+            if cls.__module__ != moduleObject.__name__:
+                continue
+            for methodName in sorted(name for name in dir(cls) if name.startswith('time_')):
+                name = '{}.{}.{}'.format(module.name, className, methodName)
+                if pattern is None or re.search(pattern, name):
+                    found.append((name, cls, methodName))
+    return found
+
+
+def parameter_combinations(cls, quick:bool=False)->list:
+    """ All combinations of the parameters of a benchmark class """
+
+    params = getattr(cls, 'quick_params', None) if quick else None
+    if params is None:
+        params = getattr(cls, 'params', None)
+
+    if not params:
+        return [()]
+    return list(itertools.product(*params))
+
+
+def parameter_key(cls, combination:tuple)->str:
+    """ The key of a parameter combination in the report, for example rows=1000,columnar=False """
+
+    names = getattr(cls, 'param_names', None) or ['param{}'.format(counter) for counter in range(len(combination))]
+    return ','.join('{}={}'.format(name, value) for name, value in zip(names, combination))
+
+
+def measure(cls, methodName:str, combination:tuple, repeat:int)->dict:
+    """ Execute a benchmark repeat times
+
+    setup and teardown are executed for every repetition and are not part of the measured time.
+    """
+
+    timings = []
+    for counter in range(repeat):
+        instance = cls()
+        setup = getattr(instance, 'setup', None)
+        teardown = getattr(instance, 'teardown', None)
+        try:
+            if setup:
+                setup(*combination)
+        except NotImplementedError as err:
+            return dict(status='skipped', message=str(err))
+
+        try:
+            gc.collect()
+            start = time.perf_counter()
+            getattr(instance, methodName)(*combination)
+            timings.append(time.perf_counter() - start)
+        finally:
+            if teardown:
+                teardown(*combination)
+
+    return dict(status='ok', repeat=repeat, min=min(timings), median=statistics.median(timings),
+                mean=statistics.mean(timings), max=max(timings))
+
+
+def git_revision()->str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pattern:str=None, quick:bool=False, repeat:int=3, log=print)->dict:
+    """ Execute the benchmarks and return the report """
+
+    report = dict(timestamp=datetime.datetime.now().isoformat(timespec='seconds'),
+                  revision=git_revision(),
+                  quick=quick,
+                  machine=dict(python=platform.python_version(), platform=platform.platform(),
+                               processor=platform.processor(), cpus=os.cpu_count()),
+                  results=dict())
+
+    for name, cls, methodName in discover(pattern):
+        results = report['results'].setdefault(name, dict())
+        for combination in parameter_combinations(cls, quick):
+            key = parameter_key(cls, combination)
+            try:
+                result = measure(cls, methodName, combination, getattr(cls, 'repeat', repeat))
+            except Exception as err:
+                result = dict(status='failed', message='{}: {}'.format(err.__class__.__name__, err))
+            results[key] = result
+            log(format_result(name, key, result))
+    return report
+
+
+def format_result(name:str, key:str, result:dict)->str:
+    label = '{} ({})'.format(name, key) if key else name
+    if result['status'] == 'ok':
+        return '{:<90} {:>10.4f}s'.format(label, result['median'])
+    return '{:<90} {:>11}  {}'.format(label, result['status'], result.get('message', ''))
+
+
+def compare(report:dict, baseline:dict, threshold:float=0.2)->list:
+    """ Compare the medians of a report with a baseline report
+
+    :param threshold: Relative slowdown that is reported as regression, 0.2 means 20% slower
+    :return: A list of tuples (name, parameters, baseline median, current median) of the regressions
+
+    """
+
+    regressions = []
+    for name, results in report['results'].items():
+        for key, result in results.items():
+            reference = baseline.get('results', {}).get(name, {}).get(key)
+            if not reference or reference.get('status') != 'ok' or result.get('status') != 'ok':
+                continue
+            if result['median'] > reference['median'] * (1 + threshold):
+                regressions.append((name, key, reference['median'], result['median']))
+    return regressions
+
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description='Execute the benchmarks')
+    parser.add_argument('--filter', help='only execute benchmarks whose name matches the regular expression')
+    parser.add_argument('--quick', action='store_true', help='only use the small parameter sets')
+    parser.add_argument('--repeat', type=int, default=3, help='number of measurements per benchmark')
+    parser.add_argument('--output', help='write the report to this file')
+    parser.add_argument('--compare', help='baseline report to compare the results with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown that is reported as regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    report = run(pattern=args.filter, quick=args.quick, repeat=args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+
+    status = 0
+    failed = [(name, key) for name, results in report['results'].items()
+              for key, result in results.items() if result['status'] == 'failed']
+    if failed:
+        status = 1
+
+    if args.compare:
+        with open(args.compare, 'r') as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.threshold)
+        for name, key, reference, current in regressions:
+            print('REGRESSION {} ({}): {:.4f}s -> {:.4f}s (+{:.0%})'.format(name, key, reference, current,
+                                                                          current / reference - 1))
+        if regressions:
+            status = 1
+        else:
+            print('no regressions compared to {}'.format(args.compare))
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -181,11 +181,9 @@ class ChecksWidget(QtWidgets.QWidget):
 
         self.checksPause_act = QtWidgets.QAction(QtGui.QIcon(':Pause'), 'Pause Checks')
         self.checksPause_act.triggered.connect(self.on_checkPause)
-        self.checksPause_act.setEnabled(False)
 
         self.checksStop_act = QtWidgets.QAction(QtGui.QIcon(':Stop'), 'Stop Checks')
-        self.checksStop_act.triggered.connect(self.on_checkPause)
-        self.checksStop_act.setEnabled(False)
+        self.checksStop_act.triggered.connect(self.on_checkStop)
 
 
 
@@ -321,10 +319,10 @@ class ChecksWidget(QtWidgets.QWidget):
         self.importChecks()
 
     def on_checkStop(self):
-        raise NotImplemented
+        self.checksStop_signal.emit()
 
     def on_checkPause(self):
-        raise NotImplemented
+        self.checksPause_signal.emit()
 
     def openContextMenu(self, position):
 
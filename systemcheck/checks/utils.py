@@ -37,7 +37,7 @@ def exportChecks(*args, folder=None, format='yaml', saObject=None, session=None,
         saObject=session.query(systemcheck.checks.models.Check).filter_by(name='RootNode').one()
 
     for child in saObject.children:
-        result = exportChecks(session, folder=folder, format=format, saObject=child)
+        result = exportChecks(session=session, folder=folder, format=format, saObject=child)
 
         if result.fail:
             return result
@@ -112,7 +112,7 @@ def readChecksYaml(filename):
 
     with open(filename, 'r') as fh:
         try:
-            data=yaml.load(fh)
+            data=yaml.safe_load(fh)
         except yaml.YAMLError as err:
             pprint(err.args)
 
@@ -202,26 +202,63 @@ def importChecks(path=None, session=None):
 
     logger.debug('idenfied files: %s', pformat(checkFiles))
     logger.debug('starting import:')
-    for checkFile in checkFiles:
-        logger.debug('  - %s', checkFile)
 
-        result = importCheck(filename=join(path, checkFile), session=session)
-        if result.fail:
-            logger.error('Import of %s failed: %s', checkFile, result.message)
-            failed[checkFile]=result.message
-        else:
-            logger.debug('Import of %s succeeded', checkFile)
-            success[checkFile]=result.message
+    if session is None:
+        session=systemcheck.session.SESSION
 
-        if len(failed) > 0:
-            message = 'Some imports failed!'
-        else:
-            message = 'Imports Succeeded'
+    # All checks are committed together at the end instead of committing every check. Every file is imported within a
+    # savepoint, so that a file that fails is rolled back without affecting the other files.
+    try:
+        with models.meta.unit_of_work(session):
+            for checkFile in checkFiles:
+                logger.debug('  - %s', checkFile)
+
+                result = importCheckInSavepoint(filename=join(path, checkFile), session=session)
+                if result.fail:
+                    logger.error('Import of %s failed: %s', checkFile, result.message)
+                    failed[checkFile]=result.message
+                else:
+                    logger.debug('Import of %s succeeded', checkFile)
+                    success[checkFile]=result.message
+
+            if len(failed) > 0:
+                message = 'Some imports failed!'
+            else:
+                message = 'Imports Succeeded'
 
-        data = {'successful':success, 'failed':failed}
+            data = {'successful':success, 'failed':failed}
+    except Exception as err:
+        logger.exception(err)
+        return Fail(message='Error During Import: {}'.format(pformat(err)))
 
     return Result(message=message, data=data)
 
+def importCheckInSavepoint(filename, session, format='yaml'):
+    """ Import a check within a savepoint of the session
+
+    The changes are flushed when the savepoint is released, so that database errors are reported for the file. If the
+    import fails, the savepoint is rolled back.
+
+    :param filename: Name of the file that should get imported
+    :param session: The session that should be used for importing the export
+    :param format: The of the file
+    """
+
+    savepoint = session.begin_nested()
+    try:
+        result = importCheck(filename=filename, session=session, format=format)
+        if result.fail:
+            savepoint.rollback()
+        else:
+            savepoint.commit()
+    except Exception as err:
+        logger.exception(err)
+        # A failed flush deactivates the savepoint, it still has to be rolled back
+        savepoint.rollback()
+        return Fail(message='Error During Import: {}'.format(pformat(err)))
+
+    return result
+
 def importCheck(filename, session=None, format='yaml'):
     """ Import Checks
 
@@ -280,7 +317,7 @@ def importCheck(filename, session=None, format='yaml'):
     models.meta.base.Base.metadata.create_all(session.bind)
 
     try:
-        session.commit()
+        models.meta.commit_changes(session)
     except Exception as err:
         return Fail(message='Error During Import: '.format(pformat(err)))
 
@@ -289,7 +326,7 @@ def importCheck(filename, session=None, format='yaml'):
     node.children.append(checkNode)
 
     try:
-        session.commit()
+        models.meta.commit_changes(session)
     except Exception as err:
         return Fail(message='Error During Import: '.format(pformat(err)))
 
@@ -1,4 +1,25 @@
 class NotImplemented(BaseException):
 
     def __init__(self):
-        super().__init__()
\ No newline at end of file
+        super().__init__()
+
+
+class ReadTableError(Exception):
+    """ Reading a table page by page failed
+
+    The Fail object of the failed function module call is available in attribute fail.
+    """
+
+    def __init__(self, fail):
+        super().__init__(fail.message)
+        self.fail = fail
+
+
+class ReplayError(LookupError):
+    """ A recorded RFC session doesn't contain a response for a function module call """
+
+    def __init__(self, fm, params, message=None):
+        super().__init__(message or 'No recorded response for {} with parameters {}'.format(fm, params))
+        self.fm = fm
+        self.params = params
+        self.message = str(self)
@@ -194,11 +194,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.checksPause_act = QtWidgets.QAction(QtGui.QIcon(':Pause'), 'Pause Checks')
         self.checksPause_act.triggered.connect(self.on_checksPause)
-        self.checksPause_act.setEnabled(False)
 
         self.checksStop_act = QtWidgets.QAction(QtGui.QIcon(':Stop'), 'Stop Checks')
-        self.checksStop_act.triggered.connect(self.on_checksPause)
-        self.checksStop_act.setEnabled(False)
+        self.checksStop_act.triggered.connect(self.on_checksStop)
 
         self.resultsExport_act = QtWidgets.QAction(QtGui.QIcon(':Export'), 'Export Results...')
         self.resultsExport_act.triggered.connect(self.on_resultsExport)
@@ -2,6 +2,9 @@
 
 """ Generic UI Models
 
+The tree models show the trees of systems and checks stored in the database. The children of a node are loaded
+when the node is expanded, with a single query for all children of the node. The number of children of every loaded
+node is determined with one further query, so unexpanded nodes don't need their children to be loaded.
 
 """
 
@@ -20,9 +23,17 @@ import pickle
 from pprint import pformat
 
 from PyQt5 import QtCore, QtGui, QtWidgets
+from sqlalchemy import func, inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from systemcheck.models.meta.base import unit_of_work
+
 
 class GenericTreeModel(QtCore.QAbstractItemModel):
 
+    #: Maximum number of keys in an IN clause, SQLite supports 999 parameters per statement
+    IN_CLAUSE_SIZE = 500
+
     def __init__(self, rootnode, parent=None, treenode = None):
         super().__init__(parent)
         self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
@@ -31,6 +42,109 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
         self._treeNode=treenode
         self._checkedIndexes = set()
 
+        # Number of children of nodes whose children aren't loaded yet
+        self._childCounts = dict()
+        # Nodes whose children were fetched. The load state of the SQLAlchemy relationship can't be used, it changes
+        # without any model signal whenever the session expires the node, for example on commit or rollback.
+        self._fetched = set()
+        self._children = self._childrenRelationship(rootnode)
+
+        root = QtCore.QModelIndex()
+        if self.canFetchMore(root):
+            self.fetchMore(root)
+
+    def _childrenRelationship(self, node):
+        """ The children relationship of a node that is part of a session or None
+
+        :return: A tuple (relationship, key attribute of the parent, foreign key column, foreign key attribute)
+        """
+
+        state = inspect(node, raiseerr=False)
+        if state is None or state.session is None or 'children' not in state.mapper.relationships:
+            return None
+
+        relationship = state.mapper.relationships['children']
+        if len(relationship.local_remote_pairs) != 1:
+            return None
+
+        local, remote = relationship.local_remote_pairs[0]
+        return (relationship, relationship.parent.get_property_by_column(local).key, remote,
+                relationship.mapper.get_property_by_column(remote).key)
+
+    def _childrenLoaded(self, node)->bool:
+        if self._children is None:
+            return True
+
+        if node in self._fetched:
+            return True
+
+        state = inspect(node, raiseerr=False)
+        return state is None or state.session is None
+
+    def _queryChildren(self, nodes:list)->dict:
+        """ Read the children of several nodes and the number of their own children
+
+        :return: A dictionary with the list of children by node
+        """
+
+        relationship, parentKey, foreignKey, foreignKeyAttribute = self._children
+        session = inspect(nodes[0]).session
+
+        nodesByKey = {getattr(node, parentKey): node for node in nodes}
+        children = {node: [] for node in nodes}
+        for chunk in self._chunks(list(nodesByKey)):
+            query = session.query(relationship.mapper).filter(foreignKey.in_(chunk)) \
+                .order_by(*relationship.mapper.primary_key)
+            for child in query:
+                children[nodesByKey[getattr(child, foreignKeyAttribute)]].append(child)
+
+        loaded = [child for nodeChildren in children.values() for child in nodeChildren]
+        childrenByKey = {getattr(child, parentKey): child for child in loaded}
+        counts = dict()
+        for chunk in self._chunks(list(childrenByKey)):
+            query = session.query(foreignKey, func.count()).filter(foreignKey.in_(chunk)).group_by(foreignKey)
+            counts.update(query.all())
+
+        for key, child in childrenByKey.items():
+            self._childCounts[child] = counts.get(key, 0)
+
+        return children
+
+    def _chunks(self, keys:list):
+        for start in range(0, len(keys), self.IN_CLAUSE_SIZE):
+            yield keys[start:start + self.IN_CLAUSE_SIZE]
+
+    def canFetchMore(self, parent:QtCore.QModelIndex)->bool:
+        return parent.column() <= 0 and not self._childrenLoaded(self.getNode(parent))
+
+    def fetchMore(self, parent:QtCore.QModelIndex):
+        """ Load the children of a node with a single query """
+
+        node = self.getNode(parent)
+        if self._childrenLoaded(node):
+            return
+
+        children = self._queryChildren([node])[node]
+        self._childCounts.pop(node, None)
+
+        if children:
+            self.beginInsertRows(parent, 0, len(children) - 1)
+            set_committed_value(node, 'children', children)
+            self._fetched.add(node)
+            self.endInsertRows()
+        else:
+            set_committed_value(node, 'children', children)
+            self._fetched.add(node)
+
+    def hasChildren(self, parent:QtCore.QModelIndex=QtCore.QModelIndex())->bool:
+        if parent.column() > 0:
+            return False
+
+        node = self.getNode(parent)
+        if self._childrenLoaded(node):
+            return node._qt_child_count() > 0
+        return self._childCounts.get(node, 1) > 0
+
     def checkedIndexes(self)->list:
 
         return self._checkedIndexes
@@ -85,7 +199,7 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
 
     def flags(self, index:QtCore.QModelIndex)->int:
         if not index.isValid():
-            return QtCore.Qt.ItemIsEnabled
+            return QtCore.Qt.NoItemFlags
 
         return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsUserCheckable | \
                QtCore.Qt.ItemIsEditable
@@ -114,6 +228,8 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
     def index(self, row: int, column: int, parent: QtCore.QModelIndex)-> QtCore.QModelIndex:
 
         parentNode = self.getNode(parent)
+        if not self._childrenLoaded(parentNode):
+            return QtCore.QModelIndex()
 
         childItem = parentNode._qt_child(row)
 
@@ -132,12 +248,17 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
 
         """
 
+        if self.canFetchMore(parent):
+            self.fetchMore(parent)
         parent_node = self.getNode(parent)
 
         self.beginInsertRows(parent, position, position + 1)
 
         if nodeObject is None:
             nodeObject = self._treeNode(name="untitled")
+        if not inspect(nodeObject).has_identity:
+            # The children of a new node are all in memory, there is nothing to fetch
+            self._fetched.add(nodeObject)
         parent_node._qt_insert_child(position, nodeObject)
         self.endInsertRows()
         return True
@@ -151,14 +272,18 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
 
         """
 
+        if self.canFetchMore(parent):
+            self.fetchMore(parent)
         parentNode = self.getNode(parent)
 
         self.beginInsertRows(parent, position, position + count - 1)
 
-        for row in range(count):
-            childCount = parentNode._qt_child_count()
-            childNode = self._treeNode(name="untitled " + str(childCount))
-            success = parentNode._qt_insert_child(position, childNode)
+        with unit_of_work(inspect(parentNode).session):
+            for row in range(count):
+                childCount = parentNode._qt_child_count()
+                childNode = self._treeNode(name="untitled " + str(childCount))
+                self._fetched.add(childNode)
+                success = parentNode._qt_insert_child(position, childNode)
 
         self.endInsertRows()
 
@@ -191,6 +316,9 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
 
         """
 
+        if self.canFetchMore(index):
+            self.fetchMore(index)
+
         if self.hasChildren(index):
             for childnr in range(self.rowCount(index)):
                 child = super().index(childnr, 0, index)
@@ -218,24 +346,27 @@ class GenericTreeModel(QtCore.QAbstractItemModel):
 
         """
 
-        self.beginRemoveRows(parent, row, row)
+        self.beginRemoveRows(parent, row, row + count - 1)
 
         node = self.getNode(parent)
-
-        for i in range(count):
-            del node.children[row+i]
-            node._commit()
+        del node.children[row:row + count]
+        node._commit()
 
         self.endRemoveRows()
 
         return True
 
     def rowCount(self, parent: QtCore.QModelIndex) -> int:
+        if parent.column() > 0:
+            return 0
+
         if not parent.isValid():
             parentNode=self._rootNode
         else:
             parentNode=self.getNode(parent)
 
+        if not self._childrenLoaded(parentNode):
+            return 0
         return parentNode._qt_child_count()
 
     def setData(self, index:QtCore.QModelIndex, value: Any, role=QtCore.Qt.EditRole)->bool:
@@ -28,8 +28,10 @@ __revision__ = __version__
 import threading
 import atexit
 import logging
+import multiprocessing
 import warnings
 import weakref
+from collections import Counter, deque, namedtuple
 from functools import partial
 import concurrent.futures
 
@@ -262,6 +264,88 @@ class ThreadExecutor(QtCore.QObject, concurrent.futures.Executor):
         self._futures.remove(future)
 
 
+class ProcessExecutor(QtCore.QObject, concurrent.futures.Executor):
+    """
+    ProcessExecutor object class provides an interface for running tasks
+    in a pool of worker processes.
+
+    Python code executed in threads is serialized by the GIL. CPU heavy
+    analysis, like parsing spool lists or rating large results, should
+    therefore be executed in worker processes while the RFC I/O stays in
+    threads. The returned futures can be monitored through a
+    :class:`FutureWatcher`.
+
+    The callable and its arguments must be picklable. Functions have to be
+    defined on module level of a regularly importable module. Modules that
+    were loaded by the plugin manager are not importable by the workers.
+
+    The worker processes are started with the 'spawn' method since forking
+    a process that runs a Qt event loop and several threads is not safe.
+    Parameters
+    ----------
+    parent : QObject
+        Executor's parent instance.
+    maxWorkers : Optional[int]
+        Number of worker processes. If `None` then the number of CPUs is
+        used.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, parent=None, maxWorkers=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._maxWorkers = maxWorkers or None
+        self._pool = None
+        self._shutdown = False
+        self._state_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls, maxWorkers=None):
+        """
+        Return the process executor shared by the application. The
+        executor gets created on first use.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(maxWorkers=maxWorkers)
+                atexit.register(cls._instance.shutdown, wait=False)
+            return cls._instance
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._maxWorkers,
+                mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Reimplemented from :class:`concurrent.futures.Executor`
+        Schedule the `func(*args, **kwargs)` to be executed in a worker
+        process and return an :class:`Future` instance representing the
+        result of the computation.
+        """
+        with self._state_lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot schedule new futures after " +
+                                   "shutdown.")
+
+            return self._get_pool().submit(func, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """
+        Shutdown the executor and terminate the worker processes. If `wait`
+        is True then wait until all pending futures are executed.
+        """
+        with self._state_lock:
+            self._shutdown = True
+            pool = self._pool
+
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
 class FutureWatcher(QtCore.QObject):
     """
     An `QObject` watching the state changes of a `concurrent.futures.Future`
@@ -549,6 +633,241 @@ class FutureSetWatcher(QtCore.QObject):
         QtCore.QCoreApplication.sendPostedEvents(self, QtCore.QEvent.MetaCall)
 
 
+_RunningTask = namedtuple('_RunningTask', 'task systemKey watcher timer')
+
+
+class CheckExecutionEngine(QtCore.QObject):
+    """
+    Execute a set of tasks on a bounded pool of worker threads.
+
+    The engine is driven from the thread it lives in (usually the GUI
+    thread). Tasks are kept in an internal queue and only handed to the
+    :class:`ThreadExecutor` when a worker and a slot for the task's system
+    are available. That way pausing and stopping take effect immediately
+    for all tasks that were not started yet.
+
+    Parameters
+    ----------
+    maxWorkers : int
+        Maximum number of tasks that run at the same time.
+    maxTasksPerSystem : int
+        Maximum number of tasks that run at the same time against a single
+        system. The system of a task is determined through `systemKey`.
+    taskTimeout : Optional[float]
+        Time in seconds after which a running task is abandoned and reported
+        as failed. Python threads can not be killed, the worker finishes in
+        the background and its result is discarded.
+    systemKey : Optional[Callable]
+        Function that returns a hashable key for the system of a task. By
+        default ``task.system`` is used.
+    parent : QObject
+        Engine's parent instance.
+    """
+
+    #: Signal emitted with the task and its result when a task finished
+    resultReady = QtCore.pyqtSignal(object, object)
+
+    #: Signal emitted with the task and an error message when a task raised
+    #: an exception or exceeded the timeout
+    taskFailed = QtCore.pyqtSignal(object, str)
+
+    #: Signal reporting the number of completed and the total number of tasks
+    progressChanged = QtCore.pyqtSignal(int, int)
+
+    #: Signal emitted when all tasks were processed or the run was stopped
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, maxWorkers=4, maxTasksPerSystem=1, taskTimeout=None, systemKey=None, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.maxWorkers = max(1, maxWorkers)
+        self.maxTasksPerSystem = max(1, maxTasksPerSystem)
+        self.taskTimeout = taskTimeout or None
+        self.systemKey = systemKey or (lambda task: task.system)
+
+        self._threadPool = QtCore.QThreadPool(self)
+        self._threadPool.setMaxThreadCount(self.maxWorkers)
+        self._executor = ThreadExecutor(self, threadPool=self._threadPool)
+
+        self._func = None
+        self._pending = deque()
+        self._running = dict()
+        self._abandoned = dict()
+        self._perSystem = Counter()
+        self._completed = 0
+        self._total = 0
+        self._paused = False
+        self._stopped = False
+
+    def isPaused(self):
+        return self._paused
+
+    def isRunning(self):
+        return bool(self._pending or self._running)
+
+    def run(self, tasks, func):
+        """
+        Execute `func(task)` for every task.
+
+        Results are reported through :attr:`resultReady` and
+        :attr:`taskFailed`. :attr:`finished` gets emitted once all tasks
+        were processed.
+        """
+        if self.isRunning():
+            raise RuntimeError("Task execution is already in progress")
+
+        self._func = func
+        self._pending = deque(tasks)
+        self._completed = 0
+        self._total = len(self._pending)
+        self._paused = False
+        self._stopped = False
+
+        self.logger.debug('starting execution of %i tasks with %i workers', self._total, self.maxWorkers)
+        self.progressChanged.emit(self._completed, self._total)
+
+        if self._total == 0:
+            self.finished.emit()
+        else:
+            self._dispatch()
+
+    def pause(self):
+        """ Don't start any further tasks until :meth:`resume` is called """
+        self.logger.debug('pausing task execution')
+        self._paused = True
+
+    def resume(self):
+        """ Continue starting tasks after :meth:`pause` """
+        self.logger.debug('resuming task execution')
+        self._paused = False
+        self._dispatch()
+
+    def stop(self):
+        """
+        Cancel all tasks that were not started yet.
+
+        Tasks that are already running can not be interrupted. Their results
+        are still reported.
+        """
+        if not self.isRunning():
+            return
+
+        self.logger.debug('stopping task execution, %i tasks were not started', len(self._pending))
+        self._stopped = True
+        self._pending.clear()
+
+        for future in list(self._running):
+            future.cancel()
+
+        self._checkFinished()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the execution and free all resources. If `wait` is True then
+        wait until the running tasks returned.
+        """
+        self.stop()
+        self._executor.shutdown(wait=False)
+        if wait:
+            self._threadPool.waitForDone()
+
+    def _dispatch(self):
+        if self._paused or self._stopped:
+            return
+
+        skipped = deque()
+        while self._pending and len(self._running) < self.maxWorkers:
+            task = self._pending.popleft()
+            systemKey = self.systemKey(task)
+            if self._perSystem[systemKey] >= self.maxTasksPerSystem:
+                skipped.append(task)
+            else:
+                self._start(task, systemKey)
+
+        skipped.extend(self._pending)
+        self._pending = skipped
+
+    def _start(self, task, systemKey):
+        future = self._executor.submit(self._func, task)
+        watcher = FutureWatcher(future, parent=self)
+        watcher.done.connect(self._on_done)
+
+        timer = None
+        if self.taskTimeout:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(partial(self._on_timeout, future))
+            timer.start(int(self.taskTimeout * 1000))
+
+        self._perSystem[systemKey] += 1
+        self._running[future] = _RunningTask(task, systemKey, watcher, timer)
+
+    def _release(self, future, keepWatcher=False):
+        running = self._running.pop(future, None)
+        if running is None:
+            return None
+
+        self._perSystem[running.systemKey] -= 1
+        if running.timer is not None:
+            running.timer.stop()
+            running.timer.deleteLater()
+        if not keepWatcher:
+            running.watcher.deleteLater()
+        self._completed += 1
+        return running
+
+    @QtCore.pyqtSlot(Future)
+    def _on_done(self, future):
+        if future in self._abandoned:
+            # The worker of a timed out task finally returned. Hand its
+            # thread back to the pool.
+            self._abandoned.pop(future).deleteLater()
+            self._threadPool.setMaxThreadCount(self._threadPool.maxThreadCount() - 1)
+            return
+
+        running = self._release(future)
+        if running is None:
+            return
+
+        if future.cancelled():
+            self.logger.debug('task %s was cancelled', running.task)
+        elif future.exception() is not None:
+            self.logger.error('task %s failed: %s', running.task, str(future.exception()))
+            self.taskFailed.emit(running.task, str(future.exception()))
+        else:
+            self.resultReady.emit(running.task, future.result())
+
+        self.progressChanged.emit(self._completed, self._total)
+        self._dispatch()
+        self._checkFinished()
+
+    def _on_timeout(self, future):
+        running = self._release(future, keepWatcher=True)
+        if running is None:
+            return
+
+        if future.cancel():
+            running.watcher.deleteLater()
+        else:
+            # The worker thread stays busy until the task returns. Allow the
+            # pool to start an additional thread in the meantime.
+            self._abandoned[future] = running.watcher
+            self._threadPool.setMaxThreadCount(self._threadPool.maxThreadCount() + 1)
+
+        message = 'Task exceeded the timeout of {} seconds'.format(self.taskTimeout)
+        self.logger.error('task %s: %s', running.task, message)
+        self.taskFailed.emit(running.task, message)
+
+        self.progressChanged.emit(self._completed, self._total)
+        self._dispatch()
+        self._checkFinished()
+
+    def _checkFinished(self):
+        if not self._running and (self._stopped or not self._pending):
+            self._pending.clear()
+            self.finished.emit()
+
+
 class methodinvoke(object):
     """
     A thin wrapper for invoking QObject's method through
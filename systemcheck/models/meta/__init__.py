@@ -4,7 +4,8 @@ from .schema import SurrogatePK, SurrogateUuidPK, References, utcnow, \
     UniqueConstraint, Column, QtModelMixin, PasswordKeyringMixin, Password, StandardAbapAuthSelectionOptionMixin, \
     RichString, qtRelationship, CheckParameterMixin, RestrictionsMixin, OperatorMixin, Date, Time, LongString,\
     BaseMixin, TableNameMixin
-from .base import Base, CheckBase, Session, commit_on_success
+from .base import Base, CheckBase, Session, commit_on_success, commit_changes, in_unit_of_work, unit_of_work
+from .snapshot import Snapshot, snapshot
 from sqlalchemy.orm import relationship, validates, backref, mapper
 from sqlalchemy.orm.collections import attribute_mapped_collection
 from sqlalchemy import DateTime, ForeignKey
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import engine_from_config, MetaData
@@ -28,6 +29,51 @@ def commit_on_success(fn, *arg, **kw):
     else:
         return result
 
+def _default_session(session):
+    if session is None:
+        import systemcheck.session
+        session = systemcheck.session.SESSION
+    return session
+
+@contextmanager
+def unit_of_work(session=None):
+    """ Defer the commits of the session to the end of the block
+
+    Every edit in the Qt models commits its change, so that nothing gets lost. Within a unit of work these commits
+    are deferred, the changes of all edits are flushed and committed once at the end of the outermost block. If the
+    block raises an exception, the session is rolled back. Units of work can be nested.
+
+    :param session: The session, systemcheck.session.SESSION by default
+
+    """
+
+    session = _default_session(session)
+    depth = session.info.get('unit_of_work', 0)
+    session.info['unit_of_work'] = depth + 1
+
+    try:
+        yield session
+    except:
+        session.info['unit_of_work'] = depth
+        if depth == 0:
+            session.rollback()
+        raise
+
+    session.info['unit_of_work'] = depth
+    if depth == 0:
+        session.commit()
+
+def in_unit_of_work(session=None)->bool:
+    """ True if the commits of the session are deferred """
+    return _default_session(session).info.get('unit_of_work', 0) > 0
+
+def commit_changes(session=None):
+    """ Commit the session, unless a unit of work is active. Then the commit happens at the end of the unit of work. """
+
+    session = _default_session(session)
+    if not in_unit_of_work(session):
+        session.commit()
+
 # bind the Session to the current request
 # Convention within Pyramid is to use the ZopeSQLAlchemy extension here,
 # allowing integration into Pyramid's transactional scope.
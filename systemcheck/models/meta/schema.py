@@ -180,12 +180,30 @@ class QtModelMixin(object):
 
     def _qt_insert_child(self, position:int, node)->bool:
         self.children.insert(position, node)
+        self._qt_row_cache = None
         self._commit()
         return True
 
     def _qt_row(self):
-        if self.parent_node is not None:
-            return self.parent_node.children.index(self)
+        """ Return the position within the children of the parent node
+
+        The parent keeps a map of the positions of its children. A cached position is only used if the child is still
+        at that position, otherwise the map is rebuilt. After the children changed, the map is therefore rebuilt once
+        and all further lookups take constant time.
+        """
+
+        parent = self.parent_node
+        if parent is None:
+            return None
+
+        children = parent.children
+        rows = getattr(parent, '_qt_row_cache', None)
+        row = rows.get(id(self)) if rows else None
+        if row is None or row >= len(children) or children[row] is not self:
+            rows = {id(child): position for position, child in enumerate(children)}
+            parent._qt_row_cache = rows
+            row = rows[id(self)]
+        return row
 
     def _qt_remove_child(self, position:int)->bool:
         """ Remove a child item at a particular position
@@ -204,13 +222,15 @@ class QtModelMixin(object):
                 session.expunge(child)
             else:
                 session.delete(child)
-            session.commit()
+            systemcheck.models.meta.base.commit_changes(session)
+            self._qt_row_cache = None
 
         return True
 
     def _commit(self):
-        session = systemcheck.session.SESSION
-        session.commit()
+        """ Commit the change, deferred to the end of the unit of work if one is active """
+        session = inspect(self).session or systemcheck.session.SESSION
+        systemcheck.models.meta.base.commit_changes(session)
 
     def _flush(self):
         session = systemcheck.session.SESSION
@@ -330,8 +350,8 @@ class BaseMixin(object):
 
                 if relation.key not in ignore_attrs:
                     if backref is not None:
-                        if relation.table._is_join:
-                            if relation.table.right==backref[0] or relation.table.left==backref[0]:
+                        if relation.target._is_join:
+                            if relation.target.right==backref[0] or relation.target.left==backref[0]:
                                 continue
 
                         #
@@ -0,0 +1,83 @@
+""" Detached copies of sqlalchemy objects
+
+The objects of the systems and checks trees are bound to the session of the GUI thread. Checks that are executed on
+worker threads must not load attributes through that session. Before a check is dispatched, the system and the check
+are therefore copied into snapshots that hold plain values only.
+
+"""
+
+from sqlalchemy import inspect
+
+
+#: Relationships that are copied along with the object. params are the parameter sets of a check, parent_node is the
+#: parent of a system, e.g. the ABAP system of a client.
+SNAPSHOT_RELATIONSHIPS = ('params', 'parent_node')
+
+
+class Snapshot(object):
+    """ Immutable copy of the column values of a sqlalchemy object
+
+    The values are available as attributes like on the original object. If the object provides logon_info, its result
+    at the time of the snapshot is returned by logon_info of the snapshot.
+    """
+
+    __slots__ = ('_className', '_values', '_logonInfo')
+
+    def __init__(self, className:str, values:dict, logonInfo=None):
+        object.__setattr__(self, '_className', className)
+        object.__setattr__(self, '_values', values)
+        object.__setattr__(self, '_logonInfo', logonInfo)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError('{} snapshot has no attribute {}'.format(self._className, name)) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} snapshot is immutable'.format(self._className))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} snapshot is immutable'.format(self._className))
+
+    def __repr__(self):
+        return '<{} snapshot {}>'.format(self._className, self._values.get('name', self._values.get('id')))
+
+    def logon_info(self):
+        """ The logon info of the original object, a copy is returned so that the snapshot stays unchanged """
+
+        if isinstance(self._logonInfo, dict):
+            return dict(self._logonInfo)
+        return self._logonInfo
+
+
+def snapshot(saObject, relationships=SNAPSHOT_RELATIONSHIPS, logonInfo:bool=True):
+    """ Copy a sqlalchemy object into a Snapshot
+
+    All column attributes are copied. Of the relationships only those in relationships are followed, the related
+    objects are copied without their own relationships and logon info.
+
+    :param saObject: The sqlalchemy object, None is returned as None
+    :param relationships: Names of the relationships to copy
+    :param logonInfo: Copy the result of logon_info, if the object provides it
+
+    """
+
+    if saObject is None or isinstance(saObject, Snapshot):
+        return saObject
+
+    mapper = inspect(saObject).mapper
+    values = {attribute.key: getattr(saObject, attribute.key) for attribute in mapper.column_attrs}
+
+    for relationship in mapper.relationships:
+        if relationship.key not in relationships:
+            continue
+
+        related = getattr(saObject, relationship.key)
+        if relationship.uselist:
+            values[relationship.key] = tuple(snapshot(item, relationships=(), logonInfo=False) for item in related)
+        else:
+            values[relationship.key] = snapshot(related, relationships=(), logonInfo=False)
+
+    logonInfoValue = saObject.logon_info() if logonInfo and hasattr(saObject, 'logon_info') else None
+    return Snapshot(saObject.__class__.__name__, values, logonInfoValue)
@@ -4,6 +4,10 @@ from .base_type import BasePlugin
 from .system_type import SystemBasePlugin
 from .manager import SysCheckPM
 from systemcheck import checks, systems
+from systemcheck.config import CONFIG
+from systemcheck.gui.parallel_processing import ProcessExecutor
+from systemcheck.models.meta import Operators
+from systemcheck.utils import ColumnarTable
 import logging
 import datetime
 from collections import OrderedDict
@@ -11,6 +15,51 @@ from typing import Union
 from pprint import pformat
 
 
+def rate_individual_result(result:dict, configuredFirst:bool, operators:Operators=None)->dict:
+    """ Rate a single result record
+
+    The record is compared using its OPERATOR, EXPECTED, CONFIGURED and UPPER values. See
+    ActionBasePlugin.rateIndividualResult for details.
+
+    :param result: The result record
+    :param configuredFirst: True if CONFIGURED is the first value of the comparison
+    :param operators: Operators instance to use, a new one is created if not provided
+
+    """
+    if operators is None:
+        operators = Operators()
+
+    if configuredFirst:
+        value1 = result.get('CONFIGURED')
+        value2 = result.get('EXPECTED')
+    else:
+        value1 = result.get('EXPECTED')
+        value2 = result.get('CONFIGURED')
+
+    result['RATING']='pass'
+
+    try:
+        if operators.operation(value1=value1, operation_name=result.get('OPERATOR'), value2=value2,
+                               value3=result.get('UPPER')):
+            result['RATING']='pass'
+        else:
+            result['RATING']='fail'
+    except Exception as err:
+        result['RATING']='error'
+        result['ERROR'] = pformat(err)
+    return result
+
+
+def rate_individual_results(results:list, configuredFirst:bool)->list:
+    """ Rate a list of result records
+
+    Module level function, so that the rating can be executed in a worker process.
+
+    """
+    operators = Operators()
+    return [rate_individual_result(result, configuredFirst, operators) for result in results]
+
+
 class ActionResult:
     """ Result of a check plugin
 
@@ -43,6 +92,7 @@ class ActionResult:
     def addResult(self, data:dict):
         """ Add a Result to the overall Result
 
+        The result is either a list of dictionaries or a systemcheck.utils.ColumnarTable. Both support append.
          """
         self.__result.append(data)
 
@@ -189,6 +239,27 @@ class ActionBasePlugin(BasePlugin):
         """ Certain Checks """
         raise NotImplemented
 
+    def errorResult(self, systemObject, checkObject, message:str)->ActionResult:
+        """ Return a result that reports a failed execution
+
+        Used when the plugin could not be executed at all, for example because the logon failed or the execution
+        exceeded its time limit.
+
+        :param systemObject: The sqlalchemy object of the system
+        :param checkObject: The sqlalchemy object of the check
+        :param message: The error message
+
+        """
+        self.systemObject=systemObject
+        self.checkObject=checkObject
+
+        self.actionResult.logonInfo=self.systemObject.logon_info()
+        self.actionResult.checkName=self.checkObject.name
+        self.actionResult.systeminfo=self.systemInfo()
+        self.actionResult.rating='error'
+        self.actionResult.errorMessage=message
+        return self.actionResult
+
     def execute(self):
         """ The entry point for the actual plugin code"""
         raise NotImplemented
@@ -202,7 +273,7 @@ class ActionBasePlugin(BasePlugin):
         """
         self.systemObject=systemObject
         self.checkObject=checkObject
-        result = systemcheck.systems.ABAP.utils.get_connection(self.systemObject.logon_info())
+        result = systemcheck.systems.ABAP.utils.get_pooled_connection(self.systemObject.logon_info())
 
         self.actionResult.logonInfo=self.systemObject.logon_info()
         self.actionResult.checkName=self.checkObject.name
@@ -210,13 +281,15 @@ class ActionBasePlugin(BasePlugin):
 
         if not result.fail:
             self.systemConnection = result.data
-            self.execute()
+            try:
+                self.execute()
+            except Exception:
+                systemcheck.systems.ABAP.utils.release_connection(self.systemConnection, discard=True)
+                raise
         else:
-            self.actionResult.rating='error'
-            self.actionResult.errorMessage=result.message
-            return self.actionResult
+            return self.errorResult(systemObject, checkObject, result.message)
 
-        self.systemConnection.close()
+        systemcheck.systems.ABAP.utils.release_connection(self.systemConnection)
         self.rateOverallResult()
         return self.actionResult
 
@@ -260,33 +333,47 @@ class ActionBasePlugin(BasePlugin):
 
         """
         self.logger.debug('Rating individual result: %s', pformat(result))
-        operator = result.get('OPERATOR')
-        upper = result.get('UPPER')
+        result = rate_individual_result(result, self._configuredFirst(), self.operators)
+        if result['RATING'] == 'error':
+            self.actionResult.addResultColumn('ERROR', 'Error Message')
+        return result
 
-        definitionList = list(self.actionResult.resultDefinition.keys())
+    def rateIndividualResults(self, results:list)->list:
+        """ Rate a list of Individual Results
 
-        if definitionList.index('EXPECTED') > definitionList.index('CONFIGURED'):
-            self.logger.debug('Configured occurs before Expected. That means, it is value1')
-            value1 = result.get('CONFIGURED')
-            value2 = result.get('EXPECTED')
-        else:
-            self.logger.debug('Configured occurs before Expected. That means, it is value1')
-            value1 = result.get('EXPECTED')
-            value2 = result.get('CONFIGURED')
+        Same as rateIndividualResult, but the rating of all results is executed in a single step that can be run in a
+        worker process.
 
+        :param results: The list of result dictionaries
 
-        result['RATING']='pass'
+        """
+        results = self.runCpuBound(rate_individual_results, results, self._configuredFirst())
+        if 'error' in [result['RATING'] for result in results]:
+            self.actionResult.addResultColumn('ERROR', 'Error Message')
+        return results
 
-        try:
-            if self.operators.operation(value1=value1, operation_name=operator, value2=value2, value3=upper):
-                result['RATING']='pass'
-            else:
-                result['RATING']='fail'
-        except Exception as err:
-                result['RATING']='error'
-                self.actionResult.addResultColumn('ERROR', 'Error Message')
-                result['ERROR'] = pformat(err)
-        return result
+    def runCpuBound(self, func, *args, **kwargs):
+        """ Execute CPU heavy analysis
+
+        If app.multiprocessing is enabled, the function is executed in a worker process to avoid contention on the
+        GIL with other checks. Otherwise it is executed directly. The function and its arguments need to be
+        picklable, which means that the function must be defined in a regularly importable module, not in the
+        plugin module itself.
+
+        :param func: The function to execute
+
+        """
+        config = CONFIG['application']
+        if config.getboolean('app.multiprocessing', fallback=False):
+            executor = ProcessExecutor.instance(maxWorkers=config.getint('app.multiprocessing.max_workers',
+                                                                         fallback=0))
+            return executor.submit(func, *args, **kwargs).result()
+        return func(*args, **kwargs)
+
+    def _configuredFirst(self)->bool:
+        """ True if the CONFIGURED column is displayed before the EXPECTED column """
+        definitionList = list(self.actionResult.resultDefinition.keys())
+        return definitionList.index('EXPECTED') > definitionList.index('CONFIGURED')
 
     def rateOverallResult(self, error=False, errormessage=None):
         """ Rate Overall Result
@@ -507,7 +594,7 @@ class ActionAbapSUIM(ActionAbapCheck):
             elif 'W' in msg_types:
                 self.actionResult.rating = 'warning'
 
-        self.actionResult.result=fm_data.get(self.RETURNSTRUCTURE)
+        self.actionResult.result=ColumnarTable.fromRows(fm_data.get(self.RETURNSTRUCTURE, []))
 
 
         if len(self.actionResult.result)>0:
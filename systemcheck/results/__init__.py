@@ -1 +1,2 @@
-from systemcheck.results.result_handler import ResultHandler
\ No newline at end of file
+from systemcheck.results.result_handler import ResultHandler
+from systemcheck.results.result_store import ResultStore
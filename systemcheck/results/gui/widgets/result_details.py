@@ -4,21 +4,37 @@ class ResultDetails(QtWidgets.QWidget):
 
     def __init__(self):
         super().__init__()
+        self.model = None
         self.setupUi()
 
     def setupUi(self):
         layout = QtWidgets.QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
+        self.filter = QtWidgets.QLineEdit()
+        self.filter.setPlaceholderText('Filter')
+        self.filter.setClearButtonEnabled(True)
+        self.filter.textChanged.connect(self.on_filterChanged)
+        layout.addWidget(self.filter)
         self.table = QtWidgets.QTableView()
         self.table.setAlternatingRowColors(True)
+        # Unsorted until a column header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
         self.setVisible(False)
         self.setLayout(layout)
 
+    def on_filterChanged(self, text:str):
+        if self.model is not None:
+            self.model.setFilter(text)
+
     def setModel(self, model):
         self.model = model
+        self.table.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
         self.table.setModel(model)
         if model:
+            if self.filter.text():
+                model.setFilter(self.filter.text())
             self.table.horizontalHeader().setVisible(True)
             self.table.horizontalHeader().setStretchLastSection(True)
             self.table.resizeColumnsToContents()
@@ -2,6 +2,7 @@ from PyQt5 import QtCore, QtWidgets, QtGui
 from pprint import pprint
 from systemcheck.results.gui.widgets import ResultDisplay
 from systemcheck.results import ResultHandler
+from systemcheck.results.result_store import ResultStore
 
 
 class ResultWidget(QtWidgets.QWidget):
@@ -13,11 +14,13 @@ class ResultWidget(QtWidgets.QWidget):
 
     def __init__(self):
         super().__init__()
-        self.resultHandler=ResultHandler()
+        self.resultHandler=ResultHandler(store=ResultStore.fromConfig())
         self.setupUi()
 
 
     def on_resultClear(self):
+        self.resultHandler.newRun()
+        self.runSelector.setCurrentIndex(0)
         self.ui.details.setModel(None)
         self.ui.details.setVisible(False)
         rowcount=self.overviewModel.rowCount(QtCore.QModelIndex())
@@ -47,19 +50,76 @@ class ResultWidget(QtWidgets.QWidget):
                 self.ui.details.setModel(None)
         self.ui.details.setVisible(False)
 
+    def on_runSelected(self, index:int):
+        """ Display the current results or a run of the result store """
+
+        runId = self.runSelector.itemData(index)
+        if runId is None:
+            model = self.overviewModel
+        else:
+            model = self.resultHandler.buildStoredTreeModel(runId)
+
+        self.ui.details.setModel(None)
+        self.ui.details.setVisible(False)
+        self.setOverviewModel(model)
+
+    def refreshRuns(self):
+        """ Rebuild the list of stored runs, the selected run stays selected """
+
+        store = self.resultHandler.store
+        if store is None:
+            return
+
+        selected = self.runSelector.currentData()
+        self.runSelector.blockSignals(True)
+        self.runSelector.clear()
+        self.runSelector.addItem('Current Results', None)
+        for run in store.runs():
+            text = '{:%Y-%m-%d %H:%M:%S} ({} results)'.format(run['started'], run['results'])
+            if run['description']:
+                text = '{} - {}'.format(text, run['description'])
+            self.runSelector.addItem(text, run['id'])
+
+        index = self.runSelector.findData(selected)
+        self.runSelector.setCurrentIndex(max(0, index))
+        self.runSelector.blockSignals(False)
+
+        if index < 0 and selected is not None:
+            # The displayed run doesn't exist anymore
+            self.on_runSelected(0)
+
+    def setOverviewModel(self, model):
+        self.ui.setModel(model)
+        self.ui.overview.tree.selectionModel().currentChanged.connect(self.on_resultOverview_currentChanged)
+
     def setupUi(self):
 
         self.overviewModel=self.resultHandler.buildTreeModel()
         self.resultAdd_signal.connect(self.resultHandler.addResult)
 
+        self.runSelector = QtWidgets.QComboBox()
+        self.runSelector.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToContents)
+        self.runSelector.addItem('Current Results', None)
+        self.runSelector.currentIndexChanged.connect(self.on_runSelected)
+        self.resultHandler.resultsStored_signal.connect(self.refreshRuns)
+
+        runLayout = QtWidgets.QHBoxLayout()
+        runLayout.setContentsMargins(0, 0, 0, 0)
+        runLayout.addWidget(QtWidgets.QLabel('Run:'))
+        runLayout.addWidget(self.runSelector)
+        runLayout.addStretch()
+        self.runBar = QtWidgets.QWidget()
+        self.runBar.setLayout(runLayout)
+        self.runBar.setVisible(self.resultHandler.store is not None)
 
         self.ui = ResultDisplay()
-        self.ui.setModel(self.overviewModel)
-        self.ui.overview.tree.selectionModel().currentChanged.connect(self.on_resultOverview_currentChanged)
+        self.setOverviewModel(self.overviewModel)
         layout = QtWidgets.QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.runBar)
         layout.addWidget(self.ui)
         self.setLayout(layout)
+        self.refreshRuns()
         self.show()
 
 
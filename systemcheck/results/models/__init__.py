@@ -0,0 +1 @@
+from .results import ResultBase, ResultRun, StoredResult, StoredResultRow
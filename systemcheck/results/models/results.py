@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+""" Result Store Models
+
+The results of the executed checks are kept in a database of their own, separate from the systems database. A run
+groups the results of one execution of checks. The detail rows of a result are stored one row per record, so that
+they can be read page by page.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+# maintanence information
+__maintainer__  = 'Lars Fasel'
+__email__       = 'systemcheck@team-fasel.com'
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, MetaData
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+
+ResultBase = declarative_base(metadata=MetaData(naming_convention={
+    "pk": "pk_%(table_name)s",
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+    "uq": "uq_%(table_name)s_%(column_0_name)s",
+    "ix": "ix_%(table_name)s_%(column_0_name)s"
+}))
+
+
+class ResultRun(ResultBase):
+    """ One execution of checks """
+
+    __tablename__ = 'result_run'
+
+    id = Column(Integer, primary_key=True)
+    started = Column(DateTime, nullable=False)
+    description = Column(String(250))
+
+    results = relationship('StoredResult', back_populates='run', cascade='all, delete-orphan', passive_deletes=True)
+
+
+class StoredResult(ResultBase):
+    """ The result of a check for a single system
+
+    result_definition contains the JSON encoded list of [technical name, description] pairs of the result columns.
+    """
+
+    __tablename__ = 'result'
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey('result_run.id', ondelete='CASCADE'), nullable=False, index=True)
+    system = Column(String(250), index=True)
+    check_name = Column(String(250), index=True)
+    rating = Column(String(20), index=True)
+    timestamp = Column(DateTime)
+    error_message = Column(Text)
+    message = Column(Text)
+    result_definition = Column(Text)
+    row_count = Column(Integer, nullable=False, default=0)
+
+    run = relationship('ResultRun', back_populates='results')
+
+    # Grouping a run by rating and check is answered from the index alone
+    __table_args__ = (Index('ix_result_run_id_rating_check_name_system', 'run_id', 'rating', 'check_name', 'system'),)
+
+
+class StoredResultRow(ResultBase):
+    """ A detail row of a result, the values are stored as JSON encoded list in the order of the result definition """
+
+    __tablename__ = 'result_row'
+
+    result_id = Column(Integer, ForeignKey('result.id', ondelete='CASCADE'), primary_key=True)
+    row_nr = Column(Integer, primary_key=True, autoincrement=False)
+    data = Column(Text, nullable=False)
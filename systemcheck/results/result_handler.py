@@ -1,13 +1,20 @@
 from PyQt5 import QtWidgets, QtGui, QtCore
 from typing import Any, Union
+from collections import OrderedDict
+import concurrent.futures
 import logging
 from pprint import pformat
+from systemcheck.config import CONFIG
+from systemcheck.gui.parallel_processing import FutureWatcher, ThreadExecutor
+from systemcheck.results.result_store import GROUP_COLUMNS, StoredRows
+from systemcheck.utils import ColumnarTable
 
 
 class Node(object):
     """ Generic Tree Node
 
-    This tree node is used to build the results tree
+    This tree node is used to build the results tree. Children are indexed by their name and every node caches its row
+    within the parent, so that both lookups don't depend on the number of siblings.
 
     """
 
@@ -21,7 +28,9 @@ class Node(object):
         self._name = name
         self._resultObject = None
         self._children = []
+        self._childrenByName = dict()
         self._parent = parent
+        self._row = None
 
         if parent is not None:
             parent.addChild(self)
@@ -30,7 +39,11 @@ class Node(object):
         return "NODE"
 
     def addChild(self, child):
+        """ Append a child, which is O(1) since the rows of the other children don't change """
+        child._parent = self
+        child._row = len(self._children)
         self._children.append(child)
+        self._childrenByName.setdefault(child._name, child)
 
     def insertChild(self, position, child):
 
@@ -39,25 +52,56 @@ class Node(object):
 
         self._children.insert(position, child)
         child._parent = self
+        self._childrenByName.setdefault(child._name, child)
+        self._renumberChildren(position)
         return True
 
     def removeChild(self, position):
 
-        if position < 0 or position > len(self._children):
+        if position < 0 or position >= len(self._children):
             return False
 
         child = self._children.pop(position)
         child._parent = None
+        child._row = None
+        self._unindexChild(child)
+        self._renumberChildren(position)
 
         return True
 
+    def childByName(self, name):
+        """ Return the child with the specified name or None
+
+        If several children have the same name, the one that was added first is returned.
+        """
+        return self._childrenByName.get(name)
+
+    def _renumberChildren(self, start:int):
+        for row in range(start, len(self._children)):
+            self._children[row]._row = row
+
+    def _unindexChild(self, child):
+        """ Remove a child from the name index. Another child with the same name takes its place """
+
+        if self._childrenByName.get(child._name) is child:
+            del self._childrenByName[child._name]
+            for sibling in self._children:
+                if sibling is not child and sibling._name == child._name:
+                    self._childrenByName[child._name] = sibling
+                    break
+
     @property
     def name(self):
         return self._name
 
     @name.setter
     def name(self, name):
+        parent = self._parent
+        if parent is not None:
+            parent._unindexChild(self)
         self._name = name
+        if parent is not None:
+            parent._childrenByName.setdefault(name, self)
 
     def child(self, row):
         return self._children[row]
@@ -70,7 +114,7 @@ class Node(object):
 
     def row(self):
         if self._parent is not None:
-            return self._parent._children.index(self)
+            return self._row
 
     def log(self, tabLevel=-1):
 
@@ -170,15 +214,11 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
         :param name: The 'Name' of the node. Basically what is displayed in the tree view
         :param parent: The index of the parent node """
 
-        rowcount = self.rowCount(parent)
-
-        for row in range(rowcount):
-            index = self.index(row, 0, parent)
-            node = self.getNode(index)
-            if node._name == name:
-                return index
+        node = self.getNode(parent).childByName(name)
+        if node is None:
+            return None
 
-        return None
+        return self.createIndex(node.row(), 0, node)
 
     def setData(self, index:QtCore.QModelIndex, value:Any, role:int=QtCore.Qt.EditRole):
 
@@ -199,6 +239,8 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
 
 
     def flags(self, index:QtCore.QModelIndex)->int:
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
         return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
 
     def parent(self, index:QtCore.QModelIndex)->QtCore.QModelIndex:
@@ -207,7 +249,7 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
         node = self.getNode(index)
         parentNode = node.parent()
 
-        if parentNode == self._rootNode:
+        if parentNode is None or parentNode == self._rootNode:
             return QtCore.QModelIndex()
 
         return self.createIndex(parentNode.row(), 0, parentNode)
@@ -215,6 +257,9 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
     def index(self, row:int, column:int, parent:QtCore.QModelIndex)->QtCore.QModelIndex:
         """ Return a QModelIndex that corresponds to the given row, column and parent node """
 
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+
         parentNode = self.getNode(parent)
 
         childItem = parentNode.child(row)
@@ -247,63 +292,85 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
         self.endInsertRows()
         return success
 
-    def insertResult(self, resultObject, parent=None):
-        self.logger.debug('inserting Result {}'.format(pformat(resultObject)))
-        success = False
+    def insertResult(self, resultObject, parent=None)->bool:
+        """ Insert a result into the tree
+
+        The nodes of the groupBy levels are looked up by name and created if they don't exist yet. New nodes are
+        appended to their parent, so that the rows of the existing nodes don't change. The insertion therefore only
+        depends on the depth of the tree.
+
+        :param resultObject: The ActionResult
+        :param parent: The index below which the result is inserted, the root by default
+        :return: True if a new result node was created
+
+        """
+
+        return self.insertResults([resultObject], parent) > 0
+
+    def insertResults(self, resultObjects:list, parent=None)->int:
+        """ Insert several results into the tree
+
+        The new nodes are collected first and then inserted with a single beginInsertRows/endInsertRows per parent
+        node that already is part of the model. Nodes below new nodes are attached directly, since they become visible
+        together with their new parent. Attached views therefore only process one insert per affected parent.
+
+        :param resultObjects: The ActionResults
+        :param parent: The index below which the results are inserted, the root by default
+        :return: The number of new result nodes
+
+        """
+
+        self.logger.debug('inserting %i results', len(resultObjects))
 
         if parent is None:
-            self.logger.debug('Inserting at root level')
             parent=QtCore.QModelIndex()
 
-        # Need to traverse the result tree
-        prevParentIndex = parent
-        prevNodeObject = self.getNode(prevParentIndex)
-        self.logger.debug('Retrieved initial parent node: {}'.format(pformat(prevNodeObject)))
-
-        hierarchy=dict()
-
-        for levelNr, level in enumerate(self.groupBy):
-            self.logger.debug('Processing Level {}: {}'.format(levelNr, level))
-            text=getattr(resultObject, level)
-            self.logger.debug('Retrieved text from result object for {}: {}. Searching for object'.format(level, text))
-            newParentIndex = self.findIndexByName(text, prevParentIndex)
-
-
-            if newParentIndex is None:
-                self.logger.debug('No Object with that text found. Building a new tree node')
-                prevParentNodeObject = self.getNode(prevParentIndex)
-                if levelNr<len(self.groupBy)-1:
-                    self.logger.debug('Did not reach lowest level yet. Creating a normal tree node with text: "%s"', text)
-                    newNode = Node(text)
-                else:   #That means, we reached the lowest level of the hierarchy
-                    self.logger.debug('Reached lowest level in hierarchy (%i), adding ResultObject node', levelNr)
-                    if resultObject.rating == 'error':
-                        self.logger.debug('ResultObject had error status. Changing text to include message')
-                        text = '{} ({})'.format(text, resultObject.errorMessage or 'no Error Message')
-                        self.logger.debug('Text for result object: %s', text)
-                    newNode = ResultNode(name=text, resultObject=resultObject)
-
-                self.logger.debug('inserting node with name "%s" under "%s"', newNode.name, prevParentNodeObject.name)
-                prevParentNodeObject.insertChild(0, newNode)
-                self.insertRows(0, 1, prevParentIndex)
-                self.logger.debug('searching for text "%s" again', newNode.name)
-                prevParentIndex = self.findIndexByName(text, prevParentIndex)
-                if prevParentIndex is None:
-                    self.logger.error('Searched for "%s" but did not find it. ', newNode.name)
-                else:
-                    node = self.getNode(prevParentIndex)
-                    self.logger.debug('Found node with name "%s"', node.name)
-                    if newNode.name == node.name:
-                        self.logger.debug('Names Match, everything ok')
+        rootNode = self.getNode(parent)
+        lowestLevel = len(self.groupBy) - 1
+
+        # New nodes below nodes of the model, by parent in order of their first appearance
+        pending = OrderedDict()
+        created = set()
+        count = 0
+
+        for resultObject in resultObjects:
+            parentNode = rootNode
+            for levelNr, level in enumerate(self.groupBy):
+                text=getattr(resultObject, level)
+                node = parentNode.childByName(text)
+                if node is None and parentNode not in created:
+                    node = pending.get(parentNode, {}).get(text)
+
+                if node is None:
+                    if levelNr < lowestLevel:
+                        node = Node(text)
+                    else:   #That means, we reached the lowest level of the hierarchy
+                        if resultObject.rating == 'error':
+                            text = '{} ({})'.format(text, resultObject.errorMessage or 'no Error Message')
+                        node = ResultNode(name=text, resultObject=resultObject)
+                        count += 1
+
+                    if parentNode in created:
+                        parentNode.addChild(node)
                     else:
-                        self.logger.error('Names do not Match. Tree Hierarchy is wrong')
+                        pending.setdefault(parentNode, OrderedDict()).setdefault(text, node)
+                    created.add(node)
+
+                parentNode = node
+
+        for parentNode, children in pending.items():
+            if parentNode is rootNode:
+                parentIndex = parent
             else:
-                self.logger.debug('Node with text "%s" found. Using it as new Root Node', text)
-                prevParentIndex=newParentIndex
-                self.logger.debug('Hierarchy: \n%s', self.getNode(prevParentIndex).log())
+                parentIndex = self.createIndex(parentNode.row(), 0, parentNode)
 
+            position = parentNode.childCount()
+            self.beginInsertRows(parentIndex, position, position + len(children) - 1)
+            for node in children.values():
+                parentNode.addChild(node)
+            self.endInsertRows()
 
-        return success
+        return count
 
 
     def removeRows(self, position:int, rows:int, parent:QtCore.QModelIndex=QtCore.QModelIndex()):
@@ -326,89 +393,507 @@ class ResultTreeModel(QtCore.QAbstractItemModel):
     def groupBy(self, groupBy):
         self._groupBy = groupBy
 
+
+class StoredResultNode(ResultNode):
+    """ Result node of a stored result, the result object is loaded from the store on first access """
+
+    def __init__(self, name, store, resultId:int, parent=None):
+        super().__init__(name, None, parent)
+        self._store = store
+        self.resultId = resultId
+
+    @property
+    def resultObject(self):
+        if self._resultObject is None:
+            self._resultObject = self._store.loadResult(self.resultId)
+        return self._resultObject
+
+    @resultObject.setter
+    def resultObject(self, resObj):
+        self._resultObject = resObj
+
+
+class StoredResultTreeModel(ResultTreeModel):
+    """ Results Tree Model for a run of the result store
+
+    The levels of the tree are read from the store when a node is expanded, the results of the lowest level in
+    portions of fetchSize. Nodes that weren't expanded yet don't use any memory.
+
+    :param store: The ResultStore
+    :param runId: The id of the run that is displayed
+    :param fetchSize: Number of results that are read at once for the lowest level
+    """
+
+    def __init__(self, store, runId:int, header, groupBy, fetchSize:int=500, parent=None):
+        super().__init__(header=header, groupBy=groupBy, parent=parent)
+        self._store = store
+        self.runId = runId
+        self.fetchSize = fetchSize
+
+        # Group values that lead to a node and the number of results that were read, by node
+        self._filters = {self._rootNode: dict()}
+        self._fetched = dict()
+
+    def _level(self, node)->int:
+        return len(self._filters[node])
+
+    def _isComplete(self, node)->bool:
+        return self._fetched.get(node) is True
+
+    def hasChildren(self, parent:QtCore.QModelIndex=QtCore.QModelIndex())->bool:
+        node = self.getNode(parent)
+        if node.typeInfo() == 'RESULT':
+            return False
+        return not self._isComplete(node) or node.childCount() > 0
+
+    def canFetchMore(self, parent:QtCore.QModelIndex)->bool:
+        node = self.getNode(parent)
+        return node.typeInfo() != 'RESULT' and not self._isComplete(node)
+
+    def fetchMore(self, parent:QtCore.QModelIndex):
+        node = self.getNode(parent)
+        if not self.canFetchMore(parent):
+            return
+
+        filters = self._filters[node]
+        level = self._level(node)
+        attribute = self.groupBy[level]
+
+        if level < len(self.groupBy) - 1:
+            children = []
+            for value, count in self._store.groups(self.runId, attribute, filters):
+                child = Node(value)
+                self._filters[child] = dict(filters, **{attribute: value})
+                children.append(child)
+            self._fetched[node] = True
+        else:
+            offset = self._fetched.get(node) or 0
+            key = GROUP_COLUMNS[attribute].name
+            results = self._store.results(self.runId, filters, offset=offset, limit=self.fetchSize)
+            children = []
+            for stored in results:
+                text = stored[key]
+                if stored['rating'] == 'error':
+                    text = '{} ({})'.format(text, stored['error_message'] or 'no Error Message')
+                child = StoredResultNode(text, self._store, stored['id'])
+                self._filters[child] = dict(filters, **{attribute: stored[key]})
+                children.append(child)
+            self._fetched[node] = True if len(results) < self.fetchSize else offset + len(results)
+
+        if children:
+            position = node.childCount()
+            self.beginInsertRows(parent, position, position + len(children) - 1)
+            for child in children:
+                node.addChild(child)
+            self.endInsertRows()
+
+
+def table_column(rows, name)->list:
+    """ The values of a column of the rows of a result
+
+    ColumnarTables and StoredRows return their column directly, for a list of dictionaries the column is collected.
+    """
+
+    if isinstance(rows, (ColumnarTable, StoredRows)):
+        if name not in rows.headers:
+            return [None] * len(rows)
+        return rows.column(name)
+    return [row.get(name) for row in rows]
+
+
+def sorted_rows(values:list, rows:list, descending:bool=False)->list:
+    """ Sort row numbers by the values of a column
+
+    The sort is stable, None is sorted after all other values. If numpy is installed and the values are of a single
+    basic type, the sort is done by numpy.
+
+    :param values: The column values of all rows
+    :param rows: The row numbers that are sorted
+    :param descending: Sort in descending order
+
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is not None and rows:
+        selected = numpy.asarray([values[row] for row in rows])
+        if selected.dtype.kind in 'biufUM':
+            if descending:
+                positions = (len(rows) - 1 - numpy.argsort(selected[::-1], kind='stable'))[::-1]
+            else:
+                positions = numpy.argsort(selected, kind='stable')
+            return numpy.asarray(rows)[positions].tolist()
+
+    present = [row for row in rows if values[row] is not None]
+    missing = [row for row in rows if values[row] is None]
+    try:
+        present.sort(key=values.__getitem__, reverse=descending)
+    except TypeError:
+        present.sort(key=lambda row: str(values[row]), reverse=descending)
+    return present + missing
+
+
+def arrange_rows(rows, columns:list, sortColumn:str=None, descending:bool=False, filterText:str=None,
+                 filterColumn:str=None)->list:
+    """ Filter and sort the rows of a result
+
+    :param rows: The rows of the result, a list of dictionaries, a ColumnarTable or StoredRows
+    :param columns: The technical names of the displayed columns
+    :param sortColumn: The column that is sorted by, None keeps the order of the rows
+    :param descending: Sort in descending order
+    :param filterText: Only rows that contain the text, case insensitive, are kept
+    :param filterColumn: The column the filter text is searched in, all displayed columns if None
+    :return: The row numbers in the order they are displayed
+
+    """
+
+    selected = list(range(len(rows)))
+
+    if filterText:
+        needle = filterText.lower()
+        searched = [filterColumn] if filterColumn else columns
+        if isinstance(rows, StoredRows):
+            searched = rows.columns([column for column in searched if column in rows.headers])
+        else:
+            searched = [table_column(rows, column) for column in searched]
+        selected = [row for row, values in enumerate(zip(*searched))
+                    if any(value is not None and needle in str(value).lower() for value in values)]
+
+    if sortColumn is not None:
+        selected = sorted_rows(table_column(rows, sortColumn), selected, descending)
+
+    return selected
+
+
 class ResultTableModel(QtCore.QAbstractTableModel):
     """ The Table Model for the Results Details
 
+    The rows of the result are added in portions of fetchSize while the view scrolls, using canFetchMore and
+    fetchMore. Rows of stored results are read from the result store page by page. Sorting and filtering is done on
+    a thread of the global thread pool, the view is updated once the new row order is available.
 
     """
 
-    def __init__(self, resultObject):
-        """ Initialize Tesult Table Model
+    #: Emitted when a sort or filter finished and the model shows the new row order
+    arranged = QtCore.pyqtSignal()
+
+    def __init__(self, resultObject, fetchSize:int=None):
+        """ Initialize Result Table Model
 
 
         :param resultObject: The result object of the check
+        :param fetchSize: Number of rows added at once, app.results.fetch_size of settings.ini by default
 
         """
         super().__init__()
+        self.logger = logging.getLogger(self.__class__.__name__)
         self._resultObject = resultObject
+        self._rows = resultObject.result
+        self._columns = list(resultObject.resultDefinition.keys())
+        self._headers = list(resultObject.resultDefinition.values())
+
+        if fetchSize is None:
+            fetchSize = CONFIG['application'].getint('app.results.fetch_size', fallback=1000)
+        self.fetchSize = max(1, fetchSize)
+
+        # Row numbers of the result in the displayed order or None, if all rows are displayed in their order
+        self._order = None
+        self._windows = OrderedDict()
+        self._loaded = min(self.fetchSize, len(self._rows))
+
+        self._sortColumn = None
+        self._descending = False
+        self._filterText = None
+        self._filterColumn = None
+
+        self._executor = ThreadExecutor(self)
+        self._watcher = None
+        self._arrangement = 0
+
+    def _visibleCount(self)->int:
+        if self._order is None:
+            return len(self._rows)
+        return len(self._order)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._loaded < self._visibleCount()
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        count = min(self.fetchSize, self._visibleCount() - self._loaded)
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
 
-    def rowCount(self, parent=None):
-        return len(self._resultObject.result)
+    def value(self, row:int, column:int):
+        """ The value of a displayed cell """
 
-    def columnCount(self, parent=None):
-        colCount = len(list(self._resultObject.resultDefinition.keys()))
-        return colCount
+        columnName = self._columns[column]
 
-    def data(self, index, role):
+        if self._order is not None:
+            if isinstance(self._rows, StoredRows):
+                return self._storedRow(row).get(columnName)
+            row = self._order[row]
 
-        if index.isValid():
+        if isinstance(self._rows, ColumnarTable):
+            if columnName not in self._rows.headers:
+                return None
+            return self._rows.value(row, columnName)
+        return self._rows[row].get(columnName)
+
+    def _storedRow(self, row:int)->dict:
+        """ A displayed row of a sorted or filtered stored result
+
+        The rows of a portion of fetchSize displayed rows are read together, since they are scattered over the pages of
+        the stored result.
+        """
+
+        window, offset = divmod(row, self.fetchSize)
+        rows = self._windows.get(window)
+        if rows is None:
+            start = window * self.fetchSize
+            rows = self._rows.take(self._order[start:start + self.fetchSize])
+            self._windows[window] = rows
+            if len(self._windows) > 4:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(window)
+        return rows[offset]
 
-            col=index.column()
-            row = index.row()
-            columns = list(self._resultObject.resultDefinition.keys())
-            columnName = columns[col]
+    def data(self, index, role=QtCore.Qt.DisplayRole):
 
+        if index.isValid():
             if role == QtCore.Qt.DisplayRole:
-                relevant_result = self._resultObject.result[row]
-                value = relevant_result.get(columnName)
-                return value
+                return self.value(index.row(), index.column())
 
     def flags(self, index):
         if not index.isValid():
-            return None
+            return QtCore.Qt.NoItemFlags
         return QtCore.Qt.ItemIsEnabled
 
-    def headerData(self, col, orientation, role):
+    def headerData(self, col, orientation, role=QtCore.Qt.DisplayRole):
         if orientation == QtCore.Qt.Horizontal and role==QtCore.Qt.DisplayRole:
-            columns = list(self._resultObject.resultDefinition.values())
-            return columns[col]
+            return self._headers[col]
+
+    def sort(self, column:int, order=QtCore.Qt.AscendingOrder):
+        """ Sort by a column in the background, a column < 0 restores the order of the result """
+
+        self._sortColumn = self._columns[column] if 0 <= column < len(self._columns) else None
+        self._descending = order == QtCore.Qt.DescendingOrder
+        self._arrange()
+
+    def setFilter(self, text:str, column:int=None):
+        """ Only display rows that contain the text
+
+        :param text: The text, compared case insensitive. An empty text removes the filter.
+        :param column: The column the text is searched in, all columns if None
+        """
+
+        self._filterText = text or None
+        self._filterColumn = self._columns[column] if column is not None else None
+        self._arrange()
+
+    def isArranging(self)->bool:
+        """ True while a sort or filter is running in the background """
+        return self._watcher is not None
+
+    def _arrange(self):
+        self._arrangement += 1
+        arrangement = self._arrangement
+
+        if self._sortColumn is None and self._filterText is None:
+            self._watcher = None
+            self._applyOrder(arrangement, None)
+            return
+
+        future = self._executor.submit(arrange_rows, self._rows, self._columns, self._sortColumn, self._descending,
+                                       self._filterText, self._filterColumn)
+        self._watcher = FutureWatcher(future, parent=self)
+        self._watcher.resultReady.connect(lambda order: self._applyOrder(arrangement, order))
+        self._watcher.exceptionReady.connect(
+            lambda err: self.logger.error('sorting or filtering the result failed: %s', err))
+
+    def _applyOrder(self, arrangement:int, order):
+        if arrangement != self._arrangement:
+            # A later sort or filter was started meanwhile
+            return
+
+        self._watcher = None
+        self.beginResetModel()
+        self._order = order
+        self._windows.clear()
+        self._loaded = min(self.fetchSize, self._visibleCount())
+        self.endResetModel()
+        self.arranged.emit()
+
 
 class ResultHandler(QtCore.QObject):
     """ Result Handler for Checks
 
     The result handler processes incoming check results.
+
+    When checks run concurrently, results arrive faster than a view can repaint. Incoming results are therefore
+    buffered and passed on in batches, either when the batch interval elapsed or the batch size is reached. The
+    tree models built by the handler insert a batch with a single insert per parent node.
+
+    :param batchInterval: Milliseconds results are buffered, 0 passes every result on immediately
+    :param batchSize: Number of buffered results after which the buffer is flushed without waiting for the interval
+
+    If not specified, app.results.batch_interval and app.results.batch_size of settings.ini are used.
+
+    :param store: A ResultStore. Every flushed batch is written to the store, all results until newRun is called
+                  belong to the same run. The batches are written one after the other by a single background thread,
+                  so that large results don't block the GUI. resultsStored_signal is emitted with the id of the run
+                  after each batch.
     """
 
     resultAdd_signal = QtCore.pyqtSignal('PyQt_PyObject')
     resultAdded_signal = QtCore.pyqtSignal('PyQt_PyObject')
+    resultsAdded_signal = QtCore.pyqtSignal('PyQt_PyObject')
     resultInitialize_signal = QtCore.pyqtSignal('PyQt_PyObject')
+    resultsStored_signal = QtCore.pyqtSignal('PyQt_PyObject')
 
-    def __init__(self):
+    def __init__(self, batchInterval:int=None, batchSize:int=None, store=None):
         super().__init__()
         self.__results=[]
         self.resultAdd_signal.connect(self.addResult)
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        config = CONFIG['application']
+        if batchInterval is None:
+            batchInterval = config.getint('app.results.batch_interval', fallback=100)
+        if batchSize is None:
+            batchSize = config.getint('app.results.batch_size', fallback=500)
+
+        self.batchInterval = max(0, batchInterval)
+        self.batchSize = max(1, batchSize)
+        self._pending = []
+
+        self._flushTimer = QtCore.QTimer(self)
+        self._flushTimer.setSingleShot(True)
+        self._flushTimer.timeout.connect(self.flush)
+
+        self.store = store
+        self._runId = None
+
+        # A single thread writes to the store, so that the batches are stored in the order they were flushed
+        self._storeThreadPool = QtCore.QThreadPool(self)
+        self._storeThreadPool.setMaxThreadCount(1)
+        self._storeExecutor = ThreadExecutor(self, threadPool=self._storeThreadPool)
+        self._storeFuture = None
+
+    @property
+    def runId(self):
+        """ The id of the run the results are stored in, the results that are being stored are waited for """
+        self.waitForStore()
+        return self._runId
 
     def addResult(self, result):
         """ Add a Check Result
 
         :param result: The result object of a check """
 
+        self._pending.append(result)
+
+        if self.batchInterval == 0 or len(self._pending) >= self.batchSize:
+            self.flush()
+        elif not self._flushTimer.isActive():
+            self._flushTimer.start(self.batchInterval)
+
+    def flush(self):
+        """ Pass the buffered results on
+
+        resultsAdded_signal is emitted once with the list of results, resultAdded_signal for every single result.
+        """
+
+        self._flushTimer.stop()
+        if not self._pending:
+            return
+
+        results = self._pending
+        self._pending = []
+
+        if self.store is not None:
+            self.storeResults(results)
 
-#        self.__results.append(result)
-        self.resultAdded_signal.emit(result)
+        self.resultsAdded_signal.emit(results)
+        for result in results:
+            self.resultAdded_signal.emit(result)
 
+    def storeResults(self, results:list):
+        """ Write results to the store in the background, a new run is started for the first results
+
+        :return: The Future of the write
+        """
+
+        self._storeFuture = self._storeExecutor.submit(self._storeBatch, results)
+        return self._storeFuture
+
+    def _storeBatch(self, results:list):
+        """ Executed by the store thread. Failures are logged only, the results are still displayed. """
+
+        try:
+            if self._runId is None:
+                self._runId = self.store.startRun()
+            self.store.addResults(self._runId, results)
+        except Exception:
+            self.logger.exception('storing %i results failed', len(results))
+            return
+
+        self.resultsStored_signal.emit(self._runId)
+
+    def _endRun(self):
+        self._runId = None
+
+    def waitForStore(self, timeout:float=None):
+        """ Wait until the flushed results are written to the store
+
+        :param timeout: Maximum number of seconds to wait, wait forever if None
+        """
+
+        if self._storeFuture is not None:
+            concurrent.futures.wait([self._storeFuture], timeout=timeout)
+
+    def newRun(self):
+        """ Results added from now on belong to a new run of the store """
+        self.flush()
+        if self.store is not None:
+            self._storeFuture = self._storeExecutor.submit(self._endRun)
+
+    def pendingCount(self)->int:
+        """ Number of results that are buffered """
+        return len(self._pending)
 
     def buildTreeModel(self, groupBy=None):
         if groupBy is None:
             groupBy=['rating', 'checkName', 'systeminfo']
         model = ResultTreeModel(header=['Results Overview'], groupBy=groupBy)
-        self.resultAdded_signal.connect(model.insertResult)
+        self.resultsAdded_signal.connect(model.insertResults)
 #        for result in self.__results:
 #            model.insertResult(result)
         return model
 
+    def buildStoredTreeModel(self, runId:int, groupBy=None):
+        """ Build a tree model of a stored run that reads the results from the store on demand """
+        if groupBy is None:
+            groupBy=['rating', 'checkName', 'systeminfo']
+        return StoredResultTreeModel(self.store, runId, header=['Results Overview'], groupBy=groupBy)
+
     def buildResultTableModel(self, resultObject):
         self.logger.debug('Building Table Model for result object: %s', pformat(resultObject))
         model = ResultTableModel(resultObject)
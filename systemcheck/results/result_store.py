@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+
+""" Persistent Result Store
+
+The results of the executed checks are written to a database, by default the SQLite database configured in the
+section results-db of settings.ini. Results are grouped in runs. Queries are restricted to a run and filter on the
+indexed columns system, check name and rating, so the overview of a run can be built without reading the detail rows.
+The detail rows of a result are read page by page when they are accessed.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+import datetime
+import json
+import logging
+import os
+from typing import Union
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from systemcheck.config import CONFIG
+from systemcheck.results.models import ResultBase, ResultRun, StoredResult, StoredResultRow
+from systemcheck.utils import ColumnarTable
+
+
+#: Attributes of an ActionResult that can be used to group results and the column they are stored in
+GROUP_COLUMNS = {'rating': StoredResult.__table__.c.rating,
+                 'checkName': StoredResult.__table__.c.check_name,
+                 'systeminfo': StoredResult.__table__.c.system}
+
+
+def result_headers(resultObject)->list:
+    """ The technical names of the result columns in the order they are stored """
+
+    headers = list(resultObject.resultDefinition.keys())
+    if headers:
+        return headers
+
+    result = resultObject.result
+    if isinstance(result, ColumnarTable):
+        return list(result.headers)
+    if result and isinstance(result[0], Mapping):
+        return list(result[0].keys())
+    return []
+
+
+def encode_rows(result, headers:list):
+    """ Generate the JSON encoded values of every row in the order of the headers """
+
+    if isinstance(result, ColumnarTable):
+        columns = [result.column(header) if header in result.headers else [None] * len(result) for header in headers]
+        rows = zip(*columns)
+    else:
+        rows = ([row.get(header) for header in headers] for row in result)
+
+    for row in rows:
+        yield json.dumps(list(row), default=str)
+
+
+class StoredRows(Sequence):
+    """ The detail rows of a stored result
+
+    Rows are returned as dictionaries like the rows of an ActionResult. They are read from the store page by page, the
+    most recently used pages are kept.
+
+    """
+
+    def __init__(self, store, resultId:int, headers:list, count:int, pageSize:int=None, cachedPages:int=4):
+        self._store = store
+        self._resultId = resultId
+        self._headers = list(headers)
+        self._count = count
+        self._pageSize = pageSize or store.pageSize
+        self._cachedPages = cachedPages
+        self._pages = OrderedDict()
+
+    @property
+    def headers(self)->list:
+        return self._headers
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[row] for row in range(*item.indices(self._count))]
+
+        if item < 0:
+            item += self._count
+        if item < 0 or item >= self._count:
+            raise IndexError('row {} out of range'.format(item))
+
+        pageNr, offset = divmod(item, self._pageSize)
+        return self._page(pageNr)[offset]
+
+    def column(self, name)->list:
+        """ Return the values of a column, all rows are read from the store """
+        return self.columns([name])[0]
+
+    def columns(self, names:list)->list:
+        """ Return the values of several columns, the rows are read from the store once """
+        return self._store.columns(self._resultId, [self._headers.index(name) for name in names])
+
+    def take(self, rowNumbers:list)->list:
+        """ Return the rows with the specified row numbers in the specified order """
+        return self._store.rowsAt(self._resultId, rowNumbers, headers=self._headers)
+
+    def _page(self, pageNr:int)->list:
+        page = self._pages.get(pageNr)
+        if page is not None:
+            self._pages.move_to_end(pageNr)
+            return page
+
+        page = self._store.rows(self._resultId, pageNr * self._pageSize, self._pageSize, headers=self._headers)
+        self._pages[pageNr] = page
+        if len(self._pages) > self._cachedPages:
+            self._pages.popitem(last=False)
+        return page
+
+
+class ResultStore:
+    """ Database of check results
+
+    :param url: SQLAlchemy database url, an in memory SQLite database by default
+    :param engine: An existing engine, takes precedence over the url
+    :param pageSize: Number of detail rows that are read at once
+
+    """
+
+    #: Maximum number of values in an IN clause, SQLite supports 999 parameters per statement
+    IN_CLAUSE_SIZE = 500
+
+    def __init__(self, url:str='sqlite://', engine=None, pageSize:int=1000):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        if engine is None:
+            if url in ('sqlite://', 'sqlite:///:memory:'):
+                # Tables are sorted and filtered on worker threads, which have to see the same in memory database
+                engine = create_engine(url, poolclass=StaticPool, connect_args={'check_same_thread': False})
+            else:
+                engine = create_engine(url)
+        self.engine = engine
+        self.pageSize = pageSize
+        ResultBase.metadata.create_all(self.engine)
+
+        self._runs = ResultRun.__table__
+        self._results = StoredResult.__table__
+        self._rows = StoredResultRow.__table__
+
+    @classmethod
+    def fromConfig(cls, config=None)->Union['ResultStore', None]:
+        """ Create the store configured in the section results-db
+
+        The engine is created like the engine of the systems database, so the sqlite.<pragma> options apply. Results
+        are written by a worker thread while the GUI reads stored runs.
+
+        :return: The store or None, if the store is disabled
+        """
+
+        # Imported here, importing the session creates the tables of all models that are defined at that time
+        from systemcheck.session import create_engine_from_config
+
+        if config is None:
+            config = CONFIG['results-db'] if CONFIG.has_section('results-db') else {}
+
+        if not config or str(config.get('enable', 'false')).lower() not in ('true', 'yes', 'on', '1'):
+            return None
+
+        dbconfig = {key: value for key, value in config.items() if key.startswith(('sqlalchemy.', 'sqlite.'))}
+        dbpath = os.path.join(CONFIG['application']['absolute_path'], config.get('dbname', 'results.sqlite'))
+        dbconfig['sqlalchemy.url'] = dbconfig['sqlalchemy.url'].replace('{dbpath}', dbpath)
+        return cls(engine=create_engine_from_config(dbconfig), pageSize=int(config.get('page_size', 1000)))
+
+    def startRun(self, description:str=None)->int:
+        """ Start a new run and return its id """
+
+        with self.engine.begin() as connection:
+            result = connection.execute(self._runs.insert().values(started=datetime.datetime.now(),
+                                                                   description=description))
+            return result.inserted_primary_key[0]
+
+    def addResults(self, runId:int, resultObjects:list)->list:
+        """ Store ActionResults in a single transaction
+
+        :param runId: The id of the run the results belong to
+        :param resultObjects: The ActionResults
+        :return: The ids of the stored results
+
+        """
+
+        ids = []
+        with self.engine.begin() as connection:
+            for resultObject in resultObjects:
+                headers = result_headers(resultObject)
+                definition = [[header, resultObject.resultDefinition.get(header, header)] for header in headers]
+                rows = resultObject.result or []
+
+                message = resultObject.message
+                inserted = connection.execute(self._results.insert().values(
+                    run_id=runId,
+                    system=resultObject.systeminfo,
+                    check_name=resultObject.checkName,
+                    rating=resultObject.rating,
+                    timestamp=resultObject.timestamp,
+                    error_message=resultObject.errorMessage,
+                    message=message if message else None,
+                    result_definition=json.dumps(definition),
+                    row_count=len(rows)))
+                resultId = inserted.inserted_primary_key[0]
+                ids.append(resultId)
+
+                if rows:
+                    connection.execute(self._rows.insert(),
+                                       [dict(result_id=resultId, row_nr=rowNr, data=data)
+                                        for rowNr, data in enumerate(encode_rows(rows, headers))])
+
+        self.logger.debug('stored %i results in run %s', len(ids), runId)
+        return ids
+
+    def runs(self)->list:
+        """ All runs, the latest first, as dictionaries with id, started, description and results """
+
+        query = select([self._runs.c.id, self._runs.c.started, self._runs.c.description,
+                        func.count(self._results.c.id).label('results')]) \
+            .select_from(self._runs.outerjoin(self._results)) \
+            .group_by(self._runs.c.id) \
+            .order_by(self._runs.c.started.desc(), self._runs.c.id.desc())
+
+        with self.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(query)]
+
+    def deleteRun(self, runId:int):
+        """ Delete a run including its results """
+
+        resultIds = select([self._results.c.id]).where(self._results.c.run_id == runId)
+        with self.engine.begin() as connection:
+            connection.execute(self._rows.delete().where(self._rows.c.result_id.in_(resultIds)))
+            connection.execute(self._results.delete().where(self._results.c.run_id == runId))
+            connection.execute(self._runs.delete().where(self._runs.c.id == runId))
+
+    def _filtered(self, query, runId:int, filters:dict):
+        query = query.where(self._results.c.run_id == runId)
+        for attribute, value in (filters or {}).items():
+            query = query.where(GROUP_COLUMNS[attribute] == value)
+        return query
+
+    def groups(self, runId:int, attribute:str, filters:dict=None)->list:
+        """ The distinct values of a group attribute and the number of results per value
+
+        :param runId: The run
+        :param attribute: The ActionResult attribute, one of GROUP_COLUMNS
+        :param filters: Values of other group attributes the results have to match
+        :return: A list of tuples (value, number of results) in the order the values first occurred
+
+        """
+
+        column = GROUP_COLUMNS[attribute]
+        query = self._filtered(select([column, func.count(), func.min(self._results.c.id).label('first')]),
+                               runId, filters).group_by(column).order_by('first')
+
+        with self.engine.connect() as connection:
+            return [(row[0], row[1]) for row in connection.execute(query)]
+
+    def results(self, runId:int, filters:dict=None, offset:int=0, limit:int=None)->list:
+        """ The results of a run without their detail rows
+
+        :return: A list of dictionaries with id, system, check_name, rating, error_message and row_count
+        """
+
+        columns = [self._results.c.id, self._results.c.system, self._results.c.check_name, self._results.c.rating,
+                   self._results.c.error_message, self._results.c.row_count]
+        query = self._filtered(select(columns), runId, filters).order_by(self._results.c.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        with self.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(query)]
+
+    def rows(self, resultId:int, offset:int=0, limit:int=None, headers:list=None)->list:
+        """ Detail rows of a result as dictionaries
+
+        :param headers: The technical column names. Read from the result definition if not specified.
+        """
+
+        if headers is None:
+            headers = [header for header, description in self._definition(resultId)]
+
+        query = select([self._rows.c.data]).where(self._rows.c.result_id == resultId) \
+            .where(self._rows.c.row_nr >= offset).order_by(self._rows.c.row_nr)
+        if limit is not None:
+            query = query.where(self._rows.c.row_nr < offset + limit)
+
+        with self.engine.connect() as connection:
+            return [dict(zip(headers, json.loads(row[0]))) for row in connection.execute(query)]
+
+    def rowsAt(self, resultId:int, rowNumbers:list, headers:list=None)->list:
+        """ Detail rows of a result as dictionaries in the order of the row numbers """
+
+        if headers is None:
+            headers = [header for header, description in self._definition(resultId)]
+
+        rows = dict()
+        with self.engine.connect() as connection:
+            for start in range(0, len(rowNumbers), self.IN_CLAUSE_SIZE):
+                chunk = rowNumbers[start:start + self.IN_CLAUSE_SIZE]
+                query = select([self._rows.c.row_nr, self._rows.c.data]) \
+                    .where(self._rows.c.result_id == resultId).where(self._rows.c.row_nr.in_(chunk))
+                rows.update(connection.execute(query).fetchall())
+
+        return [dict(zip(headers, json.loads(rows[rowNr]))) for rowNr in rowNumbers]
+
+    def columns(self, resultId:int, positions:list)->list:
+        """ Values of several columns of a result
+
+        :param positions: The positions of the columns in the result definition
+        :return: A list of values per position
+
+        """
+
+        columns = [[] for position in positions]
+        query = select([self._rows.c.data]).where(self._rows.c.result_id == resultId).order_by(self._rows.c.row_nr)
+        with self.engine.connect() as connection:
+            for row in connection.execute(query):
+                values = json.loads(row[0])
+                for column, position in zip(columns, positions):
+                    column.append(values[position])
+        return columns
+
+    def _definition(self, resultId:int)->list:
+        with self.engine.connect() as connection:
+            definition = connection.execute(select([self._results.c.result_definition])
+                                            .where(self._results.c.id == resultId)).scalar()
+        return json.loads(definition) if definition else []
+
+    def loadResult(self, resultId:int):
+        """ Recreate the ActionResult of a stored result
+
+        The detail rows aren't read, the result attribute is a StoredRows sequence that reads them on access.
+        """
+
+        from systemcheck.plugins import ActionResult
+
+        with self.engine.connect() as connection:
+            stored = connection.execute(self._results.select().where(self._results.c.id == resultId)).first()
+        if stored is None:
+            raise KeyError(resultId)
+
+        resultObject = ActionResult()
+        resultObject.checkName = stored.check_name
+        resultObject.systeminfo = stored.system
+        resultObject.rating = stored.rating
+        resultObject.errorMessage = stored.error_message
+        resultObject.message = stored.message or False
+        resultObject.timestamp = stored.timestamp
+
+        definition = json.loads(stored.result_definition) if stored.result_definition else []
+        resultObject.resultDefinition = OrderedDict((header, description) for header, description in definition)
+        resultObject.result = StoredRows(self, resultId, [header for header, description in definition],
+                                         stored.row_count)
+        return resultObject
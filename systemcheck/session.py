@@ -1,9 +1,14 @@
 import systemcheck
 from marshmallow_sqlalchemy import ModelConversionError, ModelSchema
 import os
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
 from systemcheck import models
 from systemcheck.config import CONFIG
 
+#: PRAGMAs that can be configured as sqlite.<pragma> in the database sections of settings.ini, in execution order
+SQLITE_PRAGMAS = ('busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
 
 def setup_schema(Base, session):
     # Create a function which incorporates the Base and session information
@@ -32,12 +37,63 @@ def setup_schema(Base, session):
 
     return setup_schema_fn
 
+def sqlite_pragmas(dbconfig:dict)->list:
+    """ The PRAGMA statements for the sqlite.<pragma> options of a database section
+
+    :param dbconfig: The options of the database section
+    """
+
+    pragmas = []
+    for pragma in SQLITE_PRAGMAS:
+        value = str(dbconfig.get('sqlite.{}'.format(pragma), '')).strip()
+        if value:
+            pragmas.append('PRAGMA {}={}'.format(pragma, value))
+    return pragmas
+
+
+def setup_sqlite(pragmas:list):
+    # Create a function that applies the PRAGMAs to every new DBAPI connection. Most of them are per connection
+    # settings, journal_mode=WAL is persisted in the database file.
+    def setup_sqlite_fn(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return setup_sqlite_fn
+
+
+def create_engine_from_config(dbconfig:dict):
+    """ Create the engine for a database section of settings.ini
+
+    File based SQLite databases are opened with a pool of connections that can be used by worker threads. With
+    journal_mode=WAL readers don't block the writer and the writer doesn't block readers. The sqlite.<pragma> options
+    are applied to every connection of the pool.
+
+    :param dbconfig: The options of the database section, sqlalchemy.url has to be resolved already
+    """
+
+    url = make_url(dbconfig['sqlalchemy.url'])
+    if url.get_backend_name() != 'sqlite':
+        return models.meta.base.engine_from_config(dbconfig)
+
+    kwargs = {}
+    if url.database not in (None, '', ':memory:'):
+        kwargs = dict(poolclass=QueuePool, connect_args={'check_same_thread': False})
+
+    engine = models.meta.base.engine_from_config(dbconfig, **kwargs)
+    pragmas = sqlite_pragmas(dbconfig)
+    if pragmas:
+        models.meta.event.listen(engine, 'connect', setup_sqlite(pragmas))
+    return engine
+
+
 dbconfig=dict(CONFIG['systems-db'])
 dbpath=os.path.join(CONFIG['application']['absolute_path'], dbconfig['dbname'])
 dbconfig['sqlalchemy.url']=r'{}'.format(dbconfig['sqlalchemy.url'].replace('{dbpath}', dbpath))
 # The session is initialized with expire_on_commit to prevent problems with expired nodes in the QTreeAbstractItemModel
 # after a commit.
-engine = models.meta.base.engine_from_config(dbconfig)
+engine = create_engine_from_config(dbconfig)
 session_factory = models.meta.base.sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
 SESSION = models.meta.base.scoped_session(session_factory)
 
@@ -33,7 +33,7 @@ class ActionAbapManualCheck__params(QtModelMixin, Base, BaseMixin, TableNameMixi
                         qt_label='Manual Action',
                         )
 
-    check = relationship("ActionAbapCountTableEntries", back_populates="params")
+    check = relationship(plugin_name, back_populates="params")
 
 
     __qtmap__ = [param_set_name, description]
@@ -2,7 +2,7 @@ import logging
 from pprint import pformat
 import systemcheck
 from systemcheck.systems import ABAP
-from systemcheck.utils import Result
+from systemcheck.utils import Result, ColumnarTable
 
 class ActionAbapFoundation(systemcheck.plugins.ActionBasePlugin):
     """ ABAP Foundation Plugin
@@ -135,7 +135,7 @@ class ActionAbapSUIM(ActionAbapCheck):
             elif 'W' in msg_types:
                 self.actionResult.rating = 'warning'
 
-        self.actionResult.result=fm_data.get(self.RETURNSTRUCTURE)
+        self.actionResult.result=ColumnarTable.fromRows(fm_data.get(self.RETURNSTRUCTURE, []))
 
 
         if len(self.actionResult.result)>0:
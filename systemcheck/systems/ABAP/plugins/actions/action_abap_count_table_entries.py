@@ -36,7 +36,7 @@ class ActionAbapCountTableEntriesAction(systemcheck.plugins.ActionAbapCheck):
 
     def retrieveData(self, **parameters):
 
-        result = self.systemConnection.download_table(**parameters)
+        result = self.systemConnection.count_table(**parameters)
         return result
 
 
@@ -53,18 +53,14 @@ class ActionAbapCountTableEntriesAction(systemcheck.plugins.ActionAbapCheck):
                         OPERATOR=self.operators.lookup(parameterSet.operator),
                         PARAMETERSET = parameterSet.param_set_name)
 
-            tab_fields=parameterSet.table_fields.split(';')
-
             result=self.retrieveData(tabname=record['TABLE'],
-                                     where_clause=record['WHERE_CLAUSE'],
-                                     tab_fields=tab_fields)
+                                     where_clause=record['WHERE_CLAUSE'])
             if not result.fail:
-                downloaded_data=result.data['data']
-                record['CONFIGURED']=len(downloaded_data)
+                record['CONFIGURED']=result.data
             else:
-                record['CONFIGURED']=result.fail
+                record['CONFIGURED']=result.message
                 record['RATING']='error'
-                self.actionResult.add_result(record)
+                self.actionResult.addResult(record)
                 self.actionResult.rating='error'
                 return Result(self.actionResult)
 
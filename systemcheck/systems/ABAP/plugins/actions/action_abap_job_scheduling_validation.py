@@ -6,7 +6,8 @@ from pprint import pformat
 
 from systemcheck.models.meta import Base, ChoiceType, Column, ForeignKey, Integer, QtModelMixin, String, qtRelationship, relationship, RichString
 from systemcheck.systems import ABAP
-from datetime import datetime
+from systemcheck.config import CONFIG
+from datetime import datetime, time
 
 """ 
 Plugin for Validating the scheduling of Jobs
@@ -68,100 +69,152 @@ class ActionAbapJobSchedulingValidationAction(systemcheck.plugins.ActionAbapChec
         result = self.systemConnection.btc_xbp_job_select(**parameters)
         return result
 
+    def _record(self, parameterSet)->dict:
+        """ Build the result record of a parameter set """
+
+        return dict(PARAMETERSET = parameterSet.param_set_name,
+                    EXPECTED = parameterSet.expected_count,
+                    OPERATOR = self.operators.lookup(parameterSet.operator),
+                    INTERVAL = parameterSet.interval,
+                    INTERVAL_TYPE = self.INTERVALS.get(parameterSet.interval_type),
+                    ABAPNAME = parameterSet.abapname,
+                    JOBNAME = parameterSet.sel_jobname,
+                    JOBCOUNT = parameterSet.sel_jobcount,
+                    JOBGROUP = parameterSet.sel_jobgroup,
+                    USERNAME = parameterSet.sel_username,
+                    NODATE = self.boolmapper(parameterSet.sel_no_date),
+                    WITH_PRED = self.boolmapper(parameterSet.sel_with_pred),
+                    EVENTID = parameterSet.sel_eventid,
+                    EVENTPARA = parameterSet.sel_eventpara,
+                    PRELIM =  self.boolmapper(parameterSet.sel_prelim),
+                    SCHEDUL =  self.boolmapper(parameterSet.sel_schedul),
+                    READY =  self.boolmapper(parameterSet.sel_ready),
+                    RUNNING =  self.boolmapper(parameterSet.sel_running),
+                    FINISHED =  self.boolmapper(parameterSet.sel_finished),
+                    ABORTED =  self.boolmapper(parameterSet.sel_aborted),
+                    )
+
+    def _selectionParameters(self, parameterSet)->dict:
+        """ Build the parameters of BAPI_XBP_JOB_SELECT without the time frame """
+
+        parameters = dict()
+        if parameterSet.abapname:
+            parameters['ABAPNAME']=parameterSet.abapname
+
+        parameters['JOB_SELECT_PARAM']=dict()
+        parameters['JOB_SELECT_PARAM']['JOBNAME'] = parameterSet.sel_jobname or '*'
+        parameters['JOB_SELECT_PARAM']['USERNAME'] = parameterSet.sel_username or '*'
+
+        if parameterSet.sel_jobcount:
+            parameters['JOB_SELECT_PARAM']['JOBCOUNT'] = parameterSet.sel_jobcount
+
+        if parameterSet.sel_jobgroup:
+            parameters['JOB_SELECT_PARAM']['JOBGROUP'] = parameterSet.sel_jobgroup
+
+
+        if parameterSet.sel_no_date:
+            parameters['JOB_SELECT_PARAM']['NODATE'] = self.boolmapper(parameterSet.sel_no_date)
+
+        if parameterSet.sel_with_pred:
+            parameters['JOB_SELECT_PARAM']['WITH_PRED'] = self.boolmapper(parameterSet.sel_with_pred)
+
+        if parameterSet.sel_eventid:
+            parameters['JOB_SELECT_PARAM']['EVENTID']=parameterSet.sel_eventid
+
+        if parameterSet.sel_eventpara:
+            parameters['JOB_SELECT_PARAM']['EVENTPARA'] = parameterSet.sel_eventpara
+
+        if parameterSet.sel_prelim:
+            parameters['JOB_SELECT_PARAM']['PRELIM'] = self.boolmapper(parameterSet.sel_prelim)
+
+        if parameterSet.sel_schedul:
+            parameters['JOB_SELECT_PARAM']['SCHEDUL'] = self.boolmapper(parameterSet.sel_schedul)
+
+        if parameterSet.sel_ready:
+            parameters['JOB_SELECT_PARAM']['READY'] =  self.boolmapper(parameterSet.sel_ready)
+
+        if parameterSet.sel_running:
+            parameters['JOB_SELECT_PARAM']['RUNNING'] =  self.boolmapper(parameterSet.sel_running)
+
+        if parameterSet.sel_finished:
+            parameters['JOB_SELECT_PARAM']['FINISHED'] = self.boolmapper(parameterSet.sel_finished)
+
+        if parameterSet.sel_aborted:
+            parameters['JOB_SELECT_PARAM']['ABORTED'] = self.boolmapper(parameterSet.sel_aborted)
+
+        return parameters
+
+    def _selectionWindow(self, parameterSet, basetime:datetime)->tuple:
+        """ Determine the time frame of a parameter set
+
+        If no time frame is specified, the time frame is calculated from the interval back from the system time.
+
+        :return: (start, end) as datetime objects. Open limits are represented by WINDOW_START and WINDOW_END.
+        """
+
+        if parameterSet.sel_from_date is None and \
+            parameterSet.sel_from_time is None and \
+            parameterSet.sel_to_date is None and \
+            parameterSet.sel_to_time is None:
+
+            self.logger.debug('No Time frame specified')
+            self.logger.debug('basetime: %s', pformat(basetime))
+            intervall = datecalc.getIntervalDate(parameterSet.interval, parameterSet.interval_type, basetime, '-')
+            self.logger.debug('interval border: %s', pformat(intervall))
+            return (intervall.replace(microsecond=0), basetime.replace(microsecond=0))
+
+        start = ABAP.utils.WINDOW_START
+        end = ABAP.utils.WINDOW_END
+        if parameterSet.sel_from_date is not None:
+            start = datetime.combine(parameterSet.sel_from_date, parameterSet.sel_from_time or time.min)
+        if parameterSet.sel_to_date is not None:
+            end = datetime.combine(parameterSet.sel_to_date, parameterSet.sel_to_time or time.max).replace(
+                microsecond=0)
+        return (start, end)
+
+    def _addError(self, parameterSets, message):
+        """ Add error records for parameter sets whose jobs could not be selected """
+
+        for parameterSet in parameterSets:
+            record = self._record(parameterSet)
+            record['CONFIGURED'] = message
+            record['RATING'] = 'error'
+            self.actionResult.addResult(record)
+        self.actionResult.rating = 'error'
+
     def execute(self):
 
         checkobj = self.checkObject
-        for parameterSet in checkobj.params:
-            record=dict(PARAMETERSET = parameterSet.param_set_name,
-                        EXPECTED = parameterSet.expected_count,
-                        OPERATOR = self.operators.lookup(parameterSet.operator),
-                        INTERVAL = parameterSet.interval,
-                        INTERVAL_TYPE = self.INTERVALS.get(parameterSet.interval_type),
-                        ABAPNAME = parameterSet.abapname,
-                        JOBNAME = parameterSet.sel_jobname,
-                        JOBCOUNT = parameterSet.sel_jobcount,
-                        JOBGROUP = parameterSet.sel_jobgroup,
-                        USERNAME = parameterSet.sel_username,
-                        NODATE = self.boolmapper(parameterSet.sel_no_date),
-                        WITH_PRED = self.boolmapper(parameterSet.sel_with_pred),
-                        EVENTID = parameterSet.sel_eventid,
-                        EVENTPARA = parameterSet.sel_eventpara,
-                        PRELIM =  self.boolmapper(parameterSet.sel_prelim),
-                        SCHEDUL =  self.boolmapper(parameterSet.sel_schedul),
-                        READY =  self.boolmapper(parameterSet.sel_ready),
-                        RUNNING =  self.boolmapper(parameterSet.sel_running),
-                        FINISHED =  self.boolmapper(parameterSet.sel_finished),
-                        ABORTED =  self.boolmapper(parameterSet.sel_aborted),
-                        )
-
-            parameters = dict()
-            if parameterSet.abapname:
-                parameters['ABAPNAME']=parameterSet.abapname
-
-            parameters['JOB_SELECT_PARAM']=dict()
-            parameters['JOB_SELECT_PARAM']['JOBNAME'] = parameterSet.sel_jobname or '*'
-            parameters['JOB_SELECT_PARAM']['USERNAME'] = parameterSet.sel_username or '*'
-
-            if parameterSet.sel_jobcount:
-                parameters['JOB_SELECT_PARAM']['JOBCOUNT'] = parameterSet.sel_jobcount
-
-            if parameterSet.sel_jobgroup:
-                parameters['JOB_SELECT_PARAM']['JOBGROUP'] = parameterSet.sel_jobgroup
-
-
-            if parameterSet.sel_no_date:
-                parameters['JOB_SELECT_PARAM']['NODATE'] = self.boolmapper(parameterSet.sel_no_date)
-
-            if parameterSet.sel_with_pred:
-                parameters['JOB_SELECT_PARAM']['WITH_PRED'] = self.boolmapper(parameterSet.sel_with_pred)
-
-            if parameterSet.sel_eventid:
-                parameters['JOB_SELECT_PARAM']['EVENTID']=parameterSet.sel_eventid
-
-            if parameterSet.sel_eventpara:
-                parameters['JOB_SELECT_PARAM']['EVENTPARA'] = parameterSet.sel_eventpara
-
-            if parameterSet.sel_prelim:
-                parameters['JOB_SELECT_PARAM']['PRELIM'] = self.boolmapper(parameterSet.sel_prelim)
-
-            if parameterSet.sel_schedul:
-                parameters['JOB_SELECT_PARAM']['SCHEDUL'] = self.boolmapper(parameterSet.sel_schedul)
-
-            if parameterSet.sel_ready:
-                parameters['JOB_SELECT_PARAM']['READY'] =  self.boolmapper(parameterSet.sel_ready)
-
-            if parameterSet.sel_running:
-                parameters['JOB_SELECT_PARAM']['RUNNING'] =  self.boolmapper(parameterSet.sel_running)
-
-            if parameterSet.sel_finished:
-                parameters['JOB_SELECT_PARAM']['FINISHED'] = self.boolmapper(parameterSet.sel_finished)
-
-            if parameterSet.sel_aborted:
-                parameters['JOB_SELECT_PARAM']['ABORTED'] = self.boolmapper(parameterSet.sel_aborted)
-
-            result = self.systemConnection.systemtime
-            if result.fail:
-                record['CONFIGURED'] = result.fail
-                record['RATING'] = 'error'
-                self.actionResult.addResult(record)
-                self.actionResult.rating = 'error'
-                return Result(self.actionResult)
-
-            if parameterSet.sel_from_date is None and \
-                parameterSet.sel_from_time is None and \
-                parameterSet.sel_to_date is None and \
-                parameterSet.sel_to_time is None:
-
-                self.logger.debug('No Time frame specified')
-                basetime=result.data['localtime']
-                self.logger.debug('basetime: %s', pformat(basetime))
-                intervall = datecalc.getIntervalDate(parameterSet.interval, parameterSet.interval_type, basetime, '-')
-                self.logger.debug('interval border: %s', pformat(intervall))
-
-                parameters['JOB_SELECT_PARAM']['FROM_DATE']=intervall.strftime("%Y%m%d")
-                parameters['JOB_SELECT_PARAM']['TO_DATE']=basetime.strftime("%Y%m%d")
-                parameters['JOB_SELECT_PARAM']['FROM_TIME']=intervall.strftime("%H%M%S")
-                parameters['JOB_SELECT_PARAM']['TO_TIME']=basetime.strftime("%H%M%S")
+        parameterSets = list(checkobj.params)
+
+        # The system time is determined once for all parameter sets
+        result = self.systemConnection.systemtime
+        if result.fail:
+            self._addError(parameterSets[:1], result.fail)
+            return Result(self.actionResult)
+
+        basetime=result.data['localtime']
+
+        if CONFIG['systemtype_ABAP'].getboolean('jobschedulingvalidation.batch_selection', fallback=True):
+            result = self._executeBatched(parameterSets, basetime)
+        else:
+            result = self._executeSingle(parameterSets, basetime)
+
+        if result.fail:
+            return Result(self.actionResult)
+
+        self.rateOverallResult()
+
+        return Result(data=self.actionResult)
+
+    def _executeSingle(self, parameterSets:list, basetime:datetime)->Result:
+        """ Select the jobs of each parameter set individually """
+
+        for parameterSet in parameterSets:
+            record = self._record(parameterSet)
+            parameters = self._selectionParameters(parameterSet)
+            parameters['JOB_SELECT_PARAM'].update(ABAP.utils.window_select_params(*self._selectionWindow(parameterSet,
+                                                                                                         basetime)))
 
             self.logger.debug('Attempting Job Selection: %s', pformat(parameters))
             result=self.retrieveData(**parameters)
@@ -169,16 +222,53 @@ class ActionAbapJobSchedulingValidationAction(systemcheck.plugins.ActionAbapChec
                 downloaded_data=result.data
                 record['CONFIGURED']=len(downloaded_data['SELECTED_JOBS'])
             else:
-                record['CONFIGURED']=result.fail
-                record['RATING']='error'
-                self.actionResult.addResult(record)
-                self.actionResult.rating='error'
-                return Result(self.actionResult)
-
+                self._addError([parameterSet], result.fail)
+                return result
 
             record = self.rateIndividualResult(record)
             self.actionResult.addResult(record)
 
-        self.rateOverallResult()
+        return Result(data=True)
+
+    def _executeBatched(self, parameterSets:list, basetime:datetime)->Result:
+        """ Select the jobs of all parameter sets with as few calls as possible
+
+        Parameter sets that only differ in their time frame share the calls of BAPI_XBP_JOB_SELECT. Their time
+        frames are merged and the selected jobs are assigned to the parameter sets by their scheduled start.
+        """
+
+        groups = dict()
+        keys = []
+        windows = []
+        for parameterSet in parameterSets:
+            parameters = self._selectionParameters(parameterSet)
+            key = (parameters.get('ABAPNAME'), tuple(sorted(parameters['JOB_SELECT_PARAM'].items())))
+            groups.setdefault(key, (parameters, []))[1].append(len(keys))
+            keys.append(key)
+            windows.append(self._selectionWindow(parameterSet, basetime))
+
+        selectedJobs = dict()
+        for key, (parameters, positions) in groups.items():
+            jobs = []
+            for start, end in ABAP.utils.merge_time_windows([windows[position] for position in positions]):
+                callParameters = dict(parameters)
+                callParameters['JOB_SELECT_PARAM'] = dict(parameters['JOB_SELECT_PARAM'],
+                                                          **ABAP.utils.window_select_params(start, end))
+                self.logger.debug('Attempting Job Selection: %s', pformat(callParameters))
+                result = self.retrieveData(**callParameters)
+                if result.fail:
+                    self._addError([parameterSets[position] for position in positions], result.fail)
+                    return result
+                jobs.extend(result.data['SELECTED_JOBS'])
+            selectedJobs[key] = ABAP.utils.unique_jobs(jobs)
+
+        records = []
+        for parameterSet, key, window in zip(parameterSets, keys, windows):
+            record = self._record(parameterSet)
+            record['CONFIGURED'] = len(ABAP.utils.jobs_in_window(selectedJobs[key], *window))
+            records.append(record)
+
+        for record in self.rateIndividualResults(records):
+            self.actionResult.addResult(record)
 
-        return Result(data=self.actionResult)
+        return Result(data=True)
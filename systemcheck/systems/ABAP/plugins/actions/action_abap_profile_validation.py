@@ -6,32 +6,37 @@ from systemcheck.utils import Result, Fail
 from systemcheck.models.meta import Base, ChoiceType, Column, ForeignKey, Integer, QtModelMixin, String, qtRelationship, \
     relationship, RichString
 from systemcheck.systems import ABAP
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pformat
 
 print('importing module {}'.format(__name__))
 
 class ProfileParameterReference:
+    """ Lookup of configured profile parameters
+
+    The parameters are indexed by parameter name and by parameter name and profile type.
+
+    """
 
     def __init__(self, parameters):
 
         self.__parameters = parameters
+        self.__index = dict()
+        self.__typeIndex = dict()
 
-    def getValue(self, parameter, profile_type=None):
+        for type, parameters in self.__parameters.items():
+            for data in parameters:
+                self.__index.setdefault(data.get('PARNAME'), []).append(data)
+                self.__typeIndex.setdefault((data.get('PARNAME'), type), []).append(data)
 
-        result=[]
+    def getValue(self, parameter, profile_type=None):
 
         if profile_type:
-            params = self.__parameters[profile_type]
-
-            for data in params:
-                if data.get('PARNAME')==parameter:
-                    result.append(data)
-        else:
-            for type, parameters in self.__parameters.items():
-                for data in parameters:
-                    if data.get('PARNAME')==parameter:
-                        result.append(data)
-        return result
+            if profile_type not in self.__parameters:
+                raise KeyError(profile_type)
+            return list(self.__typeIndex.get((parameter, profile_type), []))
+
+        return list(self.__index.get(parameter, []))
 
 class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
     """ Validate Runtime Parameters
@@ -39,6 +44,9 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
 
     """
 
+    #: Maximum number of profiles that are downloaded at the same time
+    MAX_PARALLEL_DOWNLOADS = 4
+
     def __init__(self):
         super().__init__()
         self.alchemyObjects = [ABAP.models.ActionAbapProfileValidation,
@@ -64,47 +72,49 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
 
         result = self.systemConnection.call_fm('PFL_READ_PROFILE_FROM_DB')
 
-    def _singleProfileContent(self, profilename:str):
+    def _singleProfileContent(self, profilename:str, connection=None):
         """ Get the content of a single profile
 
 
-        :param profilename: NAme of the profile to download """
+        :param profilename: NAme of the profile to download
+        :param connection: The connection to use, the connection of the check if not specified """
+
+        if connection is None:
+            connection = self.systemConnection
 
-        result = self.systemConnection.call_fm('PFL_READ_PROFILE_FROM_DB', PROFILE_NAME=profilename)
+        result = connection.call_fm('PFL_READ_PROFILE_FROM_DB', PROFILE_NAME=profilename)
 
         if result.fail:
             return result
 
-        profileData = result.data.get('DTAB')
-        parameter = None
-        value = None
-
-        configuredParameters = list()
-
-        # Append an empty row at the end of the data
-        profileData.append({'PARNAME': None, 'COMNR': '0001'})
-
-        for counter, row in enumerate(profileData):
-            if row['PARNAME'] and row['COMNR'] == '9990':
-                if parameter and value and profilename:
-                    configuredParameters.append(dict(PVALUE=value, PARNAME=parameter, PFNAME=profilename))
-                parameter = row['PARNAME']
-                value = row['PVALUE']
-                profilename=row['PFNAME']
-            elif row['COMNR'] in ['9991', '9992', '9993', '9994', '9995', '9996', '9997', '9998', '9999']:
-                value += row['PVALUE']
-            elif row['COMNR'] == '0001':
-                if parameter and value:
-                    record=dict(PVALUE = value,
-                                PARNAME = parameter,
-                                PFNAME = profilename)
-                    configuredParameters.append(record)
-                    parameter = None
-                    value = None
-                    profilename = None
+        configuredParameters = self.runCpuBound(ABAP.utils.parse_profile_content, profilename,
+                                                result.data.get('DTAB'))
 
         return Result(data=configuredParameters)
 
+    def _downloadProfile(self, logonInfo:dict, profilename:str):
+        """ Download a profile over a pooled connection
+
+        If no pooled connection is available right away, the connection of the check is shared.
+
+        :param logonInfo: Logon data of the system
+        :param profilename: Name of the profile to download """
+
+        result = ABAP.utils.get_pooled_connection(logonInfo, timeout=0)
+        if result.fail:
+            return self._singleProfileContent(profilename)
+
+        connection = result.data
+        try:
+            return self._singleProfileContent(profilename, connection)
+        finally:
+            ABAP.utils.release_connection(connection)
+
+    def _systemKey(self):
+        """ Identifies the system in the profile cache """
+        system = self.systemObject.parent_node
+        return (system.sid, system.id)
+
     def _profileContents(self):
         """ Get Contents of all profiles
 
@@ -112,6 +122,8 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
 
         Parameter values spanning over multiple lines, are identified by column COMNR.
 
+        Profiles that were not modified since they were last read are taken from the profile cache. The other
+        profiles are downloaded in parallel.
 
         """
 
@@ -122,39 +134,66 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
         profilenames=result.data
 
         self.logger.debug('Reading Profile Contents')
-        self.logger.debug('Reading Default Profile from DB')
 
         profileContents=dict(DEFAULT=[],
                              INSTANCE=[],
                              START=[])
 
+        cache = ABAP.utils.get_profile_cache()
+        systemKey = self._systemKey()
+
+        contents = dict()
+        downloads = []
         for type, names in profilenames.items():
-            for name in names:
-                result=self._singleProfileContent(name)
-                if result.fail:
-                    return result
+            for name, modificationInfo in names.items():
+                cached = cache.get(systemKey, name, modificationInfo)
+                if cached is None:
+                    downloads.append(name)
+                else:
+                    self.logger.debug('Profile %s taken from cache', name)
+                    contents[name] = cached
+
+        if downloads:
+            logonInfo = self.systemObject.logon_info()
+            workers = min(len(downloads), self.MAX_PARALLEL_DOWNLOADS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {name: executor.submit(self._downloadProfile, logonInfo, name) for name in downloads}
+                results = {name: future.result() for name, future in futures.items()}
+
+            for type, names in profilenames.items():
+                for name, modificationInfo in names.items():
+                    if name not in results:
+                        continue
+                    result = results[name]
+                    if result.fail:
+                        return result
+                    cache.put(systemKey, name, modificationInfo, result.data)
+                    contents[name] = result.data
 
-                profileContents[type].extend(result.data)
+        for type, names in profilenames.items():
+            for name in names:
+                profileContents[type].extend(contents[name])
 
         return Result(data=profileContents)
 
     def _profileNames(self)->Result:
-        """ Get the names of the Profiles in the database """
+        """ Get the names of the Profiles in the database
+
+        :return: Result(data=dict) with the profile type as key and a dictionary of profile name and modification
+                 information as value
+        """
         self.logger.debug('reading profiles from system')
-        instance_profiles = None
-        start_profiles = None
         result = self.systemConnection.call_fm('PFL_GET_PROF_LIST')
         if result.fail:
             return result
 
-        instance_profiles = set(
-            [record['PFNAME'] for record in result.data['HEADER_TAB'] if record['TYPE'] == 'I'])
-        start_profiles = set(
-            [record['PFNAME'] for record in result.data['HEADER_TAB'] if record['TYPE'] == 'S'])
-        default_profiles = set(
-            [record['PFNAME'] for record in result.data['HEADER_TAB'] if record['TYPE'] == 'D'])
+        types = {'D': 'DEFAULT', 'I': 'INSTANCE', 'S': 'START'}
+        profiles = {type: dict() for type in types.values()}
+        for record in result.data['HEADER_TAB']:
+            if record['TYPE'] in types:
+                profiles[types[record['TYPE']]][record['PFNAME']] = ABAP.utils.profile_modification_info(record)
 
-        result=Result(data={'DEFAULT':default_profiles, 'INSTANCE':instance_profiles, 'START':start_profiles})
+        result=Result(data=profiles)
 
         return result
 
@@ -168,6 +207,7 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
         profileContents=result.data
         profileReference=ProfileParameterReference(profileContents)
 
+        records=[]
         for parameterSet in self.checkObject.params:
 
             profiledata = profileReference.getValue(parameterSet.parameter, parameterSet.profiletype)
@@ -181,8 +221,7 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
                               EXPECTED=parameterSet.expected,
                               PROFILENAME='',
                               CONFIGURED=None)
-                record=self.rateIndividualResult(record)
-                self.actionResult.addResult(record)
+                records.append(record)
             else:
                 for data in profiledata:
                     record = dict(PARAMETERSET=parameterSet.param_set_name,
@@ -193,6 +232,7 @@ class ActionAbapProfileValidation(systemcheck.plugins.ActionAbapCheck):
                                   PROFILENAME=data.get('PFNAME'),
                                   EXPECTED=parameterSet.expected,
                                   CONFIGURED=data.get('PVALUE'))
+                    records.append(record)
 
-                    record = self.rateIndividualResult(record)
-                    self.actionResult.addResult(record)
\ No newline at end of file
+        for record in self.rateIndividualResults(records):
+            self.actionResult.addResult(record)
\ No newline at end of file
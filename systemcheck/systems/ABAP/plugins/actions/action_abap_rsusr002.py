@@ -20,6 +20,7 @@ from systemcheck.resources import icon_rc
 from systemcheck import checks, gui
 from collections import OrderedDict
 from sqlalchemy import inspect
+from systemcheck.models.meta import unit_of_work
 from typing import Union
 
 class WidgetReference:
@@ -206,8 +207,9 @@ class Table(QtWidgets.QWidget):
 
     def on_trash(self):
         model=self.table.model()
-        while model.rowCount():
-            model.removeRows(0, 1)
+        with unit_of_work(inspect(self.abstractItem).session):
+            while model.rowCount():
+                model.removeRows(0, 1)
 
     @property
     def sectionName(self):
@@ -328,10 +330,11 @@ class TableModel(QtCore.QAbstractTableModel):
 
         self.beginInsertRows(index, position, position+rows-1)
 
-        for row in range(rows):
-            newRow=self.objectClass()
-            self.abstractSection.insert(position+row, newRow)
-            self.abstractItem._commit()
+        with unit_of_work(inspect(self.abstractItem).session):
+            for row in range(rows):
+                newRow=self.objectClass()
+                self.abstractSection.insert(position+row, newRow)
+                self.abstractItem._commit()
 
         self.endInsertRows()
 
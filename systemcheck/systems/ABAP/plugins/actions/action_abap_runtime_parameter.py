@@ -7,6 +7,7 @@ from systemcheck.utils import Result, Fail
 from systemcheck.checks.models.checks import Check
 from systemcheck.models.meta import Base, ChoiceType, Column, ForeignKey, Integer, QtModelMixin, String, qtRelationship, relationship, RichString
 from systemcheck.systems import ABAP
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pformat
 
 print('importing module {}'.format(__name__))
@@ -17,6 +18,12 @@ class ActionAbapRuntimeParameter(systemcheck.plugins.ActionAbapCheck):
 
     """
 
+    #: Maximum number of application servers that are queried at the same time
+    MAX_PARALLEL_INSTANCES = 8
+
+    #: Seconds to wait for a pooled connection to an application server
+    CONNECTION_TIMEOUT = 60
+
     def __init__(self):
         super().__init__()
         self.alchemyObjects = [ABAP.models.ActionAbapRuntimeParameter,
@@ -55,44 +62,85 @@ class ActionAbapRuntimeParameter(systemcheck.plugins.ActionAbapCheck):
         return logonInfo
 
 
+    def _instanceParameters(self, logonInfo:dict, parameters:set, connection=None)->dict:
+        """ Retrieve all parameters of a single instance over one connection
+
+        SXPG_PROFILE_PARAMETER_GET reads a single parameter, so there is still one call per parameter.
+
+        :param logonInfo: Logon data for the instance
+        :param parameters: Names of the profile parameters
+        :param connection: The connection to use, a pooled connection to the instance if not specified
+
+        :return: A dictionary with the parameter name as key and the Result or Fail of the retrieval as value
+
+        """
+
+        if connection is not None:
+            return {parameter:connection.get_runtime_parameter(parameter) for parameter in parameters}
+
+        result=ABAP.utils.get_pooled_connection(logonInfo, timeout=self.CONNECTION_TIMEOUT)
+        if result.fail:
+            return {parameter:result for parameter in parameters}
+
+        connection=result.data
+        try:
+            return {parameter:connection.get_runtime_parameter(parameter) for parameter in parameters}
+        finally:
+            ABAP.utils.release_connection(connection)
+
     def execute(self):
 
         checkobj = self.checkObject
 
         result = self.systemConnection.call_fm('TH_SERVER_LIST')
         if not result.fail:
-            instances=result.data
+            instances=result.data['LIST_IPV6']
         else:
             self.rateOverallResult(error=True, errormessage=result.fail)
             return Result(data=self.actionResult)
 
-        for parameterSet in checkobj.params:
-
-            for instance in instances['LIST_IPV6']:
+        parameterSets=list(checkobj.params)
+        parameters={parameterSet.parameter for parameterSet in parameterSets}
+
+        # Query every instance once for all parameters, the instances in parallel. The instance the check is
+        # connected to is read over the connection of the check. A second pooled connection with the same logon data
+        # could wait forever when several checks hold all connections of the pool.
+        logonInfos={instance['NAME']:self._adaptLogonInfo(instance) for instance in instances}
+        keys={name:ABAP.utils.ConnectionPool.key(logonInfo) for name, logonInfo in logonInfos.items()}
+        systemKey=ABAP.utils.ConnectionPool.key(self.systemObject.logon_info())
+
+        pooled=dict()
+        for name, logonInfo in logonInfos.items():
+            if keys[name]!=systemKey:
+                pooled.setdefault(keys[name], logonInfo)
+
+        values=dict()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(pooled), self.MAX_PARALLEL_INSTANCES))) as executor:
+            futures={key:executor.submit(self._instanceParameters, logonInfo, parameters)
+                     for key, logonInfo in pooled.items()}
+            if systemKey in keys.values():
+                values[systemKey]=self._instanceParameters(None, parameters, connection=self.systemConnection)
+            values.update({key:future.result() for key, future in futures.items()})
+        instanceValues={name:values[key] for name, key in keys.items()}
+
+        for parameterSet in parameterSets:
+
+            for instance in instances:
                 record = dict(RATING='pass',
                               PARAMETERSET=parameterSet.param_set_name,
                               PARAMETER=parameterSet.parameter,
                               EXPECTED=parameterSet.expected_value,
                               INSTANCE=instance['NAME'],
                               OPERATOR=self.operators.lookup(parameterSet.operator))
-                logonInfo=self._adaptLogonInfo(instance)
-                result=ABAP.utils.get_connection(logonInfo)
+
+                result=instanceValues[instance['NAME']][record['PARAMETER']]
                 if result.fail:
-                    record['RATING']='error'
+                    record['RATING'] = 'error'
                     record['CONFIGURED']=result.fail
                     self.actionResult.addResult(record)
                 else:
-                    connection=result.data
-                    result=connection.get_runtime_parameter(record['PARAMETER'])
-                    if result.fail:
-                        record['RATING'] = 'error'
-                        record['CONFIGURED']=result.fail
-                        self.actionResult.addResult(record)
-                    else:
-                        response=result.data
-                        record['CONFIGURED']=response['value']
-                        record = self.rateIndividualResult(record)
-                        self.actionResult.addResult(record)
-                    connection.close()
+                    response=result.data
+                    record['CONFIGURED']=response['value']
+                    record = self.rateIndividualResult(record)
+                    self.actionResult.addResult(record)
         self.rateOverallResult()
-
@@ -2,13 +2,19 @@ from systemcheck.systems import ABAP
 import systemcheck
 import logging
 from pprint import pformat
-import re
+from concurrent.futures import TimeoutError
 
 class ActionAbapValidateRedundantPasswordHashes(systemcheck.plugins.ActionAbapCheck):
     """ Validate the scheduling of batch jobs
 
     """
 
+    #: Seconds to wait for the cleanup job
+    JOB_TIMEOUT = 600
+
+    #: Additional seconds to wait for the job definition and spool to be collected
+    COLLECT_TIMEOUT = 120
+
     def __init__(self):
 
         super().__init__()
@@ -63,92 +69,50 @@ class ActionAbapValidateRedundantPasswordHashes(systemcheck.plugins.ActionAbapCh
         job_stepParams.append({'type':'ABAP',
                                'params':job_stepParam})
 
-        result = self.systemConnection.btc_schedule_job(jobptions=job_param,
-                                               stepoptions=job_stepParams)
+        # The job is waited for by the shared job scheduler, so that checks running on many systems at the same
+        # time don't each poll their job
+        future = ABAP.utils.get_job_scheduler().submit(self.systemConnection,
+                                                       jobptions=job_param,
+                                                       stepoptions=job_stepParams,
+                                                       timeout=self.JOB_TIMEOUT)
+        try:
+            result = future.result(timeout=self.JOB_TIMEOUT + self.COLLECT_TIMEOUT)
+        except TimeoutError:
+            self.actionResult.rating='error'
+            self.actionResult.errorMessage='job "SystemCheck: Red. Password Hashes" was not collected in time'
+            return self.actionResult
 
         if result.fail:
             self.actionResult.rating='error'
-            self.actionResult.errorMessage=result.fail
+            self.actionResult.errorMessage=result.message
             return self.actionResult
 
-
         # Get Spool
-        spoolinfo = result.data.get('SPOOL_ATTR')
-        if len(spoolinfo)>0:
-            relevant_spoolinfo=spoolinfo[0]
+        spools = result.data['SPOOLS']
+        if len(spools)>0:
+            spool=spools[0]
         else:
             self.actionResult.rating='error'
             self.actionResult.errorMessage = 'No Spool for jobname "SystemCheck: Red. Password Hashes"'
             return self.actionResult
 
-        spoolid = relevant_spoolinfo.get('SPOOLID')
-
-        result=self.systemConnection.btc_xbp_generic_bapi_caller('BAPI_XBP_GET_SPOOL_AS_DAT', SPOOL_REQUEST=spoolid)
-
-        if result.fail:
-            self.actionResult.rating='error'
-            self.actionResult.errorMessage=result.message
-            return self.actionResult
-
-        spool=result.data['SPOOL_LIST']
-
         #Analyze Spool
 
         self.logger.debug('analyzing spool file')
-        for lineNumber, spoolLine in enumerate(spool):
-            if 'Checking table USR02 ...' in spoolLine['']:
-                usr02Start=lineNumber
-            elif 'Checking table USH02 ...' in spoolLine['']:
-                ush02Start=lineNumber
-            elif 'Checking table USRPWDHISTORY ...' in spoolLine['']:
-                usrpwdhistoryStart=lineNumber
-
-        counter=usr02Start+1
-        withinLogRecord=True
-        numUsers=None
-        logRecord=None
-
-        parsedLines=[]
-
-        # Start working the log lines for table USR02 until USH02 begins
-        for lineNumber, item in enumerate(spool):
-            if lineNumber>usr02Start:
-                lineText=item[''].strip()
-                match=re.match('(^\d+)', lineText)
-                if match or lineText.startswith('Checking table'):
-                    # Line starts with a digit
-                    if numUsers:
-                        if usr02Start < lineNumber-1 < ush02Start:
-                            parsedLines.append(['USR02', numUsers, logRecord])
-                        elif ush02Start < lineNumber-1 < usrpwdhistoryStart:
-                            parsedLines.append(['USH02', numUsers, logRecord])
-                        elif lineNumber-1 > usrpwdhistoryStart:
-                            parsedLines.append(['USRPWDHISTORY', numUsers, logRecord])
-
-                    if not lineText.startswith('Checking table'):
-                        numUsers=match.group(0)
-                        matchRecord=re.match('\d+(.*)', lineText)
-                        if matchRecord:
-                            logRecord=matchRecord.groups()[0]
-                        else:
-                            logRecord=''
-                else:
-                    if lineNumber<len(spool)-1:
-                        logRecord+=lineText
-                if lineNumber==len(spool)-1:
-                    parsedLines.append(['USRPWDHISTORY', numUsers, logRecord])
+        parsedLines = self.runCpuBound(ABAP.utils.parse_password_hash_spool, spool)
 
         self.logger.debug('Parsed Spool results: %s', pformat(parsedLines))
 
+        records=[]
         for item in parsedLines:
-            record=dict(RATING='pass',
-                        TABLE=item[0],
-                        EXPECTED=0,
-                        OPERATOR='equal',
-                        CONFIGURED=item[1],
-                        LOGRECORD=item[2])
-
-            record=self.rateIndividualResult(record)
+            records.append(dict(RATING='pass',
+                                TABLE=item[0],
+                                EXPECTED=0,
+                                OPERATOR='equal',
+                                CONFIGURED=item[1],
+                                LOGRECORD=item[2]))
+
+        for record in self.rateIndividualResults(records):
             self.actionResult.addResult(record)
 
         self.rateOverallResult()
@@ -44,6 +44,11 @@ class AbapMainWidget(GenericSystemMainWidget):
 
         return taskList
 
+    def taskSystemKey(self, task):
+        """ All clients of an ABAP system share the system's resources, the SID identifies the system """
+
+        return task.system.parent_node.sid
+
 class SystemABAPPlugin(plugins.SystemBasePlugin):
 
     def __init__(self, *args, systemType = None, **kwargs):
@@ -15,5 +15,16 @@ __license__     = 'GNU AGPLv3'
 
 
 from systemcheck.systems.ABAP.utils.connection import Connection, get_connection
+from systemcheck.systems.ABAP.utils.connection_pool import ConnectionPool, get_connection_pool, \
+    get_pooled_connection, release_connection
+from systemcheck.systems.ABAP.utils.fm_interface_cache import FunctionInterfaceCache, get_fm_interface_cache
+from systemcheck.systems.ABAP.utils.job_selection import WINDOW_START, WINDOW_END, merge_time_windows, \
+    window_select_params, jobs_in_window, unique_jobs
+from systemcheck.systems.ABAP.utils.job_scheduler import JobScheduler, get_job_scheduler
+from systemcheck.systems.ABAP.utils.job_wait import JobWaiter, get_job_waiter, wait_for_job
 from systemcheck.systems.ABAP.utils.mock_connection import MockConnection
+from systemcheck.systems.ABAP.utils.profile_cache import ProfileCache, get_profile_cache, profile_modification_info
+from systemcheck.systems.ABAP.utils.rfc_recording import RecordingConnection, ReplayConnection, load_recording, \
+    recording_filename, get_rfc_transport
 from systemcheck.systems.ABAP.utils.snc import get_snc_name
+from systemcheck.systems.ABAP.utils.parsers import parse_password_hash_spool, parse_profile_content
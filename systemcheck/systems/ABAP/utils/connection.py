@@ -12,7 +12,10 @@ from typing import Union
 import time, datetime
 from pprint import pformat
 from systemcheck.config import CONFIG
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import operator
+import threading
 
 try:
     import pyrfc
@@ -22,8 +25,12 @@ except ImportError:
 
 import systemcheck
 #from systemcheck.config import CONFIG
-from systemcheck.utils import Result, Fail
+from systemcheck.utils import Result, Fail, ColumnarTable
 from systemcheck.systems.ABAP.utils.mock_connection import MockConnection
+from systemcheck.systems.ABAP.utils.fm_interface_cache import get_fm_interface_cache
+from systemcheck.systems.ABAP.utils.job_wait import job_wait_settings, wait_for_job
+from systemcheck.systems.ABAP.utils.rfc_recording import get_rfc_transport
+from systemcheck.exceptions import ReplayError
 
 class Connection:
     """ Wrapper for the PyRFC Connection Class"""
@@ -40,7 +47,16 @@ class Connection:
 
 
     def __init__(self, *args, **kwargs):
-        pass
+        # pyrfc connections must not be used by several threads at the same time
+        self._lock = threading.RLock()
+        self._logonInfo = None
+        # Set by the connection pool
+        self.poolKey = None
+        self.relogonOnCommunicationError = False
+        # System ID and kernel release, used as key for the function interface cache
+        self._fmInterfaceSystem = None
+        # XMI interfaces the RFC session is logged on to
+        self._xmiInterfaces = set()
 
     def _handle_exception(self, err):
 
@@ -63,6 +79,8 @@ class Connection:
             message = err.message
         elif isinstance(err, pyrfc.RFCError):
             message = err.message
+        elif isinstance(err, ReplayError):
+            message = err.message
         else:
             raise err
         return Fail(message=message, data=err)
@@ -71,11 +89,44 @@ class Connection:
                          waitUntilComplete=True, timeout=600, abortOnTimeout=True):
         """ Schedule a Job for immediate release
 
+        To schedule jobs on many systems at the same time, use ABAP.utils.get_job_scheduler().
+
+        :param jobptions: Parameters for BAPI_XBP_JOB_OPEN
+        :param stepoptions: List of Parameters for each step for BAPI_XBP_ADD_JOB_STEP
+        :param closeoptions: Parameters for BAPI_JOB_CLOSE
+        :param releaseoptions: Parameters for BAPI_XBP_JOB_START_ASAP
+
+        """
+
+        result = self.btc_submit_job(jobptions, stepoptions, closeoptions=closeoptions, releaseoptions=releaseoptions)
+        if result.fail:
+            return result
+
+        jobcount = result.data
+
+        if waitUntilComplete:
+            result=self.btc_xbp_delay_until_job_completed(jobname=jobptions['JOBNAME'],
+                                                   jobcount=jobcount, maxDelay=timeout, abortOnTimeout=abortOnTimeout)
+            if result.fail:
+                self.btc_xmi_logoff()
+                return result
+
+        result=self.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_DEFINITION_GET',
+                                                JOBNAME=jobptions['JOBNAME'],
+                                                JOBCOUNT=jobcount,
+                                                EXTERNAL_USER_NAME=self.XBP_EXT_USER)
+
+        self.btc_xmi_logoff()
+        return result
+
+    def btc_submit_job(self, jobptions:dict, stepoptions:dict, closeoptions=None, releaseoptions=None):
+        """ Create a Job and release it for immediate execution without waiting for it
 
         :param jobptions: Parameters for BAPI_XBP_JOB_OPEN
         :param stepoptions: List of Parameters for each step for BAPI_XBP_ADD_JOB_STEP
         :param closeoptions: Parameters for BAPI_JOB_CLOSE
         :param releaseoptions: Parameters for BAPI_XBP_JOB_START_ASAP
+        :return: Result(data=jobcount) or Fail(message)
 
         """
 
@@ -85,7 +136,6 @@ class Connection:
         if releaseoptions is None:
             releaseoptions=dict()
 
-
         result=self.btc_xmi_logon()
         if result.fail:
             return result
@@ -104,7 +154,7 @@ class Connection:
                 )
                 if result.fail:
                     return result
-            elif stepoptions.get('type') == 'EXTERNAL':
+            elif stepoption.get('type') == 'EXTERNAL':
                 result = self.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_ADD_EXT_STEP',
                                                           JOBNAME=jobptions['JOBNAME'],
                                                           JOBCOUNT=jobcount,
@@ -126,19 +176,13 @@ class Connection:
                                                 JOBCOUNT=jobcount,
                                                 **releaseoptions)
 
-        if waitUntilComplete:
-            result=self.btc_xbp_delay_until_job_completed(jobname=jobptions['JOBNAME'],
-                                                   jobcount=jobcount, maxDelay=timeout, abortOnTimeout=abortOnTimeout)
-
-        result=self.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_DEFINITION_GET',
-                                                JOBNAME=jobptions['JOBNAME'],
-                                                JOBCOUNT=jobcount,
-                                                EXTERNAL_USER_NAME=self.XBP_EXT_USER)
+        if result.fail:
+            return result
 
-        self.btc_xmi_logoff()
-        return result
+        return Result(data=jobcount)
 
-    def btc_xbp_delay_until_job_completed(self, jobname, jobcount, sleepTime=3, maxDelay=600, abortOnTimeout=True):
+    def btc_xbp_delay_until_job_completed(self, jobname, jobcount, sleepTime=None, maxDelay=600, abortOnTimeout=True,
+                                          maxSleepTime=None):
         """ Wait until job completes
 
         The job status is encoded using the characters below.
@@ -151,63 +195,29 @@ class Connection:
         'A' - cancelled  <- this will be an error
         'F' - finished
 
+        The interval between two status checks starts with sleepTime and doubles after every check up to
+        maxSleepTime. To wait for many jobs at the same time, use ABAP.utils.get_job_waiter().
+
         OSS Notes:
             1770388 - Enhancements in the XBP interface
 
 
         :param jobname: SAP Job Name
         :param jobcount: Job Counter
-        :param useFm: If True, use function module SUBST_CHECK_BATCHJOB. Otherwise query TBTCO.
-        :param sleepTime: check interval in seconds
+        :param sleepTime: initial check interval in seconds, taken from settings.ini if not specified
         :param maxDelay: maximum time to wait for job to complete.
         :param abortOnTimeout: Terminate the job if a timeout occurs
+        :param maxSleepTime: maximum check interval in seconds, taken from settings.ini if not specified
         """
 
-        jobstatus = 'X'
-
-        t0 = time.clock()
-
-        while time.clock() - t0 < maxDelay:
-            # uses the function module BAP_XBP_JOB_STATUS_GET
-            self.logger.debug('waiting until batch job {:s} ({:s}) completes using '
-                              'BAPI_XBP_JOB_STATUS_GET'.format(jobname, jobcount))
-            result = self.call_fm('BAPI_XBP_JOB_STATUS_GET', JOBNAME=jobname, JOBCOUNT=jobcount,
-                               EXTERNAL_USER_NAME=self.XBP_EXT_USER)
-
-            if result.fail:
-                return result
-
-            if result.data['RETURN']['TYPE'] == 'E':
-                logMessage = 'BAPI_XBP_JOB_STATUS_GET for job request {:s} ({:s}): {:s}'.format(jobname,
-                                                                                                jobcount,
-                                                                                                result.data[
-                                                                                                    'RETURN'][
-                                                                                                    'MESSAGE'])
-                self.logger.error(logMessage)
-                return Fail(message=logMessage)
-
-            if result.data['STATUS'] in ['I', 'P', 'A']:
-                logMessage=''
-                if result.data['STATUS'] == 'I':
-                    logMessage = 'Job %s with count %s was intercepted'.format(jobname, jobcount)
-                elif result.data['STATUS'] == 'P':
-                    logMessage = 'Job %s with count %s is in scheduled state and will not run'.format(jobname, jobcount)
-                elif result.data['STATUS']== 'A':
-                    logMessage = 'Job %s with count %s is cancelled'.format(jobname, jobcount)
-
-                self.logger.error(logMessage)
-                return Fail(message=logMessage)
+        settings = job_wait_settings()
+        if sleepTime is None:
+            sleepTime = settings['initialInterval']
+        if maxSleepTime is None:
+            maxSleepTime = max(sleepTime, settings['maxInterval'])
 
-            else:
-                return result
-
-        if abortOnTimeout:
-            self.logger.error('Terminating job %s with jobcount %s due to timeout', jobname, jobcount)
-            bapiCallOptions=dict(JOBNAME=jobname, JOBCOUNT=jobcount)
-            bapiCallOptions['EXTERNAL_USER_NAME']=self.XBP_EXT_USER
-            self.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_ABORT', **bapiCallOptions)
-
-        return Fail('Max. Job Runtime {%i} Reached. Runtime: {:6.2f}'.format(sleepTime, time.time() - t0))
+        return wait_for_job(self, jobname, jobcount, timeout=maxDelay, abortOnTimeout=abortOnTimeout,
+                            initialInterval=sleepTime, maxInterval=maxSleepTime, jitter=settings['jitter'])
 
     def btc_xbp_generic_bapi_caller(self, bapi, **kwargs):
 
@@ -387,6 +397,30 @@ class Connection:
         self.logger.debug('BAPI_XBP_GET_SPOOL_AS_DAT successful')
         return Result(data=result)
 
+    def btc_xbp_job_status_get(self, jobname:str, jobcount:str)->Union[Result, Fail]:
+        """ Get the status of a background job
+
+        :param jobname: SAP Job Name
+        :param jobcount: Job Counter
+        :return: Result(data=the response of BAPI_XBP_JOB_STATUS_GET) or Fail(message)
+        """
+
+        result = self.call_fm('BAPI_XBP_JOB_STATUS_GET', JOBNAME=jobname, JOBCOUNT=jobcount,
+                              EXTERNAL_USER_NAME=self.XBP_EXT_USER)
+
+        if result.fail:
+            return result
+
+        if result.data['RETURN']['TYPE'] == 'E':
+            logMessage = 'BAPI_XBP_JOB_STATUS_GET for job request {:s} ({:s}): {:s}'.format(jobname,
+                                                                                            jobcount,
+                                                                                            result.data['RETURN'][
+                                                                                                'MESSAGE'])
+            self.logger.error(logMessage)
+            return Fail(message=logMessage, data=result.data)
+
+        return result
+
     def btc_xbp_job_close(self, jobname, jobcount):
         """ Closes the job definition
 
@@ -852,7 +886,9 @@ ______________________________
         :return:Fail(error Message
         """
         self.logger.debug('starting BAPI_XMI_LOGOFF')
-        result = self.call_fm('BAPI_XMI_LOGOFF', INTERFACE='XBP')
+        with self._lock:
+            self._xmiInterfaces.discard('XBP')
+            result = self.call_fm('BAPI_XMI_LOGOFF', INTERFACE='XBP')
 
         if result.fail:
             return result
@@ -870,9 +906,12 @@ ______________________________
             self.logger.debug('BAPI_XMI_LOGOFF successful')
             return Result(data=True)
 
-    def btc_xmi_logon(self, interface:str='XBP'):
+    def btc_xmi_logon(self, interface:str='XBP', force:bool=False):
         """Starting BAPI XMI logon process
 
+        The XMI session is kept for the lifetime of the RFC connection. If the connection is already logged on to the
+        interface, no further call is made unless force is set.
+
         OSS Notes:
             1770388 - Enhancements in the XBP interface
 
@@ -880,14 +919,21 @@ ______________________________
         :param externalProduct: Name of the external product
         :param interface: Interface to logon to
         :param version: Version of the interface
+        :param force: Call BAPI_XMI_LOGON even if the connection is already logged on
         :return: Fail(error Message) or Result(True)
         """
 
-        self.logger.debug('starting BAPI_XMI_LOGON')
-        result = self.call_fm('BAPI_XMI_LOGON', EXTCOMPANY=self.XBP_EXT_COMPANY,
-                           EXTPRODUCT=self.XBP_EXT_PRODUCT,
-                           INTERFACE=interface,
-                           VERSION=self.XPB_INTERFACE_VERS)
+        with self._lock:
+            if interface in self._xmiInterfaces and not force:
+                return Result(data=True)
+            self.logger.debug('starting BAPI_XMI_LOGON')
+            result = self.call_fm('BAPI_XMI_LOGON', EXTCOMPANY=self.XBP_EXT_COMPANY,
+                               EXTPRODUCT=self.XBP_EXT_PRODUCT,
+                               INTERFACE=interface,
+                               VERSION=self.XPB_INTERFACE_VERS)
+            if not result.fail and (result.data['RETURN']['TYPE'] != 'E' or
+                                    result.data['RETURN']['MESSAGE'] == 'Tool already logged on in interface XBP'):
+                self._xmiInterfaces.add(interface)
 
         if result.fail:
             return result
@@ -911,7 +957,21 @@ ______________________________
         self.logger.debug('Executing Function Module {}'.format(fm))
 
         try:
-            data = self.conn.call(fm, **kwargs)
+            with self._lock:
+                data = self.conn.call(fm, **kwargs)
+        except pyrfc.CommunicationError as err:
+            if not self.relogonOnCommunicationError:
+                return(self._handle_exception(err))
+
+            self.logger.warning('communication error during call of {}, logging on again'.format(fm))
+            result = self.relogon()
+            if result.fail:
+                return result
+            try:
+                with self._lock:
+                    data = self.conn.call(fm, **kwargs)
+            except Exception as err:
+                return(self._handle_exception(err))
         except Exception as err:
             return(self._handle_exception(err))
         return Result(message='call to {} successful'.format(fm), data=data)
@@ -949,96 +1009,435 @@ ______________________________
         result=self.conn.call('RFC_SYSTEM_INFO')
         return result['RFCSI_EXPORT']['RFCDBSYS']
 
+    def count_table(self, tabname: str, where_clause: str = None, fetchsize: int = 20000) -> Union[Result, Fail]:
+        '''Count the Records of a Table
+
+        RFC_READ_TABLE offers no aggregation. To keep the transferred volume small, only the narrowest field of the
+        table is requested and the pages are counted without parsing or keeping the records.
+
+        :param tabname: Table name
+        :param where_clause: Where clause to restrict result set in ABAP syntax
+        :param fetchsize: number of records to retrieve per call
+
+        :return: Result(data=<number of records>) or Fail(message=message)
+
+        '''
+
+        self.logger.debug('counting records of table ' + tabname)
+
+        result = self.call_fm('RFC_READ_TABLE', NO_DATA='X', QUERY_TABLE=tabname, DELIMITER='|')
+        if result.fail:
+            return result
+
+        narrowestField = min(result.data['FIELDS'], key=lambda field: int(field['LENGTH']))
+        self.logger.debug('counting using field {}'.format(narrowestField['FIELDNAME']))
+
+        fm_params = self._read_table_params(tabname, where_clause, [narrowestField['FIELDNAME']], fetchsize)
+
+        count = 0
+        try:
+            for data in self._iter_table_pages(fm_params, fetchsize, prefetch=True):
+                count += len(data)
+        except systemcheck.exceptions.ReadTableError as err:
+            return err.fail
+
+        return Result(data=count)
+
     def download_table(self, tabname: str, where_clause: str = None, tab_fields: list = None,
-                       fetchsize: int = 1000) -> Union[Result, Fail]:
+                       fetchsize: int = 1000, columnar: bool = False, fixed_width: bool = True,
+                       connections: list = None) -> Union[Result, Fail]:
         '''Downloads a Table
 
         .. warning::
 
-           This can be memory intensive and is also restricted to a line length of 512 characters,
+           All records are kept in memory. Use iter_table for large tables or set columnar to store the records column
+           by column.
+
+        Records larger than 512 characters are downloaded in several column groups, see iter_table.
 
         :param where_clause: Where clause to restrict result set in ABAP syntax
         :param tab_fields: list of fields
         :param fetchsize: number of records to retrieve
         :param tabname: Table name
+        :param columnar: return the records as systemcheck.utils.ColumnarTable instead of a list of dictionaries
+        :param fixed_width: split the records using the field offsets instead of the delimiter
+        :param connections: connections to the same system used to download column groups of wide tables concurrently
 
-        :return: Result(data={data: <list of dictionaries>, headers: <list of headers>}) or Fail(message=message)
+        :return: Result(data={data: <list of dictionaries or ColumnarTable>, headers: <list of headers>}) or
+                 Fail(message=message)
 
         '''
 
-        # TODO: Make more memory efficient
-        # TODO: download records larger than 512 characters
+        result = self.iter_table(tabname, where_clause=where_clause, tab_fields=tab_fields, fetchsize=fetchsize,
+                                 fixed_width=fixed_width, connections=connections)
+        if result.fail:
+            return result
 
-        from pprint import pformat
+        try:
+            if columnar:
+                table_data = ColumnarTable.fromRows(result.data['rows'], headers=result.data['headers'])
+            else:
+                table_data = list(result.data['rows'])
+        except systemcheck.exceptions.ReadTableError as err:
+            return err.fail
 
-        self.logger.debug('trying to download table ' + tabname)
+        return Result(data={'data': table_data, 'headers': result.data['headers']})
 
-        # Configure function module call
-        fm_params = dict(QUERY_TABLE=tabname,
-                         DELIMITER='|')
+    def iter_table(self, tabname: str, where_clause: str = None, tab_fields: list = None, fetchsize: int = 1000,
+                   batchsize: int = None, prefetch: bool = True, fixed_width: bool = True, split_columns: bool = True,
+                   connections: list = None) -> Union[Result, Fail]:
+        '''Read a Table page by page
 
-        if where_clause:
-            n = 72  # max. length of one where clause input value.
-            fm_params['OPTIONS'] = [{'TEXT': where_clause[i:i + n]} for i in range(0, len(where_clause), n)]
+        The table structure is determined immediately. The records are retrieved lazily through RFC_READ_TABLE while
+        iterating over the returned generator, one page of `fetchsize` records at a time. If `prefetch` is enabled, the
+        next page is requested in a background thread while the current page is consumed. At most two pages are held in
+        memory.
 
-        if tab_fields:
-            fm_params['FIELDS'] = [{'FIELDNAME': x} for x in tab_fields]
-            self.logger.debug('specified table fields: {:s}'.format(pformat(fm_params['FIELDS'])))
+        If the retrieval of a page fails while iterating, systemcheck.exceptions.ReadTableError is raised.
 
-        fm_params['ROWCOUNT'] = fetchsize
+        By default, the records are split using the OFFSET and LENGTH of the fields as returned by RFC_READ_TABLE. This
+        is faster than splitting at the delimiter and values that contain the delimiter are not corrupted.
 
-        self.logger.debug('RFC_READ_TABLE parameters: {:s}'.format(pformat(fm_params)))
+        RFC_READ_TABLE can't return records larger than 512 characters. For wider records, the fields are split into
+        column groups that fit into 512 characters. Each group contains the key fields of the table. The groups are read
+        in parallel, one generator per group, and the records are joined by their key as they arrive. If the groups are
+        returned in the same order, only a few incomplete records are kept in memory. The groups are read concurrently
+        over additional connections to the same system. If none are provided, idle connections are taken from the
+        connection pool and returned once the generator is exhausted or closed.
+
+        :param where_clause: Where clause to restrict result set in ABAP syntax
+        :param tab_fields: list of fields
+        :param fetchsize: number of records to retrieve per call
+        :param tabname: Table name
+        :param batchsize: if specified, lists of up to batchsize records are yielded instead of single records
+        :param prefetch: retrieve the next page in the background
+        :param fixed_width: split the records using the field offsets instead of the delimiter
+        :param split_columns: read records larger than 512 characters in column groups
+        :param connections: connections to the same system used to read the column groups. Defaults to this connection
+                            and pooled connections.
+
+        :return: Result(data={rows: <generator of dictionaries>, headers: <list of headers>}) or Fail(message=message)
+
+        '''
+
+        self.logger.debug('trying to read table ' + tabname)
+
+        fm_params = self._read_table_params(tabname, where_clause, tab_fields, fetchsize)
 
         result = self.call_fm('RFC_READ_TABLE', NO_DATA='X', **fm_params)
         if result.fail:
+            if split_columns and 'DATA_BUFFER_EXCEEDED' in str(result.message):
+                return self._iter_wide_table(tabname, where_clause, tab_fields, fetchsize, batchsize, prefetch,
+                                             fixed_width, connections)
             return result
 
         fm_tbl_fields = result.data['FIELDS']  # this will contain the table definition including field length.
 
         fm_tbl_headers = [x['FIELDNAME'] for x in fm_tbl_fields]
-        record_size = sum([int(x['LENGTH']) for x in fm_tbl_fields])
+        # The offsets include the delimiters
+        record_size = max([int(x['OFFSET']) + int(x['LENGTH']) for x in fm_tbl_fields], default=0)
         self.logger.debug('Record Size: {:d}'.format(record_size))
 
         if record_size > 512:
+            if split_columns:
+                return self._iter_wide_table(tabname, where_clause, tab_fields, fetchsize, batchsize, prefetch,
+                                             fixed_width, connections)
             message = 'requested column length of {:d} is larger than maximum possible (512)'.format(record_size)
             self.logger.error(message)
             return Fail(message=message, data=fm_tbl_fields)
 
-        iteration = 0
-        recordcounter = 1
+        parser = self._read_table_row_parser(fm_tbl_fields, fixed_width)
+        rows = self._iter_table_rows(fm_params, fm_tbl_headers, fetchsize, prefetch, parser)
+        if batchsize:
+            rows = self._batch_rows(rows, batchsize)
+
+        return Result(data={'rows': rows, 'headers': fm_tbl_headers})
 
-        table_data = []
+    def _iter_wide_table(self, tabname: str, where_clause: str, tab_fields: list, fetchsize: int, batchsize: int,
+                         prefetch: bool, fixed_width: bool, connections: list = None) -> Union[Result, Fail]:
+        """ Read a table with records larger than 512 characters in column groups """
 
-        while recordcounter > 0:
-            self.logger.debug(
-                'starting function module RFC_READ_TABLE with data retrieval. Iteration: {:d}'.format(iteration))
-            rowskips = iteration * fetchsize
-            fm_params['ROWSKIPS'] = rowskips
-            result = self.call_fm('RFC_READ_TABLE', **fm_params)
+        self.logger.debug('records of table {} exceed 512 characters, reading in column groups'.format(tabname))
+
+        result = self.call_fm('DDIF_FIELDINFO_GET', TABNAME=tabname)
+        if result.fail:
+            return result
+
+        # Entries like .INCLUDE are not part of the records
+        fieldInfo = [field for field in result.data['DFIES_TAB'] if not field['FIELDNAME'].startswith('.')]
+        widths = {field['FIELDNAME']: max(int(field['LENG']), int(field['OUTPUTLEN'])) for field in fieldInfo}
+        keyFields = [field['FIELDNAME'] for field in fieldInfo if field['KEYFLAG'] == 'X']
+        headers = list(tab_fields) if tab_fields else [field['FIELDNAME'] for field in fieldInfo]
+
+        result = self._plan_column_groups(headers, keyFields, widths)
+        if result.fail:
+            return result
+
+        groups = result.data
+        pooled = []
+        if not connections:
+            pooled = self._acquire_group_connections(len(groups) - 1)
+            connections = [self] + pooled
+
+        streams = []
+        for counter, group in enumerate(groups):
+            connection = connections[counter % len(connections)]
+            result = connection.iter_table(tabname, where_clause=where_clause, tab_fields=group, fetchsize=fetchsize,
+                                           prefetch=prefetch, fixed_width=fixed_width, split_columns=False)
             if result.fail:
+                for stream in streams:
+                    stream.close()
+                self._release_group_connections(pooled)
                 return result
+            streams.append(result.data['rows'])
 
-            data = result.data['DATA']
-            if len(data) > 0:
-                self.logger.debug(
-                    'generating result set from returned records. fetchsize={:d}, iteration={:d}'.format(fetchsize,
-                                                                                                         iteration))
-                for row in data:
-                    splitRow = row['WA'].strip().split('|')
-                    splitRow = [x.strip() for x in splitRow]
-                    record = dict(zip(fm_tbl_headers, splitRow))
-                    table_data.append(record)
-            else:
-                recordcounter = 0
-                if iteration == 0:
-                    return Result(data={'data': [], 'headers': fm_tbl_headers})
-            iteration += 1
+        rows = self._stitch_column_groups(streams, keyFields, headers, pooled)
+        if batchsize:
+            rows = self._batch_rows(rows, batchsize)
+
+        return Result(data={'rows': rows, 'headers': headers})
+
+    def _acquire_group_connections(self, count: int) -> list:
+        """ Get up to count additional connections to this system from the connection pool
+
+        Busy connections are not waited for, the column groups are then shared by fewer connections.
+        """
+
+        if count < 1 or not self._logonInfo or \
+                not CONFIG['systemtype_ABAP'].getboolean('connectionpool.enable', fallback=True):
+            return []
+
+        pool = systemcheck.systems.ABAP.utils.get_connection_pool()
+        connections = []
+        for counter in range(count):
+            result = pool.acquire(self._logonInfo, timeout=0)
+            if result.fail:
+                break
+            connections.append(result.data)
+
+        self.logger.debug('reading column groups using {} pooled connections'.format(len(connections)))
+        return connections
+
+    def _release_group_connections(self, connections: list):
+        for connection in connections:
+            systemcheck.systems.ABAP.utils.release_connection(connection)
+
+    def _plan_column_groups(self, fields: list, keyFields: list, widths: dict, maxWidth: int = 512) -> Union[Result, Fail]:
+        """ Split fields into groups whose records fit into maxWidth characters
+
+        Every group starts with the key fields. The remaining fields are added in their order until the next field would
+        exceed maxWidth. The width of a group includes one delimiter between two fields.
+
+        :param fields: The requested fields
+        :param keyFields: The key fields of the table
+        :param widths: The width of every field
+        :param maxWidth: The maximum width of a record
+
+        :return: Result(data=<list of lists of fieldnames>) or Fail(message=message)
+
+        """
+
+        if not keyFields:
+            return Fail(message='table has no key fields, the columns can not be joined')
+
+        keyWidth = sum(widths[field] for field in keyFields) + len(keyFields) - 1
+
+        groups = []
+        group = list(keyFields)
+        groupWidth = keyWidth
+
+        for field in fields:
+            if field in keyFields:
+                continue
+
+            width = widths.get(field)
+            if width is None:
+                return Fail(message='field {} does not exist'.format(field))
+
+            if keyWidth + 1 + width > maxWidth:
+                return Fail(message='field {} does not fit into a record together with the key fields'.format(field))
+
+            if groupWidth + 1 + width > maxWidth:
+                groups.append(group)
+                group = list(keyFields)
+                groupWidth = keyWidth
+
+            group.append(field)
+            groupWidth += 1 + width
+
+        groups.append(group)
+        self.logger.debug('column groups: {}'.format(pformat(groups)))
+        return Result(data=groups)
+
+    def _stitch_column_groups(self, streams: list, keyFields: list, headers: list, pooled: list = None):
+        """ Join the records of column groups by their key fields
+
+        One record is taken from every stream in turn. A record is yielded as soon as all groups delivered their part.
+        The pooled connections that read the groups are released once the streams are closed.
+        """
+
+        pending = dict()
+        active = list(streams)
+
+        try:
+            while active:
+                for stream in list(active):
+                    row = next(stream, None)
+                    if row is None:
+                        active.remove(stream)
+                        continue
+
+                    key = tuple(row[field] for field in keyFields)
+                    record, count = pending.get(key, ({}, 0))
+                    record.update(row)
+                    count += 1
+
+                    if count == len(streams):
+                        pending.pop(key, None)
+                        yield {header: record.get(header) for header in headers}
+                    else:
+                        pending[key] = (record, count)
+        finally:
+            for stream in streams:
+                stream.close()
+            self._release_group_connections(pooled or [])
+
+        if pending:
+            self.logger.warning('{} records were not returned for all column groups'.format(len(pending)))
+            for record, count in pending.values():
+                yield {header: record.get(header) for header in headers}
+
+    def _read_table_params(self, tabname: str, where_clause: str = None, tab_fields: list = None,
+                           fetchsize: int = 1000) -> dict:
+        """ Build the parameters for RFC_READ_TABLE """
+
+        fm_params = dict(QUERY_TABLE=tabname,
+                         DELIMITER='|')
+
+        if where_clause:
+            n = 72  # max. length of one where clause input value.
+            fm_params['OPTIONS'] = [{'TEXT': where_clause[i:i + n]} for i in range(0, len(where_clause), n)]
+
+        if tab_fields:
+            fm_params['FIELDS'] = [{'FIELDNAME': x} for x in tab_fields]
+            self.logger.debug('specified table fields: {:s}'.format(pformat(fm_params['FIELDS'])))
+
+        fm_params['ROWCOUNT'] = fetchsize
+
+        self.logger.debug('RFC_READ_TABLE parameters: {:s}'.format(pformat(fm_params)))
+        return fm_params
+
+    def _read_table_page(self, fm_params: dict, rowskips: int) -> Union[Result, Fail]:
+        """ Retrieve a single page of records through RFC_READ_TABLE """
+
+        self.logger.debug('starting function module RFC_READ_TABLE with data retrieval. ROWSKIPS: {:d}'.format(rowskips))
+        return self.call_fm('RFC_READ_TABLE', ROWSKIPS=rowskips, **fm_params)
+
+    def _iter_table_pages(self, fm_params: dict, fetchsize: int, prefetch: bool):
+        """ Generator that yields the DATA table of RFC_READ_TABLE page by page """
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            rowskips = 0
+            result = self._read_table_page(fm_params, rowskips)
+
+            while True:
+                if result.fail:
+                    raise systemcheck.exceptions.ReadTableError(result)
+
+                data = result.data['DATA']
+
+                # A page with less than fetchsize records is the last one
+                nextPage = None
+                if len(data) == fetchsize:
+                    rowskips += fetchsize
+                    if executor:
+                        nextPage = executor.submit(self._read_table_page, fm_params, rowskips)
+
+                yield data
+
+                if len(data) < fetchsize:
+                    break
+
+                del data
+                result = nextPage.result() if nextPage else self._read_table_page(fm_params, rowskips)
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+    def _iter_table_rows(self, fm_params: dict, fm_tbl_headers: list, fetchsize: int, prefetch: bool, parser):
+        """ Generator that yields the records of a table page by page """
+
+        for data in self._iter_table_pages(fm_params, fetchsize, prefetch):
+            for splitRow in map(parser, [row['WA'] for row in data]):
+                yield dict(zip(fm_tbl_headers, splitRow))
+
+    def _read_table_row_parser(self, fm_tbl_fields: list, fixed_width: bool = True):
+        """ Build the function that splits a record of RFC_READ_TABLE into its values
+
+        The fixed width parser slices all fields in one call of an itemgetter that is built once from the OFFSET and
+        LENGTH of the fields.
+
+        :param fm_tbl_fields: The FIELDS table returned by RFC_READ_TABLE
+        :param fixed_width: use the field offsets instead of the delimiter
+
+        """
+
+        if not fixed_width:
+            def parser(wa):
+                return [x.strip() for x in wa.strip().split('|')]
+            return parser
+
+        slices = [slice(int(field['OFFSET']), int(field['OFFSET']) + int(field['LENGTH'])) for field in fm_tbl_fields]
+        getter = operator.itemgetter(*slices)
+
+        if len(slices) == 1:
+            def parser(wa):
+                return [getter(wa).strip()]
         else:
-            return Result(data={'data': table_data, 'headers': fm_tbl_headers})
+            def parser(wa):
+                return [value.strip() for value in getter(wa)]
+        return parser
+
+    def _batch_rows(self, rows, batchsize: int):
+        """ Group records into lists of batchsize records """
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batchsize:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def fm_interface(self, fm, cached:bool=True):
+        """ Get the interface of a function module
+
+        The interface is cached per system ID, kernel release and function module, so that it is only determined once
+        using RFC_GET_FUNCTION_INTERFACE.
+
+        :param fm: Name of the function module
+        :param cached: If False, the interface is always retrieved from the system
+        :return: Result(data=interface) or Fail(message)
+        """
 
-    def fm_interface(self, fm):
-        result = self.call_fm('RFC_GET_FUNCTION_INTERFACE', FUNCNAME=fm, LANGUAGE='EN')
-        return result
+        def retrieve():
+            return self.call_fm('RFC_GET_FUNCTION_INTERFACE', FUNCNAME=fm, LANGUAGE='EN')
+
+        if not cached:
+            return retrieve()
+
+        if self._fmInterfaceSystem is None:
+            try:
+                attributes = self.connection_attributes
+                self._fmInterfaceSystem = (attributes['sysId'], attributes['kernelRel'])
+            except Exception as err:
+                self.logger.debug('connection attributes not available, not caching interface of %s: %s', fm, err)
+                return retrieve()
+
+        cache = get_fm_interface_cache()
+        return cache.get(cache.key(*self._fmInterfaceSystem, fm), retrieve)
 
     def get_runtime_parameter(self, parameter):
 
@@ -1084,6 +1483,9 @@ ______________________________
             return Fail(message='Logon Info Incomplete')
 
         self.mock = mock
+        self._logonInfo = logon_info
+        self._fmInterfaceSystem = None
+        self._xmiInterfaces = set()
         self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
         result = Result(message='Connection Successful')
         if mock:
@@ -1094,12 +1496,22 @@ ______________________________
         else:
             try:
                 self.logger.debug('Logon Details: %s', pformat(logon_info))
-                self.conn = pyrfc.Connection(**logon_info)
+                self.conn = get_rfc_transport(logon_info, pyrfc.Connection)
             except Exception as err:
                 result = self._handle_exception(err)
         return result
 
 
+    def relogon(self)->Union[Result, Fail]:
+        """ Close the connection and logon again with the same logon information """
+
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception as err:
+                self.logger.debug('closing the broken connection failed: %s', err)
+            return self.logon(self._logonInfo, mock=self.mock)
+
     def sid(self):
         result=self.conn.call('RFC_SYSTEM_INFO')
         return result['RFCSI_EXPORT']['RFCSYSID']
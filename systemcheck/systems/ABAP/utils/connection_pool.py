@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+""" Connection Pool for ABAP Systems
+
+Logging on to an ABAP system, especially using SNC, takes a considerable amount of time. The connection pool keeps
+connections open after they were used and hands them out again for the same logon information.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Union
+import atexit
+import logging
+import threading
+import time
+
+from systemcheck.config import CONFIG
+from systemcheck.utils import Result, Fail
+from systemcheck.systems.ABAP.utils.connection import get_connection
+
+
+class ConnectionPool:
+    """ Thread safe pool of ABAP connections
+
+    Connections are pooled by their logon information. Connections that were not used for a while are probed using
+    RFC_PING before they are handed out. Connections that are idle for longer than idleTimeout are closed.
+
+    :param maxSize: maximum number of open connections per logon information
+    :param idleTimeout: seconds after which an idle connection gets closed
+    :param pingAfter: idle seconds after which a connection is probed before it is handed out
+    :param connectionFactory: function that creates a connection for logon information, returns Result or Fail
+
+    """
+
+    def __init__(self, maxSize:int=4, idleTimeout:float=300, pingAfter:float=60, connectionFactory=None):
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.maxSize = max(1, maxSize)
+        self.idleTimeout = idleTimeout
+        self.pingAfter = pingAfter
+        self.connectionFactory = connectionFactory or get_connection
+
+        self._condition = threading.Condition()
+        self._idle = dict()
+        self._open = Counter()
+        self._closed = False
+
+    @staticmethod
+    def key(logon_info:dict)->tuple:
+        """ Normalise the logon information to a hashable key """
+        return tuple(sorted((str(key).lower(), str(value)) for key, value in logon_info.items()))
+
+    def acquire(self, logon_info:dict, timeout:float=None)->Union[Result, Fail]:
+        """ Get a connection for the logon information
+
+        The connection has to be returned using release.
+
+        :param logon_info: The logon information as returned by logon_info() of the system
+        :param timeout: seconds to wait for a connection if maxSize connections are in use. Wait forever if None.
+
+        :return: Result(data=connection) or Fail(message)
+
+        """
+
+        if not logon_info:
+            return Fail(message='Logon Info Incomplete')
+
+        key = self.key(logon_info)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            connection = None
+            available = True
+            with self._condition:
+                if self._closed:
+                    return Fail(message='Connection pool is closed')
+
+                evicted = self._evictIdle()
+                idle = self._idle.get(key)
+                if idle:
+                    connection, lastUsed = idle.pop()
+                elif self._open[key] < self.maxSize:
+                    self._open[key] += 1
+                else:
+                    available = False
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is None or remaining > 0:
+                        self._condition.wait(remaining)
+
+            for evictedConnection in evicted:
+                self._close(evictedConnection)
+
+            if not available:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return Fail(message='No connection available within {} seconds'.format(timeout))
+                continue
+
+            # The slot counted in _open has to be given back whenever no connection is handed out, otherwise it
+            # leaks and waiting threads block forever
+            try:
+                if connection is None:
+                    result = self._create(key, logon_info)
+                    if result.fail:
+                        self._discard(key)
+                    return result
+
+                if time.monotonic() - lastUsed < self.pingAfter or self._ping(connection):
+                    return Result(data=connection)
+
+                self.logger.debug('pooled connection is not alive anymore, logging on again')
+                result = connection.relogon()
+            except Exception:
+                self._discard(key)
+                raise
+
+            if result.fail:
+                self._discard(key)
+                return result
+            return Result(data=connection)
+
+    def release(self, connection, discard:bool=False):
+        """ Return a connection to the pool
+
+        :param connection: A connection obtained through acquire
+        :param discard: Close the connection instead of keeping it, for example after an error
+
+        """
+
+        key = connection.poolKey
+        with self._condition:
+            if discard or self._closed:
+                self._open[key] -= 1
+            else:
+                self._idle.setdefault(key, deque()).append((connection, time.monotonic()))
+                connection = None
+            self._condition.notify_all()
+
+        if connection is not None:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self, logon_info:dict, timeout:float=None):
+        """ Context manager that yields the Result of acquire and releases the connection afterwards """
+
+        result = self.acquire(logon_info, timeout=timeout)
+        try:
+            yield result
+        finally:
+            if not result.fail:
+                self.release(result.data)
+
+    def evictIdle(self):
+        """ Close connections that are idle for longer than idleTimeout """
+        with self._condition:
+            evicted = self._evictIdle()
+
+        for connection in evicted:
+            self._close(connection)
+
+    def closeAll(self):
+        """ Close all idle connections and don't hand out new ones
+
+        Connections that are in use get closed when they are released.
+        """
+
+        with self._condition:
+            self._closed = True
+            idle = self._idle
+            self._idle = dict()
+            for key, connections in idle.items():
+                self._open[key] -= len(connections)
+            self._condition.notify_all()
+
+        for connections in idle.values():
+            for connection, lastUsed in connections:
+                self._close(connection)
+
+    def _create(self, key:tuple, logon_info:dict)->Union[Result, Fail]:
+        result = self.connectionFactory(logon_info)
+        if not result.fail:
+            result.data.poolKey = key
+            result.data.relogonOnCommunicationError = True
+        return result
+
+    def _discard(self, key:tuple):
+        with self._condition:
+            self._open[key] -= 1
+            self._condition.notify_all()
+
+    def _evictIdle(self)->list:
+        """ Remove expired idle connections from the pool, the condition must be held
+
+        The connections are returned, so that they can be closed without holding the condition.
+        """
+
+        evicted = []
+        if not self.idleTimeout:
+            return evicted
+
+        limit = time.monotonic() - self.idleTimeout
+        for key, connections in self._idle.items():
+            # The connections are ordered by the time they were released
+            while connections and connections[0][1] < limit:
+                connection, lastUsed = connections.popleft()
+                self._open[key] -= 1
+                evicted.append(connection)
+        return evicted
+
+    def _ping(self, connection)->bool:
+        result = connection.call_fm('RFC_PING')
+        return not result.fail
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception as err:
+            self.logger.debug('closing pooled connection failed: %s', err)
+
+
+_CONNECTION_POOL = None
+_CONNECTION_POOL_LOCK = threading.Lock()
+
+
+def get_connection_pool()->ConnectionPool:
+    """ Return the connection pool shared by the application
+
+    The pool is configured through the connectionpool.* options of the systemtype_ABAP section in settings.ini.
+    """
+
+    global _CONNECTION_POOL
+
+    with _CONNECTION_POOL_LOCK:
+        if _CONNECTION_POOL is None:
+            config = CONFIG['systemtype_ABAP']
+            _CONNECTION_POOL = ConnectionPool(maxSize=config.getint('connectionpool.max_size', fallback=4),
+                                              idleTimeout=config.getfloat('connectionpool.idle_timeout', fallback=300),
+                                              pingAfter=config.getfloat('connectionpool.ping_after', fallback=60))
+            atexit.register(_CONNECTION_POOL.closeAll)
+        return _CONNECTION_POOL
+
+
+def get_pooled_connection(logon_info:dict, timeout:float=None)->Union[Result, Fail]:
+    """ Get a connection from the shared connection pool
+
+    If the pool is disabled in settings.ini, a new connection is established. Connections have to be returned using
+    release_connection.
+
+    """
+
+    if CONFIG['systemtype_ABAP'].getboolean('connectionpool.enable', fallback=True):
+        return get_connection_pool().acquire(logon_info, timeout=timeout)
+    return get_connection(logon_info)
+
+
+def release_connection(connection, discard:bool=False):
+    """ Return a connection obtained through get_pooled_connection
+
+    Connections that don't belong to a pool are closed.
+    """
+
+    if getattr(connection, 'poolKey', None) is not None and _CONNECTION_POOL is not None:
+        _CONNECTION_POOL.release(connection, discard=discard)
+    else:
+        connection.close()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+""" Cache for Function Module Interfaces
+
+Before calling a BAPI, the XBP helpers determine the parameters of the function module using
+RFC_GET_FUNCTION_INTERFACE. The interface of a function module only changes with the software on the system, so the
+result is cached per system ID, kernel release and function module name.
+
+The cache consists of an in-memory LRU layer and an optional on-disk layer. Entries on disk expire after a
+configurable time, so that the interfaces are determined again after an upgrade.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import OrderedDict
+from typing import Union
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from systemcheck.config import CONFIG
+from systemcheck.utils import Result, Fail
+
+
+class FunctionInterfaceCache:
+    """ Thread safe cache for the results of RFC_GET_FUNCTION_INTERFACE
+
+    :param maxEntries: maximum number of interfaces kept in memory
+    :param path: directory of the on-disk layer. The on-disk layer is disabled if None.
+    :param ttl: seconds after which an interface stored on disk is determined again, 0 disables the expiry
+
+    """
+
+    def __init__(self, maxEntries:int=512, path:str=None, ttl:float=86400):
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.maxEntries = max(1, maxEntries)
+        self.path = path
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(sysid:str, kernelRelease:str, fm:str)->tuple:
+        """ Normalise the cache key """
+        return (str(sysid).upper(), str(kernelRelease), str(fm).upper())
+
+    def get(self, key:tuple, retrieve=None)->Union[Result, Fail, None]:
+        """ Return the cached interface
+
+        :param key: The key as returned by key()
+        :param retrieve: Function without arguments that determines the interface if it is not cached. It has to
+                         return Result or Fail. Only successful results are cached.
+
+        :return: Result(data=interface), the Fail of retrieve or None if the interface is not cached and no retrieve
+                 function was specified
+
+        """
+
+        with self._lock:
+            interface = self._entries.get(key)
+            if interface is not None:
+                self._entries.move_to_end(key)
+                return Result(data=interface)
+
+        interface = self._load(key)
+        if interface is not None:
+            self._remember(key, interface)
+            return Result(data=interface)
+
+        if retrieve is None:
+            return None
+
+        result = retrieve()
+        if not result.fail:
+            self.put(key, result.data)
+        return result
+
+    def put(self, key:tuple, interface:dict):
+        """ Store an interface in all cache layers """
+        self._remember(key, interface)
+        self._store(key, interface)
+
+    def clear(self, disk:bool=False):
+        """ Remove all entries from memory and optionally from disk """
+        with self._lock:
+            self._entries.clear()
+
+        if disk and self.path and os.path.isdir(self.path):
+            for filename in os.listdir(self.path):
+                if filename.endswith('.json'):
+                    self._remove(os.path.join(self.path, filename))
+
+    def _remember(self, key:tuple, interface:dict):
+        with self._lock:
+            self._entries[key] = interface
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+    def _filename(self, key:tuple)->str:
+        name = hashlib.sha1('\x00'.join(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, '{}.json'.format(name))
+
+    def _load(self, key:tuple)->Union[dict, None]:
+        if not self.path:
+            return None
+
+        filename = self._filename(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(filename) > self.ttl:
+                self._remove(filename)
+                return None
+            with open(filename, 'r', encoding='utf-8') as cachefile:
+                entry = json.load(cachefile)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            self.logger.debug('reading cached interface %s failed: %s', filename, err)
+            return None
+
+        if tuple(entry.get('key', ())) != key:
+            return None
+        return entry.get('interface')
+
+    def _store(self, key:tuple, interface:dict):
+        if not self.path:
+            return
+
+        filename = self._filename(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # Write to a temporary file first, so that other processes never read partial entries
+            handle, tempname = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(handle, 'w', encoding='utf-8') as cachefile:
+                json.dump(dict(key=key, interface=interface), cachefile, default=str)
+            os.replace(tempname, filename)
+        except (OSError, TypeError, ValueError) as err:
+            self.logger.debug('storing interface %s failed: %s', filename, err)
+
+    def _remove(self, filename:str):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+_FM_INTERFACE_CACHE = None
+_FM_INTERFACE_CACHE_LOCK = threading.Lock()
+
+
+def get_fm_interface_cache()->FunctionInterfaceCache:
+    """ Return the function interface cache shared by the application
+
+    The cache is configured through the fminterface_cache.* options of the systemtype_ABAP section in settings.ini.
+    """
+
+    global _FM_INTERFACE_CACHE
+
+    with _FM_INTERFACE_CACHE_LOCK:
+        if _FM_INTERFACE_CACHE is None:
+            config = CONFIG['systemtype_ABAP']
+            path = None
+            if config.getboolean('fminterface_cache.disk', fallback=False):
+                path = os.path.join(CONFIG['application']['absolute_path'],
+                                    config.get('fminterface_cache.path', fallback='fminterface_cache'))
+            _FM_INTERFACE_CACHE = FunctionInterfaceCache(maxEntries=config.getint('fminterface_cache.max_entries',
+                                                                                  fallback=512),
+                                                         path=path,
+                                                         ttl=config.getfloat('fminterface_cache.ttl', fallback=86400))
+        return _FM_INTERFACE_CACHE
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+""" Pipelined Scheduling of Background Jobs
+
+Checks that execute reports as background jobs spend most of their time waiting for the job. The JobScheduler
+submits jobs to many systems at the same time and waits for all of them using a single JobWaiter. Once a job is
+finished, its definition and spool lists are collected. Each job is represented by a concurrent.futures.Future, so
+the results can be processed as the jobs finish, for example using concurrent.futures.as_completed.
+
+Every connection stays logged on to the XBP interface for its lifetime, the XMI session is not closed after each job.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Union
+import atexit
+import logging
+import threading
+
+from systemcheck.config import CONFIG
+from systemcheck.utils import Result, Fail
+from systemcheck.systems.ABAP.utils.job_wait import get_job_waiter
+
+
+class JobScheduler:
+    """ Schedule background jobs on many systems concurrently
+
+    :param maxWorkers: maximum number of jobs that are created or collected at the same time
+    :param waiter: The JobWaiter that waits for the jobs, the shared one is used if not specified
+
+    """
+
+    def __init__(self, maxWorkers:int=8, waiter=None):
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.waiter = waiter or get_job_waiter()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, maxWorkers))
+
+    def submit(self, connection, jobptions:dict, stepoptions:list, closeoptions:dict=None, releaseoptions:dict=None,
+               timeout:float=600, abortOnTimeout:bool=True, spool:bool=True)->Future:
+        """ Schedule a job for immediate execution
+
+        :param connection: The connection to the system that runs the job
+        :param jobptions: Parameters for BAPI_XBP_JOB_OPEN
+        :param stepoptions: List of Parameters for each step for BAPI_XBP_ADD_JOB_STEP
+        :param closeoptions: Parameters for BAPI_JOB_CLOSE
+        :param releaseoptions: Parameters for BAPI_XBP_JOB_START_ASAP
+        :param timeout: Maximum time in seconds to wait for the job
+        :param abortOnTimeout: Terminate the job if the timeout is reached
+        :param spool: Download the spool lists of the job
+
+        :return: A Future that is resolved with Fail(message) or with Result(data=dict) with the keys JOBNAME,
+                 JOBCOUNT, DEFINITION (the response of BAPI_XBP_JOB_DEFINITION_GET) and SPOOLS (a list with the
+                 SPOOL_LIST of every spool request). If the JobWaiter is stopped or the scheduler is shut down before
+                 the job is collected, the Future is resolved with an exception.
+
+        """
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+        jobname = jobptions['JOBNAME']
+
+        def collect(waitFuture, jobcount):
+            try:
+                result = waitFuture.result()
+                if not result.fail:
+                    result = self._collect(connection, jobname, jobcount, spool)
+            except BaseException as err:
+                # Includes the CancelledError of a wait that was cancelled because the JobWaiter was stopped
+                self.logger.exception(err)
+                future.set_exception(err)
+            else:
+                future.set_result(result)
+
+        def collectLater(waitFuture, jobcount):
+            try:
+                self._executor.submit(collect, waitFuture, jobcount)
+            except BaseException as err:
+                # The scheduler was shut down while the job was running
+                self.logger.exception(err)
+                future.set_exception(err)
+
+        def start():
+            try:
+                result = connection.btc_submit_job(jobptions, stepoptions, closeoptions=closeoptions,
+                                                   releaseoptions=releaseoptions)
+                if result.fail:
+                    future.set_result(result)
+                    return
+
+                jobcount = result.data
+                self.logger.debug('job %s (%s) released, waiting for completion', jobname, jobcount)
+                waitFuture = self.waiter.submit(connection, jobname, jobcount, timeout=timeout,
+                                                abortOnTimeout=abortOnTimeout)
+                waitFuture.add_done_callback(lambda waitFuture: collectLater(waitFuture, jobcount))
+            except Exception as err:
+                self.logger.exception(err)
+                future.set_exception(err)
+
+        self._executor.submit(start)
+        return future
+
+    def shutdown(self, wait:bool=True):
+        """ Stop accepting new jobs """
+        self._executor.shutdown(wait=wait)
+
+    def _collect(self, connection, jobname:str, jobcount:str, spool:bool)->Union[Result, Fail]:
+        """ Download the definition and the spool lists of a finished job """
+
+        result = connection.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_DEFINITION_GET',
+                                                        JOBNAME=jobname,
+                                                        JOBCOUNT=jobcount,
+                                                        EXTERNAL_USER_NAME=connection.XBP_EXT_USER)
+        if result.fail:
+            return result
+
+        definition = result.data
+        spools = []
+        if spool:
+            for spoolinfo in definition.get('SPOOL_ATTR', []):
+                result = connection.btc_xbp_generic_bapi_caller('BAPI_XBP_GET_SPOOL_AS_DAT',
+                                                                SPOOL_REQUEST=spoolinfo.get('SPOOLID'))
+                if result.fail:
+                    return result
+                spools.append(result.data['SPOOL_LIST'])
+
+        return Result(data=dict(JOBNAME=jobname, JOBCOUNT=jobcount, DEFINITION=definition, SPOOLS=spools))
+
+
+_JOB_SCHEDULER = None
+_JOB_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_job_scheduler()->JobScheduler:
+    """ Return the job scheduler shared by the application
+
+    The number of workers is configured through the jobscheduler.max_workers option of the systemtype_ABAP section
+    in settings.ini.
+    """
+
+    global _JOB_SCHEDULER
+
+    with _JOB_SCHEDULER_LOCK:
+        if _JOB_SCHEDULER is None:
+            _JOB_SCHEDULER = JobScheduler(maxWorkers=CONFIG['systemtype_ABAP'].getint('jobscheduler.max_workers',
+                                                                                       fallback=8))
+            atexit.register(_JOB_SCHEDULER.shutdown, wait=False)
+        return _JOB_SCHEDULER
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+""" Batched Job Selection
+
+Several parameter sets of a job scheduling validation often differ only in the time frame they cover. Instead of
+calling BAPI_XBP_JOB_SELECT once per parameter set, the time frames of parameter sets with otherwise identical
+selection criteria are merged. The jobs returned for the merged time frames are then assigned to the individual
+parameter sets locally, based on their scheduled start (SDLSTRTDT, SDLSTRTTM).
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+import datetime
+
+
+#: Lower and upper limit of an open time frame
+WINDOW_START = datetime.datetime.min
+WINDOW_END = datetime.datetime.max
+
+
+def merge_time_windows(windows:list)->list:
+    """ Merge overlapping or adjacent time frames
+
+    :param windows: A list of (start, end) tuples of datetime objects
+    :return: A sorted list of non overlapping (start, end) tuples that cover all windows
+
+    """
+
+    merged = []
+    for start, end in sorted(windows):
+        # A frame that ends at WINDOW_END covers every later start, adding a second would overflow
+        if merged and (merged[-1][1] == WINDOW_END or start <= merged[-1][1] + datetime.timedelta(seconds=1)):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def window_select_params(start:datetime.datetime, end:datetime.datetime)->dict:
+    """ Convert a time frame to the date and time fields of JOB_SELECT_PARAM
+
+    Open limits are omitted.
+    """
+
+    params = dict()
+    if start != WINDOW_START:
+        params['FROM_DATE'] = start.strftime("%Y%m%d")
+        params['FROM_TIME'] = start.strftime("%H%M%S")
+    if end != WINDOW_END:
+        params['TO_DATE'] = end.strftime("%Y%m%d")
+        params['TO_TIME'] = end.strftime("%H%M%S")
+    return params
+
+
+def job_start(job:dict):
+    """ The scheduled start of a job as datetime or None for jobs without date """
+
+    date = job.get('SDLSTRTDT')
+    if not date or date.strip('0 ') == '':
+        return None
+
+    time = (job.get('SDLSTRTTM') or '000000').replace(':', '')
+    try:
+        return datetime.datetime.strptime(date.replace('-', '') + time, '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+
+
+def jobs_in_window(jobs:list, start:datetime.datetime, end:datetime.datetime)->list:
+    """ Filter the jobs scheduled within a time frame
+
+    Jobs without a scheduled start were only selected because of the NODATE flag and are always included.
+
+    :param jobs: The SELECTED_JOBS of BAPI_XBP_JOB_SELECT
+    :param start: Start of the time frame
+    :param end: End of the time frame
+    """
+
+    selected = []
+    for job in jobs:
+        jobStart = job_start(job)
+        if jobStart is None or start <= jobStart <= end:
+            selected.append(job)
+    return selected
+
+
+def unique_jobs(jobs:list)->list:
+    """ Remove jobs that were selected by several calls, identified by JOBNAME and JOBCOUNT """
+
+    seen = set()
+    unique = []
+    for job in jobs:
+        key = (job.get('JOBNAME'), job.get('JOBCOUNT'))
+        if key == (None, None):
+            unique.append(job)
+        elif key not in seen:
+            seen.add(key)
+            unique.append(job)
+    return unique
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+""" Waiting for Background Jobs
+
+Reports that are executed through the XBP interface run as background jobs. The functions and classes in this module
+poll the status of the jobs using BAPI_XBP_JOB_STATUS_GET until they are finished. The polling interval grows
+exponentially up to a maximum and is randomised a little, so that many waiting checks don't query the systems at
+the same time. Timeouts are measured in wall clock time.
+
+wait_for_job blocks the calling thread. JobWaiter polls any number of jobs on any number of systems from a single
+thread and delivers the results as concurrent.futures.Future objects.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from concurrent.futures import Future
+from typing import Union
+import atexit
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+from systemcheck.config import CONFIG
+from systemcheck.utils import Result, Fail
+
+
+logger = logging.getLogger(__name__)
+
+#: Job states that will never lead to a finished job
+JOB_STATUS_ERRORS = {'I': 'Job {} with count {} was intercepted',
+                     'P': 'Job {} with count {} is in scheduled state and will not run',
+                     'A': 'Job {} with count {} is cancelled'}
+
+#: Job state of a finished job
+JOB_STATUS_FINISHED = 'F'
+
+
+def backoff_delay(attempt:int, initialInterval:float=3, maxInterval:float=30, factor:float=2,
+                  jitter:float=0.2)->float:
+    """ Calculate the time to wait before the next status check
+
+    :param attempt: Number of status checks that were performed already, starting with 0
+    :param initialInterval: Time to wait after the first check
+    :param maxInterval: Upper limit of the interval before the jitter is applied
+    :param factor: Growth of the interval per check
+    :param jitter: Relative deviation of the interval, 0.2 randomises the interval by +/- 20%
+
+    """
+
+    delay = min(maxInterval, initialInterval * factor ** min(attempt, 64))
+    return max(0, delay * random.uniform(1 - jitter, 1 + jitter))
+
+
+def job_status(connection, jobname:str, jobcount:str)->Union[Result, Fail, None]:
+    """ Check the status of a background job once
+
+    :param connection: The connection to the system that runs the job
+    :param jobname: SAP Job Name
+    :param jobcount: Job Counter
+    :return: Result(data=status) if the job is finished, Fail(message) if the job can't finish or the status can't be
+             determined and None if the job is still running.
+
+    """
+
+    result = connection.btc_xbp_job_status_get(jobname, jobcount)
+    if result.fail:
+        return result
+
+    status = result.data['STATUS']
+    if status in JOB_STATUS_ERRORS:
+        message = JOB_STATUS_ERRORS[status].format(jobname, jobcount)
+        logger.error(message)
+        return Fail(message=message, data=result.data)
+    elif status == JOB_STATUS_FINISHED:
+        return result
+    return None
+
+
+def _timeout(connection, jobname:str, jobcount:str, timeout:float, abortOnTimeout:bool)->Fail:
+    message = 'Job {} with count {} did not complete within {} seconds'.format(jobname, jobcount, timeout)
+    logger.error(message)
+    if abortOnTimeout:
+        logger.error('Terminating job %s with jobcount %s due to timeout', jobname, jobcount)
+        connection.btc_xbp_generic_bapi_caller('BAPI_XBP_JOB_ABORT', JOBNAME=jobname, JOBCOUNT=jobcount,
+                                               EXTERNAL_USER_NAME=connection.XBP_EXT_USER)
+    return Fail(message=message)
+
+
+def wait_for_job(connection, jobname:str, jobcount:str, timeout:float=600, abortOnTimeout:bool=True,
+                 initialInterval:float=3, maxInterval:float=30, jitter:float=0.2)->Union[Result, Fail]:
+    """ Block until a background job is finished
+
+    :param connection: The connection to the system that runs the job
+    :param jobname: SAP Job Name
+    :param jobcount: Job Counter
+    :param timeout: Maximum time in seconds to wait for the job
+    :param abortOnTimeout: Terminate the job if the timeout is reached
+    :param initialInterval: Time between the first two status checks
+    :param maxInterval: Maximum time between two status checks
+    :param jitter: Relative randomisation of the interval
+    :return: Result(data=status) if the job finished, otherwise Fail(message)
+
+    """
+
+    deadline = time.monotonic() + timeout
+
+    for attempt in itertools.count():
+        logger.debug('waiting until batch job %s (%s) completes using BAPI_XBP_JOB_STATUS_GET', jobname, jobcount)
+        result = job_status(connection, jobname, jobcount)
+        if result is not None:
+            return result
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _timeout(connection, jobname, jobcount, timeout, abortOnTimeout)
+
+        time.sleep(min(remaining, backoff_delay(attempt, initialInterval, maxInterval, jitter=jitter)))
+
+
+class _WaitingJob:
+
+    __slots__ = ('connection', 'jobname', 'jobcount', 'timeout', 'deadline', 'abortOnTimeout', 'attempt', 'future')
+
+    def __init__(self, connection, jobname:str, jobcount:str, timeout:float, abortOnTimeout:bool):
+        self.connection = connection
+        self.jobname = jobname
+        self.jobcount = jobcount
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+        self.abortOnTimeout = abortOnTimeout
+        self.attempt = 0
+        self.future = Future()
+
+
+class JobWaiter:
+    """ Wait for many background jobs from a single thread
+
+    Jobs are polled in the order in which their next status check is due. The result of each job is delivered through
+    a Future that contains the same Result or Fail that wait_for_job returns. A Future can only be cancelled before
+    the first status check of its job.
+
+    :param initialInterval: Time between the first two status checks of a job
+    :param maxInterval: Maximum time between two status checks of a job
+    :param jitter: Relative randomisation of the interval
+
+    """
+
+    def __init__(self, initialInterval:float=3, maxInterval:float=30, jitter:float=0.2):
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.initialInterval = initialInterval
+        self.maxInterval = maxInterval
+        self.jitter = jitter
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._thread = None
+        self._stopped = False
+
+    def submit(self, connection, jobname:str, jobcount:str, timeout:float=600, abortOnTimeout:bool=True)->Future:
+        """ Start waiting for a job
+
+        :param connection: The connection to the system that runs the job
+        :param jobname: SAP Job Name
+        :param jobcount: Job Counter
+        :param timeout: Maximum time in seconds to wait for the job
+        :param abortOnTimeout: Terminate the job if the timeout is reached
+        :return: A Future that is resolved with Result(data=status) or Fail(message)
+
+        """
+
+        job = _WaitingJob(connection, jobname, jobcount, timeout, abortOnTimeout)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError('JobWaiter has been stopped')
+            self._schedule(job, time.monotonic())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='JobWaiter', daemon=True)
+                self._thread.start()
+        return job.future
+
+    def pending(self)->int:
+        """ Number of jobs that are still being waited for """
+        with self._condition:
+            return len(self._queue)
+
+    def stop(self, wait:bool=True):
+        """ Stop polling, the Futures of jobs that are still pending are cancelled """
+        with self._condition:
+            self._stopped = True
+            queue = self._queue
+            self._queue = []
+            thread = self._thread
+            self._condition.notify_all()
+
+        for due, sequence, job in queue:
+            if not job.future.cancel():
+                job.future.set_result(Fail(message='Waiting for job {} with count {} was stopped'.format(
+                    job.jobname, job.jobcount)))
+
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _schedule(self, job:_WaitingJob, due:float):
+        """ Add a job to the queue, the condition must be held """
+        heapq.heappush(self._queue, (due, next(self._sequence), job))
+        self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if self._queue and self._queue[0][0] <= now:
+                        break
+                    self._condition.wait(self._queue[0][0] - now if self._queue else None)
+                if self._stopped:
+                    return
+                due, sequence, job = heapq.heappop(self._queue)
+
+            if job.attempt == 0 and not job.future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = self._poll(job)
+            except Exception as err:
+                self.logger.exception(err)
+                job.future.set_exception(err)
+                continue
+
+            if result is not None:
+                job.future.set_result(result)
+                continue
+
+            delay = backoff_delay(job.attempt, self.initialInterval, self.maxInterval, jitter=self.jitter)
+            job.attempt += 1
+            with self._condition:
+                if self._stopped:
+                    job.future.set_result(Fail(message='Waiting for job {} with count {} was stopped'.format(
+                        job.jobname, job.jobcount)))
+                    return
+                self._schedule(job, min(job.deadline, time.monotonic() + delay))
+
+    def _poll(self, job:_WaitingJob)->Union[Result, Fail, None]:
+        self.logger.debug('checking status of batch job %s (%s)', job.jobname, job.jobcount)
+        result = job_status(job.connection, job.jobname, job.jobcount)
+        if result is None and time.monotonic() >= job.deadline:
+            result = _timeout(job.connection, job.jobname, job.jobcount, job.timeout, job.abortOnTimeout)
+        return result
+
+
+_JOB_WAITER = None
+_JOB_WAITER_LOCK = threading.Lock()
+
+
+def get_job_waiter()->JobWaiter:
+    """ Return the job waiter shared by the application
+
+    The polling intervals are configured through the jobwait.* options of the systemtype_ABAP section in
+    settings.ini.
+    """
+
+    global _JOB_WAITER
+
+    with _JOB_WAITER_LOCK:
+        if _JOB_WAITER is None:
+            _JOB_WAITER = JobWaiter(**job_wait_settings())
+            atexit.register(_JOB_WAITER.stop, wait=False)
+        return _JOB_WAITER
+
+
+def job_wait_settings()->dict:
+    """ Return the polling intervals configured in settings.ini as keyword arguments """
+
+    config = CONFIG['systemtype_ABAP']
+    return dict(initialInterval=config.getfloat('jobwait.initial_interval', fallback=3),
+                maxInterval=config.getfloat('jobwait.max_interval', fallback=30),
+                jitter=config.getfloat('jobwait.jitter', fallback=0.2))
@@ -59,6 +59,9 @@ class MockConnection():
                                     'TYPE': 'C'}],
                          'OPTIONS': []}
 
+    def close(self):
+        pass
+
     def get_connection_attributes(self):
         return {'active_unit': False, 'client': '000', 'codepage': '4103', 'cpicConvId': '98815493',  'dest': '',
                 'host': 'win10', 'isoLanguage': 'EN', 'kernelRel': '745', 'language': 'E',
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+""" Parsers for data returned by ABAP systems
+
+The functions in this module are pure Python and operate on picklable data only. That way they can be executed in
+worker processes through ActionBasePlugin.runCpuBound.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+import re
+
+
+def parse_password_hash_spool(spool:list)->list:
+    """ Parse the spool list of report CLEANUP_PASSWORD_HASH_VALUES
+
+    The report logs the number of affected users per table, followed by a log record that can span multiple lines.
+
+    :param spool: The SPOOL_LIST as returned by BAPI_XBP_GET_SPOOL_AS_DAT
+    :return: A list of [table, number of users, log record] entries
+
+    """
+
+    for lineNumber, spoolLine in enumerate(spool):
+        if 'Checking table USR02 ...' in spoolLine['']:
+            usr02Start=lineNumber
+        elif 'Checking table USH02 ...' in spoolLine['']:
+            ush02Start=lineNumber
+        elif 'Checking table USRPWDHISTORY ...' in spoolLine['']:
+            usrpwdhistoryStart=lineNumber
+
+    numUsers=None
+    logRecord=None
+
+    parsedLines=[]
+
+    # Start working the log lines for table USR02 until USH02 begins
+    for lineNumber, item in enumerate(spool):
+        if lineNumber>usr02Start:
+            lineText=item[''].strip()
+            match=re.match(r'(^\d+)', lineText)
+            if match or lineText.startswith('Checking table'):
+                # Line starts with a digit
+                if numUsers:
+                    if usr02Start < lineNumber-1 < ush02Start:
+                        parsedLines.append(['USR02', numUsers, logRecord])
+                    elif ush02Start < lineNumber-1 < usrpwdhistoryStart:
+                        parsedLines.append(['USH02', numUsers, logRecord])
+                    elif lineNumber-1 > usrpwdhistoryStart:
+                        parsedLines.append(['USRPWDHISTORY', numUsers, logRecord])
+
+                if not lineText.startswith('Checking table'):
+                    numUsers=match.group(0)
+                    matchRecord=re.match(r'\d+(.*)', lineText)
+                    if matchRecord:
+                        logRecord=matchRecord.groups()[0]
+                    else:
+                        logRecord=''
+            else:
+                if lineNumber<len(spool)-1:
+                    logRecord+=lineText
+            if lineNumber==len(spool)-1:
+                parsedLines.append(['USRPWDHISTORY', numUsers, logRecord])
+
+    return parsedLines
+
+
+def parse_profile_content(profilename:str, profileData:list)->list:
+    """ Reassemble the parameters of a profile
+
+    Parameter values spanning over multiple lines are identified by column COMNR.
+
+    :param profilename: Name of the profile
+    :param profileData: The DTAB table as returned by PFL_READ_PROFILE_FROM_DB
+    :return: A list of dictionaries with the keys PARNAME, PVALUE and PFNAME
+
+    """
+
+    parameter = None
+    value = None
+
+    configuredParameters = list()
+
+    # Append an empty row at the end of the data
+    profileData = list(profileData)
+    profileData.append({'PARNAME': None, 'COMNR': '0001'})
+
+    for counter, row in enumerate(profileData):
+        if row['PARNAME'] and row['COMNR'] == '9990':
+            if parameter and value and profilename:
+                configuredParameters.append(dict(PVALUE=value, PARNAME=parameter, PFNAME=profilename))
+            parameter = row['PARNAME']
+            value = row['PVALUE']
+            profilename=row['PFNAME']
+        elif row['COMNR'] in ['9991', '9992', '9993', '9994', '9995', '9996', '9997', '9998', '9999']:
+            value += row['PVALUE']
+        elif row['COMNR'] == '0001':
+            if parameter and value:
+                record=dict(PVALUE = value,
+                            PARNAME = parameter,
+                            PFNAME = profilename)
+                configuredParameters.append(record)
+                parameter = None
+                value = None
+                profilename = None
+
+    return configuredParameters
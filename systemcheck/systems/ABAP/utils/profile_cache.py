@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+""" Cache for the Contents of Profiles
+
+Profiles rarely change. The parsed content of a profile is therefore cached per system and profile name together
+with the modification information of the profile header. As long as the header returned by PFL_GET_PROF_LIST is
+unchanged, the profile does not need to be downloaded again.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from typing import Union
+import threading
+
+
+#: Fields of the profile header that change whenever a profile is modified
+PROFILE_MODIFICATION_FIELDS = ('VERSNR', 'MODDATE', 'MODTIME', 'MODUSER')
+
+
+def profile_modification_info(header:dict)->Union[tuple, None]:
+    """ Extract the modification information from a record of HEADER_TAB of PFL_GET_PROF_LIST
+
+    :return: A tuple with the modification information or None, if the header doesn't contain any of it
+    """
+
+    info = tuple(header.get(field) for field in PROFILE_MODIFICATION_FIELDS)
+    if all(value is None for value in info):
+        return None
+    return info
+
+
+class ProfileCache:
+    """ Thread safe cache for parsed profile contents """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = dict()
+
+    def get(self, system, profilename:str, modificationInfo:tuple)->Union[list, None]:
+        """ Return the cached content of a profile
+
+        :param system: A hashable key that identifies the system
+        :param profilename: Name of the profile
+        :param modificationInfo: Modification information as returned by profile_modification_info
+        :return: The list of parameters or None if the profile is not cached or was modified since
+
+        """
+
+        if modificationInfo is None:
+            return None
+
+        with self._lock:
+            cached = self._profiles.get((system, profilename))
+
+        if cached is None or cached[0] != modificationInfo:
+            return None
+        return cached[1]
+
+    def put(self, system, profilename:str, modificationInfo:tuple, parameters:list):
+        """ Store the content of a profile """
+
+        if modificationInfo is None:
+            return
+
+        with self._lock:
+            self._profiles[(system, profilename)] = (modificationInfo, parameters)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+_PROFILE_CACHE = ProfileCache()
+
+
+def get_profile_cache()->ProfileCache:
+    """ Return the profile cache shared by the application """
+    return _PROFILE_CACHE
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+""" Recording and Replaying RFC Sessions
+
+Testing the heavier code paths (XBP, SUIM, profiles, job selection) requires an ABAP system. To run them without
+one, the function module calls of a real session can be recorded and replayed later.
+
+RecordingConnection wraps a pyrfc.Connection and writes every request and response to a recording file.
+ReplayConnection serves the recorded responses instead of a real system. It can simulate network latency and scale
+the number of rows of the returned tables, which allows reproducible performance tests on any machine.
+
+Recordings are gzip compressed JSON lines. Each line contains the function module, the parameters, the response or
+the error and the duration of the call. Values that JSON can't represent (Decimal, date, time, bytes) are stored with
+a type tag.
+
+The transport that Connection.logon uses is configured through the rfc.* options of the systemtype_ABAP section in
+settings.ini.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+from collections import deque
+from decimal import Decimal
+import atexit
+import base64
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+from systemcheck.config import CONFIG
+from systemcheck.exceptions import ReplayError
+from systemcheck.systems.ABAP.utils.mock_connection import MockConnection
+
+
+#: Pseudo function module under which the connection attributes are recorded
+CONNECTION_ATTRIBUTES = '__connection_attributes__'
+
+#: Logon parameters that are not used to identify the recording of a system
+_SECRET_LOGON_PARAMETERS = {'passwd', 'snc_myname', 'snc_partnername', 'snc_lib', 'snc_qop', 'snc_mode'}
+
+_WRITE_LOCK = threading.Lock()
+_RECORDERS = weakref.WeakSet()
+
+
+def _flush_recorders():
+    for recorder in list(_RECORDERS):
+        recorder.flush()
+
+
+atexit.register(_flush_recorders)
+
+
+def _encode(value):
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    elif isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    elif isinstance(value, datetime.date):
+        return {'__date__': value.isoformat()}
+    elif isinstance(value, datetime.time):
+        return {'__time__': value.isoformat()}
+    elif isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError('{} is not serializable'.format(type(value)))
+
+
+def _decode(value:dict):
+    if len(value) == 1:
+        tag, data = next(iter(value.items()))
+        if tag == '__decimal__':
+            return Decimal(data)
+        elif tag == '__datetime__':
+            return datetime.datetime.strptime(data, '%Y-%m-%dT%H:%M:%S' + ('.%f' if '.' in data else ''))
+        elif tag == '__date__':
+            return datetime.datetime.strptime(data, '%Y-%m-%d').date()
+        elif tag == '__time__':
+            return datetime.datetime.strptime(data, '%H:%M:%S' + ('.%f' if '.' in data else '')).time()
+        elif tag == '__bytes__':
+            return base64.b64decode(data)
+    return value
+
+
+def request_key(fm:str, params:dict)->str:
+    """ Canonical representation of a function module call """
+    return json.dumps([fm, params], sort_keys=True, default=_encode, separators=(',', ':'))
+
+
+def recording_filename(directory:str, logon_info:dict)->str:
+    """ Name of the recording file of a system
+
+    The file name is derived from the logon information without passwords and SNC settings.
+    """
+
+    identity = sorted((str(key).lower(), str(value)) for key, value in logon_info.items()
+                      if str(key).lower() not in _SECRET_LOGON_PARAMETERS)
+    name = hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+    return os.path.join(directory, '{}.rfc.gz'.format(name))
+
+
+def load_recording(filename:str)->list:
+    """ Read all calls from a recording file
+
+    :return: A list of dictionaries with the keys fm, params, response, error and duration
+    """
+
+    records = []
+    with gzip.open(filename, 'rt', encoding='utf-8') as recording:
+        for line in recording:
+            if line.strip():
+                records.append(json.loads(line, object_hook=_decode))
+    return records
+
+
+class RecordingConnection(MockConnection):
+    """ Forwards function module calls to a pyrfc connection and records them
+
+    The calls are buffered and appended to the recording file when the connection is closed or flush is called.
+
+    :param connection: The pyrfc.Connection to record
+    :param filename: The recording file
+    """
+
+    def __init__(self, connection, filename:str):
+        super().__init__()
+        self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+        self.connection = connection
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._buffer = []
+        _RECORDERS.add(self)
+
+    def call(self, fm, **params):
+        start = time.perf_counter()
+        try:
+            response = self.connection.call(fm, **params)
+        except Exception as err:
+            self._record(fm, params, error=dict(type=err.__class__.__name__, message=str(err)),
+                         duration=time.perf_counter() - start)
+            raise
+        self._record(fm, params, response=response, duration=time.perf_counter() - start)
+        return response
+
+    def get_connection_attributes(self):
+        attributes = self.connection.get_connection_attributes()
+        self._record(CONNECTION_ATTRIBUTES, dict(), response=attributes, duration=0)
+        return attributes
+
+    def close(self):
+        try:
+            self.connection.close()
+        finally:
+            self.flush()
+
+    def flush(self):
+        """ Append the buffered calls to the recording file """
+
+        with self._lock:
+            buffer = self._buffer
+            self._buffer = []
+
+        if not buffer:
+            return
+
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Every flush appends a gzip member, gzip reads concatenated members as a single stream
+        with _WRITE_LOCK, gzip.open(self.filename, 'at', encoding='utf-8') as recording:
+            for line in buffer:
+                recording.write(line)
+                recording.write('\n')
+
+    def _record(self, fm, params, response=None, error=None, duration=0):
+        try:
+            line = json.dumps(dict(fm=fm, params=params, response=response, error=error, duration=duration),
+                              default=_encode, separators=(',', ':'))
+        except TypeError as err:
+            self.logger.warning('call of %s can not be recorded: %s', fm, err)
+            return
+
+        with self._lock:
+            self._buffer.append(line)
+
+
+class ReplayConnection(MockConnection):
+    """ Serves recorded responses instead of calling a system
+
+    Identical calls that were recorded several times are answered with the recorded responses in order, the last
+    response is repeated afterwards. Calls that weren't recorded are answered by MockConnection or raise ReplayError.
+
+    :param records: The calls as returned by load_recording
+    :param latency: Seconds every call is delayed
+    :param latencyFactor: Factor applied to the recorded duration of the call, which is added to the latency
+    :param scale: Number of times the rows of the tables of a response are repeated, except UNSCALED_TABLES. Paged
+                  RFC_READ_TABLE calls are answered as if the recorded table was repeated scale times, every page
+                  contains at most ROWCOUNT records.
+    :param strict: If False, calls with unknown parameters are answered with the last response of the function module
+
+    """
+
+    #: Tables that describe the structure of a response and are never scaled
+    UNSCALED_TABLES = {'FIELDS', 'OPTIONS', 'PARAMS', 'RETURN'}
+
+    #: Function module that returns a table page by page through ROWSKIPS and ROWCOUNT
+    PAGED_FM = 'RFC_READ_TABLE'
+
+    def __init__(self, records:list, latency:float=0, latencyFactor:float=0, scale:int=1, strict:bool=True):
+        super().__init__()
+        self.latency = latency
+        self.latencyFactor = latencyFactor
+        self.scale = max(1, int(scale))
+        self.strict = strict
+
+        self._lock = threading.Lock()
+        self._responses = dict()
+        self._lastResponse = dict()
+        self._pages = dict()
+        self._pagedRows = dict()
+        for record in records:
+            self._responses.setdefault(request_key(record['fm'], record['params']), deque()).append(record)
+            self._lastResponse[record['fm']] = record
+            if self._isPageRequest(record['fm'], record['params']) and not record.get('error'):
+                pages = self._pages.setdefault(self._pagedTableKey(record['params']), dict())
+                pages.setdefault(record['params']['ROWSKIPS'], record)
+
+    @classmethod
+    def fromFile(cls, filename:str, **kwargs):
+        """ Create a ReplayConnection for a recording file """
+        return cls(load_recording(filename), **kwargs)
+
+    def call(self, fm, **params):
+        if self.scale > 1 and self._isPageRequest(fm, params):
+            response = self._scaledPage(params)
+            if response is not None:
+                return response
+
+        record = self._lookup(fm, params)
+        if record is None:
+            response = super().call(fm, **params)
+            if response is None:
+                raise ReplayError(fm, params)
+            return response
+
+        delay = self.latency + self.latencyFactor * record.get('duration', 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if record.get('error'):
+            raise ReplayError(fm, params, message='{type}: {message}'.format(**record['error']))
+
+        response = {key: self._scaled(value, key not in self.UNSCALED_TABLES)
+                    for key, value in record['response'].items()}
+
+        # A page must never exceed the requested number of records, otherwise the caller can't tell the last page
+        if self._isPageRequest(fm, params) and 'DATA' in response:
+            response['DATA'] = response['DATA'][:params['ROWCOUNT']]
+        return response
+
+    def get_connection_attributes(self):
+        record = self._lookup(CONNECTION_ATTRIBUTES, dict())
+        if record is None:
+            return super().get_connection_attributes()
+        return dict(record['response'])
+
+    def _lookup(self, fm, params):
+        with self._lock:
+            responses = self._responses.get(request_key(fm, params))
+            if responses:
+                return responses.popleft() if len(responses) > 1 else responses[0]
+            if not self.strict:
+                return self._lastResponse.get(fm)
+        return None
+
+    def _isPageRequest(self, fm, params:dict)->bool:
+        return fm == self.PAGED_FM and 'ROWSKIPS' in params and bool(params.get('ROWCOUNT'))
+
+    def _pagedTableKey(self, params:dict)->str:
+        return request_key(self.PAGED_FM, {key: value for key, value in params.items() if key != 'ROWSKIPS'})
+
+    def _recordedRows(self, tableKey:str):
+        """ All recorded rows of a paged table or None if the pages weren't recorded up to the last one """
+
+        with self._lock:
+            if tableKey in self._pagedRows:
+                return self._pagedRows[tableKey]
+
+            pages = self._pages.get(tableKey, dict())
+            rows = []
+            while True:
+                record = pages.get(len(rows))
+                if record is None:
+                    rows = None
+                    break
+
+                data = record['response'].get('DATA', [])
+                rows.extend(data)
+                if len(data) < record['params']['ROWCOUNT']:
+                    break
+
+            self._pagedRows[tableKey] = rows
+            return rows
+
+    def _scaledPage(self, params:dict):
+        """ Answer a paged RFC_READ_TABLE call from the recorded table repeated scale times
+
+        Record i of the scaled table is record i modulo the number of recorded records. Returns None if the table wasn't
+        recorded completely.
+        """
+
+        tableKey = self._pagedTableKey(params)
+        rows = self._recordedRows(tableKey)
+        if rows is None:
+            return None
+
+        first = self._pages[tableKey][0]
+        delay = self.latency + self.latencyFactor * first.get('duration', 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        start = params['ROWSKIPS']
+        end = min(start + params['ROWCOUNT'], len(rows) * self.scale)
+        response = {key: self._scaled(value) for key, value in first['response'].items() if key != 'DATA'}
+        response['DATA'] = [self._scaled(rows[counter % len(rows)]) for counter in range(start, end)]
+        return response
+
+    def _scaled(self, value, scale:bool=False):
+        """ Copy a value of the response so that callers can't modify the recording
+
+        If scale is set and the value is a table, its rows are repeated.
+        """
+
+        if isinstance(value, dict):
+            return {key: self._scaled(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            repeat = self.scale if scale and value and isinstance(value[0], dict) else 1
+            return [self._scaled(row) for counter in range(repeat) for row in value]
+        return value
+
+
+def get_rfc_transport(logon_info:dict, connectionFactory):
+    """ Create the transport for Connection.logon according to settings.ini
+
+    rfc.mode is one of
+        - live: use pyrfc directly
+        - record: record all calls in rfc.recording_path
+        - replay: serve the calls from rfc.recording_path
+
+    :param logon_info: The logon information
+    :param connectionFactory: Creates the pyrfc connection for the logon information
+    """
+
+    config = CONFIG['systemtype_ABAP']
+    mode = config.get('rfc.mode', fallback='live').lower()
+    if mode == 'live':
+        return connectionFactory(**logon_info)
+
+    directory = os.path.join(CONFIG['application']['absolute_path'],
+                             config.get('rfc.recording_path', fallback='rfc_recordings'))
+    filename = recording_filename(directory, logon_info)
+
+    if mode == 'record':
+        return RecordingConnection(connectionFactory(**logon_info), filename)
+    elif mode == 'replay':
+        return ReplayConnection.fromFile(filename,
+                                         latency=config.getfloat('rfc.replay_latency', fallback=0),
+                                         latencyFactor=config.getfloat('rfc.replay_latency_factor', fallback=0),
+                                         scale=config.getint('rfc.replay_scale', fallback=1),
+                                         strict=config.getboolean('rfc.replay_strict', fallback=True))
+    raise ValueError('Unknown RFC mode {}'.format(mode))
@@ -4,8 +4,11 @@ from systemcheck.systems.generic.gui.widgets import GenericSystemWidget
 from systemcheck.checks.gui.widgets.checks_widget import ChecksWidget
 from systemcheck.results.gui.widgets.result_widget import ResultWidget
 from systemcheck.resources import icon_rc
+from systemcheck.gui.parallel_processing import CheckExecutionEngine
+from systemcheck.config import CONFIG
 import logging
 import systemcheck.plugins
+from systemcheck.models.meta import snapshot
 from pprint import pprint, pformat
 from typing import Union
 from collections import namedtuple
@@ -52,6 +55,8 @@ class GenericSystemMainWidget(QtWidgets.QWidget):
         self.checkModel= None
         self.checkModel = None
 
+        self.executionEngine = None
+
     def buildTaskList(self, systems:set, checks:set)->set:
         """ Build the Task List
 
@@ -144,14 +149,109 @@ class GenericSystemMainWidget(QtWidgets.QWidget):
         systems=self.checkedSystems()
         checks=self.checkedChecks()
 
-        tasklist = self.buildTaskList(systems=systems, checks=checks)
+        tasklist = self.snapshotTasks(self.buildTaskList(systems=systems, checks=checks))
+
+        if CONFIG['application'].getboolean('app.multithreading', fallback=False):
+            self.runTasksConcurrently(tasklist)
+        else:
+            for task in tasklist:
+                plugin=self.pm.getPlugin(task.check.type)
+                result = plugin.plugin_object.executeAction(task.system, task.check)
+                self.results.resultAdd_signal.emit(result)
+
+    def on_checksPause(self):
+        """ Pause or resume the concurrent execution of checks """
+
+        if self.executionEngine is None or not self.executionEngine.isRunning():
+            return
+
+        if self.executionEngine.isPaused():
+            self.executionEngine.resume()
+        else:
+            self.executionEngine.pause()
+
+    def on_checksStop(self):
+        """ Don't start any further checks
+
+        Checks that are already running can't be interrupted and finish regularly.
+        """
+
+        if self.executionEngine is not None:
+            self.executionEngine.stop()
+
+    def on_taskFailed(self, task, message:str):
+        """ Report a task that raised an exception or exceeded the timeout as error """
+
+        plugin = self.pm.getPlugin(task.check.type)
+        result = plugin.plugin_object.__class__().errorResult(task.system, task.check, message)
+        self.results.resultAdd_signal.emit(result)
+
+    def on_taskResultReady(self, task, result):
+        self.results.resultAdd_signal.emit(result)
+
+    def runTasksConcurrently(self, tasklist:set):
+        """ Execute the tasks on a pool of worker threads
+
+        The plugin objects are singletons that store their result on the instance. Every task therefore gets a
+        dedicated plugin instance. The instances are created in the GUI thread since some plugins create widgets
+        during initialization.
+
+        The execution engine is created on the first run and reused afterwards. Workers of timed out tasks might still
+        be running in its thread pool.
 
-        self.results
+        :param tasklist: The set of tasks as generated by buildTaskList
+
+        """
+
+        if self.executionEngine is None:
+            config = CONFIG['application']
+            self.executionEngine = CheckExecutionEngine(
+                maxWorkers=config.getint('app.multithreading.max_workers', fallback=4),
+                maxTasksPerSystem=config.getint('app.multithreading.max_tasks_per_system', fallback=1),
+                taskTimeout=config.getfloat('app.multithreading.task_timeout', fallback=0),
+                systemKey=self.taskSystemKey,
+                parent=self)
+            self.executionEngine.resultReady.connect(self.on_taskResultReady)
+            self.executionEngine.taskFailed.connect(self.on_taskFailed)
+        elif self.executionEngine.isRunning():
+            self.logger.warning('checks are already running')
+            return
+
+        pluginInstances = {task: self.pm.getPlugin(task.check.type).plugin_object.__class__()
+                           for task in tasklist}
+
+        def executeTask(task):
+            return pluginInstances[task].executeAction(task.system, task.check)
+
+        self.executionEngine.run(tasklist, executeTask)
+
+    def snapshotTasks(self, tasklist:set)->set:
+        """ Replace the systems and checks of the tasks with detached snapshots
+
+        The sqlalchemy objects are bound to the session of the GUI thread. The plugins read the logon info, the
+        parameter sets and the fail criteria from the snapshots instead, so that no attribute gets loaded through that
+        session while the tasks are executed on worker threads. Every system and check is copied once.
+
+        :param tasklist: The set of tasks as generated by buildTaskList
+
+        """
+
+        snapshots = {}
+
+        def copy(saObject):
+            if saObject not in snapshots:
+                snapshots[saObject] = snapshot(saObject)
+            return snapshots[saObject]
+
+        return {task._replace(system=copy(task.system), check=copy(task.check)) for task in tasklist}
+
+    def taskSystemKey(self, task)->object:
+        """ Return the key that identifies the system a task gets executed against
+
+        The concurrent execution engine limits the number of tasks that run in parallel for a single key.
+        """
 
-        for task in tasklist:
-            plugin=self.pm.getPlugin(task.check.type)
-            result = plugin.plugin_object.executeAction(task.system, task.check)
-            self.results.resultAdd_signal.emit(result)
+        return task.system
 
     def setupCommonUi(self, systemsWidget:QtWidgets.QWidget=None):
 
@@ -191,8 +291,10 @@ class GenericSystemMainWidget(QtWidgets.QWidget):
         self.signals.checksNew.connect(self.checks.on_checkNew)
         self.signals.checksNewFolder.connect(self.checks.on_checkNewFolder)
         self.signals.checksPause.connect(self.checks.on_checkPause)
+        self.checks.checksPause_signal.connect(self.on_checksPause)
         self.signals.checksRun.connect(self.on_checksRun)
         self.signals.checksStop.connect(self.checks.on_checkStop)
+        self.checks.checksStop_signal.connect(self.on_checksStop)
         self.signals.resultClear.connect(self.results.on_resultClear)
         self.signals.resultExport.connect(self.results.resultHandler.on_resultExport)
         self.signals.resultImport.connect(self.results.resultHandler.on_resultImport)
@@ -17,4 +17,5 @@ __license__     = 'GNU AGPLv3'
 
 from .generic import get_absolute_path, get_absolute_systemcheck_path, Result, Fail, \
     get_lower_interval, get_user_attributes
+from .columnar import ColumnarTable, RowView
 from .sqlalchemy import get_or_create
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+""" Columnar Tables
+
+Table data retrieved from systems, for example through RFC_READ_TABLE, is usually represented as a list of
+dictionaries. Each dictionary repeats the column names, which is expensive for large tables. A ColumnarTable stores
+one list per column and the column names only once.
+
+Slicing a ColumnarTable returns a view on the same column lists. Single rows are returned as RowView objects that
+behave like read only dictionaries, so code that expects a list of dictionaries keeps working.
+
+"""
+
+# define authorship information
+__authors__     = ['Lars Fasel']
+__author__      = ','.join(__authors__)
+__credits__     = []
+__copyright__   = 'Copyright (c) 2017'
+__license__     = 'GNU AGPLv3'
+
+# maintanence information
+__maintainer__  = 'Lars Fasel'
+__email__       = 'systemcheck@team-fasel.com'
+
+from collections.abc import Mapping, Sequence
+
+
+class RowView(Mapping):
+    """ Read only, dictionary like view on a single row of a ColumnarTable """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row:int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._table.value(self._row, key)
+
+    def __iter__(self):
+        return iter(self._table.headers)
+
+    def __len__(self):
+        return len(self._table.headers)
+
+    def __repr__(self):
+        return '<RowView {}>'.format(dict(self))
+
+
+class ColumnarTable(Sequence):
+    """ A table that stores its data column by column
+
+    :param headers: The column names
+    :param columns: A list with one list of values per column. If not specified, an empty table is created.
+
+    """
+
+    def __init__(self, headers, columns:list=None, _start:int=0, _stop:int=None):
+        self.__headers = tuple(headers)
+        self.__index = {header: position for position, header in enumerate(self.__headers)}
+
+        if columns is None:
+            columns = [[] for header in self.__headers]
+        elif len(columns) != len(self.__headers):
+            raise ValueError('{} columns provided for {} headers'.format(len(columns), len(self.__headers)))
+
+        self.__columns = columns
+        self.__start = _start
+        self.__stop = _stop
+
+    @classmethod
+    def fromRows(cls, rows, headers=None):
+        """ Create a table from a list of dictionaries or sequences
+
+        :param rows: The rows of the table. Either mappings or sequences in the order of the headers
+        :param headers: The column names. Determined from the first row, if the rows are mappings and no headers are
+                        specified.
+
+        """
+        rows = iter(rows)
+        if headers is None:
+            first = next(rows, None)
+            if first is None:
+                return cls(headers=())
+            headers = list(first.keys())
+            table = cls(headers)
+            table.append(first)
+        else:
+            table = cls(headers)
+
+        table.extend(rows)
+        return table
+
+    @property
+    def headers(self)->tuple:
+        """ The column names """
+        return self.__headers
+
+    def _stop(self)->int:
+        if self.__stop is None:
+            return len(self.__columns[0]) if self.__columns else 0
+        return self.__stop
+
+    def __len__(self):
+        return self._stop() - self.__start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return ColumnarTable(self.__headers, [column[self.__start+start:self.__start+stop:step]
+                                                      for column in self.__columns])
+            return ColumnarTable(self.__headers, self.__columns, _start=self.__start + start,
+                                 _stop=self.__start + max(start, stop))
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('row index out of range')
+        return RowView(self, item)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(row == otherRow for row, otherRow in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return '<ColumnarTable columns: {}, rows: {}>'.format(len(self.__headers), len(self))
+
+    def append(self, row):
+        """ Append a row
+
+        Only possible for tables that are not a view on another table.
+
+        :param row: A mapping or a sequence of values in the order of the headers
+
+        """
+        if self.__start != 0 or self.__stop is not None:
+            raise TypeError('rows can not be appended to a view of a table')
+
+        if isinstance(row, Mapping):
+            for header, column in zip(self.__headers, self.__columns):
+                column.append(row.get(header))
+        else:
+            if len(row) != len(self.__headers):
+                raise ValueError('row has {} values, table has {} columns'.format(len(row), len(self.__headers)))
+            for value, column in zip(row, self.__columns):
+                column.append(value)
+
+    def extend(self, rows):
+        """ Append several rows """
+        for row in rows:
+            self.append(row)
+
+    def column(self, name)->list:
+        """ Return the values of a column """
+        column = self.__columns[self.__index[name]]
+        if self.__start == 0 and self.__stop is None:
+            return column
+        return column[self.__start:self._stop()]
+
+    def value(self, row:int, name):
+        """ Return a single value
+
+        :param row: The row number relative to this table
+        :param name: The column name
+
+        """
+        return self.__columns[self.__index[name]][self.__start + row]
+
+    def toDicts(self)->list:
+        """ Return the rows as list of dictionaries """
+        columns = [self.column(header) for header in self.__headers]
+        return [dict(zip(self.__headers, values)) for values in zip(*columns)]
+
+    def toNumpy(self)->dict:
+        """ Return a dictionary of NumPy arrays, one per column
+
+        Requires numpy to be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is required to export a ColumnarTable to NumPy arrays')
+
+        return {header: numpy.asarray(self.column(header)) for header in self.__headers}
+
+    def toPandas(self):
+        """ Return a pandas DataFrame
+
+        Requires pandas to be installed.
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError('pandas is required to export a ColumnarTable to a DataFrame')
+
+        return pandas.DataFrame({header: self.column(header) for header in self.__headers},
+                                columns=list(self.__headers))
@@ -48,7 +48,8 @@ def get_absolute_systemcheck_path(relative_path=None):
 
     if relative_path is None:
         return path1
-    return os.path.join(path1, relative_path)
+    # settings.ini uses backslashes as separator
+    return os.path.join(path1, os.path.normpath(relative_path.replace('\\', '/')))
 
 def get_lower_interval(parameters:dict, basetime):
     """ Calculate the lower date for the success_count function """
@@ -0,0 +1,89 @@
+from unittest import TestCase
+import threading
+import time
+
+from systemcheck.systems.ABAP.utils import Connection, ConnectionPool
+from systemcheck.utils import Result, Fail
+
+
+def _logon(connection, logon_info):
+    result = connection.logon(logon_info, mock=True)
+    if not result.fail:
+        result = Result(data=connection)
+    return result
+
+
+class TestConnectionPool(TestCase):
+
+    logon_info = dict(ashost='abap001', sysnr='00', client='001', user='TEST')
+
+    def setUp(self):
+        self.created = []
+
+        def factory(logon_info):
+            result = _logon(Connection(), logon_info)
+            self.created.append(result.data)
+            return result
+
+        self.pool = ConnectionPool(maxSize=2, idleTimeout=300, pingAfter=60, connectionFactory=factory)
+
+    def test_reuse(self):
+        result = self.pool.acquire(self.logon_info)
+        self.assertFalse(result.fail)
+        connection = result.data
+        self.pool.release(connection)
+
+        result = self.pool.acquire(dict(reversed(list(self.logon_info.items()))))
+        self.assertIs(result.data, connection)
+        self.assertEqual(len(self.created), 1)
+
+    def test_maxSize(self):
+        first = self.pool.acquire(self.logon_info).data
+        second = self.pool.acquire(self.logon_info).data
+        self.assertIsNot(first, second)
+
+        result = self.pool.acquire(self.logon_info, timeout=0.05)
+        self.assertIsInstance(result, Fail)
+
+        threading.Timer(0.05, self.pool.release, args=(first,)).start()
+        result = self.pool.acquire(self.logon_info, timeout=2)
+        self.assertIs(result.data, first)
+
+    def test_idleEviction(self):
+        connection = self.pool.acquire(self.logon_info).data
+        self.pool.release(connection)
+        self.pool.idleTimeout = 0.01
+        time.sleep(0.02)
+        self.pool.evictIdle()
+
+        result = self.pool.acquire(self.logon_info)
+        self.assertIsNot(result.data, connection)
+        self.assertEqual(len(self.created), 2)
+
+    def test_discard(self):
+        connection = self.pool.acquire(self.logon_info).data
+        self.pool.release(connection, discard=True)
+
+        result = self.pool.acquire(self.logon_info)
+        self.assertIsNot(result.data, connection)
+
+    def test_failingFactory(self):
+        attempts = []
+
+        def factory(logon_info):
+            attempts.append(logon_info)
+            if len(attempts) == 1:
+                raise FileNotFoundError('no recording')
+            if len(attempts) == 2:
+                return Fail(message='logon failed')
+            return _logon(Connection(), logon_info)
+
+        pool = ConnectionPool(maxSize=1, connectionFactory=factory)
+        with self.assertRaises(FileNotFoundError):
+            pool.acquire(self.logon_info)
+        self.assertIsInstance(pool.acquire(self.logon_info, timeout=0.05), Fail)
+
+        # Neither failure keeps the only slot occupied
+        result = pool.acquire(self.logon_info, timeout=0.05)
+        self.assertFalse(result.fail)
+        self.assertEqual(len(attempts), 3)
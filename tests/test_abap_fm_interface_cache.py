@@ -0,0 +1,99 @@
+from unittest import TestCase
+import os
+import tempfile
+import shutil
+
+from systemcheck.systems.ABAP.utils import Connection, FunctionInterfaceCache
+from systemcheck.systems.ABAP.utils import fm_interface_cache
+from systemcheck.utils import Result, Fail
+
+
+INTERFACE = {'PARAMS': [{'PARAMCLASS': 'I', 'PARAMETER': 'JOBNAME', 'POSITION': 1},
+                        {'PARAMCLASS': 'E', 'PARAMETER': 'RETURN', 'POSITION': 2}]}
+
+
+class TestFunctionInterfaceCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def retrieve(self):
+        self.calls += 1
+        return Result(data=INTERFACE)
+
+    def test_memory(self):
+        cache = FunctionInterfaceCache(maxEntries=2)
+        key = cache.key('e01', '745', 'bapi_xbp_job_open')
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.get(key, self.retrieve).data, INTERFACE)
+        self.assertEqual(cache.get(cache.key('E01', '745', 'BAPI_XBP_JOB_OPEN'), self.retrieve).data, INTERFACE)
+        self.assertEqual(self.calls, 1)
+
+    def test_lru(self):
+        cache = FunctionInterfaceCache(maxEntries=2)
+        for fm in ('FM1', 'FM2'):
+            cache.get(cache.key('E01', '745', fm), self.retrieve)
+        cache.get(cache.key('E01', '745', 'FM1'), self.retrieve)
+        cache.get(cache.key('E01', '745', 'FM3'), self.retrieve)
+        self.assertEqual(self.calls, 3)
+
+        self.assertIsNotNone(cache.get(cache.key('E01', '745', 'FM1')))
+        self.assertIsNone(cache.get(cache.key('E01', '745', 'FM2')))
+
+    def test_failNotCached(self):
+        cache = FunctionInterfaceCache()
+        key = cache.key('E01', '745', 'FM1')
+        result = cache.get(key, lambda: Fail(message='FU_NOT_FOUND'))
+        self.assertIsInstance(result, Fail)
+        self.assertIsNone(cache.get(key))
+
+    def test_disk(self):
+        key = FunctionInterfaceCache.key('E01', '745', 'FM1')
+        FunctionInterfaceCache(path=self.directory).get(key, self.retrieve)
+
+        cache = FunctionInterfaceCache(path=self.directory, ttl=3600)
+        self.assertEqual(cache.get(key, self.retrieve).data, INTERFACE)
+        self.assertEqual(self.calls, 1)
+
+    def test_diskExpired(self):
+        key = FunctionInterfaceCache.key('E01', '745', 'FM1')
+        FunctionInterfaceCache(path=self.directory).get(key, self.retrieve)
+        for filename in os.listdir(self.directory):
+            os.utime(os.path.join(self.directory, filename), (0, 0))
+
+        cache = FunctionInterfaceCache(path=self.directory, ttl=3600)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestConnectionFmInterface(TestCase):
+
+    def setUp(self):
+        self.cache = FunctionInterfaceCache()
+        self._cache = fm_interface_cache._FM_INTERFACE_CACHE
+        fm_interface_cache._FM_INTERFACE_CACHE = self.cache
+
+    def tearDown(self):
+        fm_interface_cache._FM_INTERFACE_CACHE = self._cache
+
+    def test_fm_interface(self):
+        calls = []
+        connection = Connection()
+        connection.logon(dict(ashost='abap001', sysnr='00', client='001', user='TEST'), mock=True)
+
+        def call_fm(fm, **kwargs):
+            calls.append((fm, kwargs['FUNCNAME']))
+            return Result(data=INTERFACE)
+
+        connection.call_fm = call_fm
+
+        for counter in range(3):
+            self.assertEqual(connection.fm_interface('BAPI_XBP_JOB_OPEN').data, INTERFACE)
+        self.assertEqual(calls, [('RFC_GET_FUNCTION_INTERFACE', 'BAPI_XBP_JOB_OPEN')])
+
+        connection.fm_interface('BAPI_XBP_JOB_OPEN', cached=False)
+        self.assertEqual(len(calls), 2)
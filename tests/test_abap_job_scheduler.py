@@ -0,0 +1,123 @@
+from unittest import TestCase
+from concurrent.futures import as_completed, CancelledError, Future
+import threading
+
+from systemcheck.systems.ABAP.utils import Connection, JobScheduler, JobWaiter
+from systemcheck.utils import Result, Fail
+
+
+class SchedulerConnection:
+    """ Fake connection whose jobs finish after a number of status checks """
+
+    XBP_EXT_USER = 'systemcheck'
+
+    def __init__(self, sid, checks=2, submitFails=False):
+        self.sid = sid
+        self.checks = checks
+        self.submitFails = submitFails
+        self.lock = threading.Lock()
+
+    def btc_submit_job(self, jobptions, stepoptions, closeoptions=None, releaseoptions=None):
+        if self.submitFails:
+            return Fail(message='BAPI_XBP_JOB_OPEN: not authorized')
+        return Result(data='{}0001'.format(self.sid))
+
+    def btc_xbp_job_status_get(self, jobname, jobcount):
+        with self.lock:
+            self.checks -= 1
+            status = 'F' if self.checks <= 0 else 'R'
+        return Result(data={'STATUS': status, 'RETURN': {'TYPE': 'S', 'MESSAGE': ''}})
+
+    def btc_xbp_generic_bapi_caller(self, bapi, **kwargs):
+        if bapi == 'BAPI_XBP_JOB_DEFINITION_GET':
+            return Result(data={'SPOOL_ATTR': [{'SPOOLID': 1}, {'SPOOLID': 2}]})
+        elif bapi == 'BAPI_XBP_GET_SPOOL_AS_DAT':
+            return Result(data={'SPOOL_LIST': [{'': '{} spool {}'.format(self.sid, kwargs['SPOOL_REQUEST'])}]})
+        return Result(data={})
+
+
+class ManualWaiter:
+    """ JobWaiter whose Futures are resolved by the test """
+
+    def __init__(self):
+        self.submitted = threading.Event()
+        self.future = None
+
+    def submit(self, connection, jobname, jobcount, timeout=600, abortOnTimeout=True):
+        self.future = Future()
+        self.submitted.set()
+        return self.future
+
+
+class TestJobScheduler(TestCase):
+
+    def setUp(self):
+        self.waiter = JobWaiter(initialInterval=0.001, maxInterval=0.005)
+        self.scheduler = JobScheduler(maxWorkers=4, waiter=self.waiter)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        self.waiter.stop()
+
+    def test_submit(self):
+        connections = [SchedulerConnection('E0{}'.format(counter), checks=counter) for counter in range(1, 6)]
+        futures = {self.scheduler.submit(connection, dict(JOBNAME='TEST'), []): connection.sid
+                   for connection in connections}
+
+        results = {}
+        for future in as_completed(futures, timeout=5):
+            results[futures[future]] = future.result()
+
+        self.assertEqual(len(results), 5)
+        result = results['E03']
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['JOBCOUNT'], 'E030001')
+        self.assertEqual(result.data['SPOOLS'], [[{'': 'E03 spool 1'}], [{'': 'E03 spool 2'}]])
+
+    def test_submitFails(self):
+        future = self.scheduler.submit(SchedulerConnection('E01', submitFails=True), dict(JOBNAME='TEST'), [])
+        self.assertIsInstance(future.result(timeout=5), Fail)
+
+    def test_waitCancelled(self):
+        waiter = ManualWaiter()
+        scheduler = JobScheduler(maxWorkers=1, waiter=waiter)
+        future = scheduler.submit(SchedulerConnection('E01'), dict(JOBNAME='TEST'), [])
+        self.assertTrue(waiter.submitted.wait(timeout=5))
+
+        waiter.future.cancel()
+        with self.assertRaises(CancelledError):
+            future.result(timeout=5)
+        scheduler.shutdown()
+
+    def test_shutdownWhileWaiting(self):
+        waiter = ManualWaiter()
+        scheduler = JobScheduler(maxWorkers=1, waiter=waiter)
+        future = scheduler.submit(SchedulerConnection('E01'), dict(JOBNAME='TEST'), [])
+        self.assertTrue(waiter.submitted.wait(timeout=5))
+
+        scheduler.shutdown()
+        waiter.future.set_result(Result(data='F'))
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+
+
+class TestXmiSession(TestCase):
+
+    def test_logonOnce(self):
+        calls = []
+        connection = Connection()
+        connection.logon(dict(ashost='abap001', sysnr='00', client='001', user='TEST'), mock=True)
+
+        def call_fm(fm, **kwargs):
+            calls.append(fm)
+            return Result(data={'RETURN': {'TYPE': 'S', 'MESSAGE': '', 'NUMBER': '000'}})
+
+        connection.call_fm = call_fm
+
+        for counter in range(3):
+            self.assertFalse(connection.btc_xmi_logon().fail)
+        self.assertEqual(calls, ['BAPI_XMI_LOGON'])
+
+        connection.btc_xmi_logoff()
+        connection.btc_xmi_logon()
+        self.assertEqual(calls, ['BAPI_XMI_LOGON', 'BAPI_XMI_LOGOFF', 'BAPI_XMI_LOGON'])
@@ -0,0 +1,48 @@
+from unittest import TestCase
+from datetime import datetime
+
+from systemcheck.systems.ABAP.utils import WINDOW_START, WINDOW_END, merge_time_windows, window_select_params, \
+    jobs_in_window, unique_jobs
+
+
+class TestJobSelection(TestCase):
+
+    def test_merge_time_windows(self):
+        windows = [(datetime(2017, 1, 10), datetime(2017, 1, 15)),
+                   (datetime(2017, 1, 1), datetime(2017, 1, 5)),
+                   (datetime(2017, 1, 14), datetime(2017, 1, 20)),
+                   (datetime(2017, 1, 5, 0, 0, 1), datetime(2017, 1, 6)),
+                   (datetime(2017, 1, 11), datetime(2017, 1, 12))]
+
+        self.assertEqual(merge_time_windows(windows),
+                         [(datetime(2017, 1, 1), datetime(2017, 1, 6)),
+                          (datetime(2017, 1, 10), datetime(2017, 1, 20))])
+
+    def test_merge_open_time_windows(self):
+        windows = [(datetime(2017, 1, 10), WINDOW_END),
+                   (datetime(2017, 1, 12), datetime(2017, 1, 15)),
+                   (datetime(2017, 2, 1), WINDOW_END),
+                   (WINDOW_START, datetime(2017, 1, 1))]
+
+        self.assertEqual(merge_time_windows(windows),
+                         [(WINDOW_START, datetime(2017, 1, 1)),
+                          (datetime(2017, 1, 10), WINDOW_END)])
+        self.assertEqual(merge_time_windows([(WINDOW_START, WINDOW_END), (WINDOW_START, WINDOW_END)]),
+                         [(WINDOW_START, WINDOW_END)])
+
+    def test_window_select_params(self):
+        self.assertEqual(window_select_params(datetime(2017, 1, 1, 8, 30), datetime(2017, 1, 2, 17, 0, 5)),
+                         dict(FROM_DATE='20170101', FROM_TIME='083000', TO_DATE='20170102', TO_TIME='170005'))
+        self.assertEqual(window_select_params(WINDOW_START, WINDOW_END), dict())
+
+    def test_jobs_in_window(self):
+        jobs = [dict(JOBNAME='A', JOBCOUNT='1', SDLSTRTDT='20170101', SDLSTRTTM='235959'),
+                dict(JOBNAME='B', JOBCOUNT='2', SDLSTRTDT='20170102', SDLSTRTTM='000000'),
+                dict(JOBNAME='C', JOBCOUNT='3', SDLSTRTDT='00000000', SDLSTRTTM='000000')]
+
+        selected = jobs_in_window(jobs, datetime(2017, 1, 2), datetime(2017, 1, 3))
+        self.assertEqual([job['JOBNAME'] for job in selected], ['B', 'C'])
+
+    def test_unique_jobs(self):
+        jobs = [dict(JOBNAME='A', JOBCOUNT='1'), dict(JOBNAME='A', JOBCOUNT='2'), dict(JOBNAME='A', JOBCOUNT='1')]
+        self.assertEqual(unique_jobs(jobs), jobs[:2])
@@ -0,0 +1,104 @@
+from unittest import TestCase
+from unittest.mock import patch
+import threading
+
+from systemcheck.systems.ABAP.utils import Connection, JobWaiter, wait_for_job
+from systemcheck.systems.ABAP.utils.job_wait import backoff_delay
+from systemcheck.utils import Result, Fail
+
+
+class JobConnection:
+    """ Fake connection that reports a sequence of job states """
+
+    XBP_EXT_USER = 'systemcheck'
+
+    def __init__(self, states):
+        self.states = dict(states)
+        self.checks = []
+        self.aborted = []
+        self.lock = threading.Lock()
+
+    def btc_xbp_job_status_get(self, jobname, jobcount):
+        with self.lock:
+            self.checks.append(jobname)
+            states = self.states[jobname]
+            status = states.pop(0) if len(states) > 1 else states[0]
+        return Result(data={'STATUS': status, 'RETURN': {'TYPE': 'S', 'MESSAGE': ''}})
+
+    def btc_xbp_generic_bapi_caller(self, bapi, **kwargs):
+        self.aborted.append((bapi, kwargs['JOBNAME']))
+        return Result(data={})
+
+
+class TestJobWait(TestCase):
+
+    def test_backoff_delay(self):
+        self.assertEqual([backoff_delay(attempt, 1, 8, jitter=0) for attempt in range(6)], [1, 2, 4, 8, 8, 8])
+        for counter in range(100):
+            self.assertTrue(0.8 <= backoff_delay(0, 1, 8, jitter=0.2) <= 1.2)
+
+    def test_wait_for_job(self):
+        connection = JobConnection({'JOB': ['S', 'R', 'R', 'F']})
+        result = wait_for_job(connection, 'JOB', '0001', timeout=5, initialInterval=0.001, maxInterval=0.002)
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['STATUS'], 'F')
+        self.assertEqual(len(connection.checks), 4)
+
+    def test_cancelled(self):
+        connection = JobConnection({'JOB': ['R', 'A']})
+        result = wait_for_job(connection, 'JOB', '0001', timeout=5, initialInterval=0.001)
+        self.assertIsInstance(result, Fail)
+        self.assertIn('cancelled', result.message)
+
+    def test_timeout(self):
+        connection = JobConnection({'JOB': ['R']})
+        result = wait_for_job(connection, 'JOB', '0001', timeout=0.05, initialInterval=0.01, maxInterval=0.01)
+        self.assertIsInstance(result, Fail)
+        self.assertEqual(connection.aborted, [('BAPI_XBP_JOB_ABORT', 'JOB')])
+
+    def test_jobWaiter(self):
+        first = JobConnection({'JOB1': ['R', 'R', 'F'], 'JOB2': ['R', 'A']})
+        second = JobConnection({'JOB3': ['R'], 'JOB4': ['F']})
+
+        waiter = JobWaiter(initialInterval=0.001, maxInterval=0.005)
+        try:
+            futures = [waiter.submit(first, 'JOB1', '0001', timeout=5),
+                       waiter.submit(first, 'JOB2', '0002', timeout=5),
+                       waiter.submit(second, 'JOB3', '0003', timeout=0.05, abortOnTimeout=False),
+                       waiter.submit(second, 'JOB4', '0004', timeout=5)]
+            results = [future.result(timeout=5) for future in futures]
+        finally:
+            waiter.stop()
+
+        self.assertEqual(results[0].data['STATUS'], 'F')
+        self.assertIsInstance(results[1], Fail)
+        self.assertIsInstance(results[2], Fail)
+        self.assertEqual(results[3].data['STATUS'], 'F')
+        self.assertEqual(second.aborted, [])
+        self.assertEqual(waiter.pending(), 0)
+
+    def test_stop(self):
+        connection = JobConnection({'JOB': ['R']})
+        waiter = JobWaiter(initialInterval=10, maxInterval=10)
+        future = waiter.submit(connection, 'JOB', '0001', timeout=60)
+        while not connection.checks:
+            threading.Event().wait(0.001)
+        waiter.stop()
+        self.assertIsInstance(future.result(timeout=1), Fail)
+
+    def test_delayUntilJobCompleted(self):
+        connection = JobConnection({'JOB': ['R', 'F']})
+        settings = dict(initialInterval=0.001, maxInterval=0.002, jitter=0)
+        with patch('systemcheck.systems.ABAP.utils.connection.job_wait_settings', lambda: settings):
+            result = Connection.btc_xbp_delay_until_job_completed(connection, 'JOB', '0001', maxDelay=5)
+        self.assertEqual(result.data['STATUS'], 'F')
+
+        # The intervals configured in settings.ini apply unless they are specified
+        waits = []
+        with patch('systemcheck.systems.ABAP.utils.connection.job_wait_settings', lambda: settings), \
+                patch('systemcheck.systems.ABAP.utils.connection.wait_for_job',
+                      lambda *args, **kwargs: waits.append(kwargs)):
+            Connection.btc_xbp_delay_until_job_completed(connection, 'JOB', '0001')
+            Connection.btc_xbp_delay_until_job_completed(connection, 'JOB', '0001', sleepTime=1, maxSleepTime=4)
+        self.assertEqual([(wait['initialInterval'], wait['maxInterval']) for wait in waits],
+                         [(0.001, 0.002), (1, 4)])
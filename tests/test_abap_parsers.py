@@ -0,0 +1,30 @@
+from unittest import TestCase
+from systemcheck.systems.ABAP.utils.parsers import parse_password_hash_spool, parse_profile_content
+
+
+class TestParsers(TestCase):
+
+    def test_parse_profile_content(self):
+        profileData = [{'PARNAME': 'login/min_password_lng', 'COMNR': '9990', 'PVALUE': '8', 'PFNAME': 'DEFAULT'},
+                       {'PARNAME': 'rdisp/TRACE_HIDE_SEC_DATA', 'COMNR': '9990', 'PVALUE': 'o', 'PFNAME': 'DEFAULT'},
+                       {'PARNAME': '', 'COMNR': '9991', 'PVALUE': 'n', 'PFNAME': 'DEFAULT'}]
+
+        result = parse_profile_content('DEFAULT', profileData)
+
+        self.assertEqual(result, [dict(PARNAME='login/min_password_lng', PVALUE='8', PFNAME='DEFAULT'),
+                                  dict(PARNAME='rdisp/TRACE_HIDE_SEC_DATA', PVALUE='on', PFNAME='DEFAULT')])
+        self.assertEqual(len(profileData), 3)
+
+    def test_parse_password_hash_spool(self):
+        spool = [{'': 'Checking table USR02 ...'},
+                 {'': '12 users with redundant hashes'},
+                 {'': 'Checking table USH02 ...'},
+                 {'': '3 history entries'},
+                 {'': 'Checking table USRPWDHISTORY ...'},
+                 {'': '0 entries'}]
+
+        result = parse_password_hash_spool(spool)
+
+        self.assertEqual(result, [['USR02', '12', ' users with redundant hashes'],
+                                  ['USH02', '3', ' history entries'],
+                                  ['USRPWDHISTORY', '0', ' entries']])
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from systemcheck.systems.ABAP.utils import ProfileCache, profile_modification_info
+
+
+class TestProfileCache(TestCase):
+
+    header = {'PFNAME': 'DEFAULT.PFL', 'TYPE': 'D', 'VERSNR': '000005', 'MODDATE': '20170115', 'MODTIME': '013552',
+              'MODUSER': 'BASIS'}
+
+    parameters = [dict(PARNAME='login/min_password_lng', PVALUE='8', PFNAME='DEFAULT.PFL')]
+
+    def test_modificationInfo(self):
+        self.assertEqual(profile_modification_info(self.header), ('000005', '20170115', '013552', 'BASIS'))
+        self.assertIsNone(profile_modification_info({'PFNAME': 'DEFAULT.PFL', 'TYPE': 'D'}))
+
+    def test_cache(self):
+        cache = ProfileCache()
+        info = profile_modification_info(self.header)
+        self.assertIsNone(cache.get(('E01', 1), 'DEFAULT.PFL', info))
+
+        cache.put(('E01', 1), 'DEFAULT.PFL', info, self.parameters)
+        self.assertEqual(cache.get(('E01', 1), 'DEFAULT.PFL', info), self.parameters)
+        self.assertIsNone(cache.get(('E02', 2), 'DEFAULT.PFL', info))
+
+        modified = profile_modification_info(dict(self.header, VERSNR='000006'))
+        self.assertIsNone(cache.get(('E01', 1), 'DEFAULT.PFL', modified))
+
+    def test_noModificationInfo(self):
+        cache = ProfileCache()
+        cache.put(('E01', 1), 'DEFAULT.PFL', None, self.parameters)
+        self.assertIsNone(cache.get(('E01', 1), 'DEFAULT.PFL', None))
@@ -0,0 +1,204 @@
+from unittest import TestCase
+from unittest.mock import patch
+import threading
+from systemcheck.systems.ABAP.utils import Connection, ConnectionPool
+from systemcheck.utils import ColumnarTable, Result
+
+
+class TestReadTable(TestCase):
+
+    def setUp(self):
+        self.conn = Connection()
+        self.conn.logon({}, mock=True)
+
+    def test_download_table(self):
+        result = self.conn.download_table('T000')
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['headers'], ['MANDT', 'MTEXT'])
+        self.assertEqual(result.data['data'], [{'MANDT': '000', 'MTEXT': 'SAP AG'},
+                                               {'MANDT': '100', 'MTEXT': 'Standard Client'}])
+
+    def test_download_table_columnar(self):
+        result = self.conn.download_table('T000', columnar=True)
+        self.assertIsInstance(result.data['data'], ColumnarTable)
+        self.assertEqual(result.data['data'].column('MANDT'), ['000', '100'])
+
+    def test_iter_table(self):
+        result = self.conn.iter_table('T000', batchsize=1)
+        self.assertEqual(list(result.data['rows']), [[{'MANDT': '000', 'MTEXT': 'SAP AG'}],
+                                                     [{'MANDT': '100', 'MTEXT': 'Standard Client'}]])
+
+    def test_fixed_width_parser(self):
+        fields = [{'FIELDNAME': 'A', 'LENGTH': '000003', 'OFFSET': '000000'},
+                  {'FIELDNAME': 'B', 'LENGTH': '000005', 'OFFSET': '000004'}]
+
+        parser = self.conn._read_table_row_parser(fields)
+        self.assertEqual(parser('001|a|b  '), ['001', 'a|b'])
+        self.assertEqual(parser(' 2 |c'), ['2', 'c'])
+        self.assertEqual(parser('003'), ['003', ''])
+
+        parser = self.conn._read_table_row_parser(fields[:1])
+        self.assertEqual(parser('001'), ['001'])
+
+
+class WideTableConnection:
+    """ Simulates RFC_READ_TABLE for a table with records larger than 512 characters """
+
+    widths = dict(MANDT=3, BNAME=12, TEXT1=300, TEXT2=300, FLAG=1)
+    keyFields = ['MANDT', 'BNAME']
+
+    def __init__(self, records, calls=None):
+        self.records = records
+        self.calls = calls if calls is not None else []
+
+    def call(self, fm, **kwargs):
+        self.calls.append((self, fm, tuple(item['FIELDNAME'] for item in kwargs.get('FIELDS', []))))
+        if fm == 'DDIF_FIELDINFO_GET':
+            return {'DFIES_TAB': [{'FIELDNAME': field, 'LENG': str(width), 'OUTPUTLEN': str(width),
+                                   'KEYFLAG': 'X' if field in self.keyFields else ''}
+                                  for field, width in self.widths.items()]}
+
+        fields = [item['FIELDNAME'] for item in kwargs.get('FIELDS', [])] or list(self.widths)
+        offset = 0
+        tableFields = []
+        for field in fields:
+            tableFields.append({'FIELDNAME': field, 'LENGTH': str(self.widths[field]), 'OFFSET': str(offset)})
+            offset += self.widths[field] + 1
+
+        if kwargs.get('NO_DATA'):
+            return {'DATA': [], 'FIELDS': tableFields}
+
+        assert offset - 1 <= 512
+        skip = kwargs['ROWSKIPS']
+        data = []
+        for record in self.records[skip:skip + kwargs['ROWCOUNT']]:
+            data.append({'WA': '|'.join(record[field].ljust(self.widths[field]) for field in fields)})
+        return {'DATA': data, 'FIELDS': tableFields}
+
+
+class TestWideTable(TestCase):
+
+    def setUp(self):
+        self.records = [dict(MANDT='001', BNAME='USER{}'.format(counter), TEXT1='A' * counter,
+                             TEXT2='B' * counter, FLAG='X') for counter in range(25)]
+        self.conn = Connection()
+        self.conn.logon({}, mock=True)
+        self.conn.conn = WideTableConnection(self.records)
+
+    def test_plan_column_groups(self):
+        result = self.conn._plan_column_groups(['MANDT', 'BNAME', 'TEXT1', 'TEXT2', 'FLAG'],
+                                               WideTableConnection.keyFields, WideTableConnection.widths)
+        self.assertEqual(result.data, [['MANDT', 'BNAME', 'TEXT1'], ['MANDT', 'BNAME', 'TEXT2', 'FLAG']])
+
+        result = self.conn._plan_column_groups(['TEXT1'], [], WideTableConnection.widths)
+        self.assertTrue(result.fail)
+
+    def test_download_wide_table(self):
+        result = self.conn.download_table('USR99', fetchsize=10)
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['data'], self.records)
+
+    def test_download_wide_table_fields(self):
+        result = self.conn.download_table('USR99', tab_fields=['BNAME', 'TEXT1', 'TEXT2'], fetchsize=10)
+        self.assertEqual(result.data['headers'], ['BNAME', 'TEXT1', 'TEXT2'])
+        self.assertEqual(result.data['data'][3], dict(BNAME='USER3', TEXT1='AAA', TEXT2='BBB'))
+
+    def test_download_wide_table_pooled(self):
+        calls = []
+        self.conn.logon(dict(ashost='abap001', sysnr='00', client='001', user='TEST'), mock=True)
+        self.conn.conn = WideTableConnection(self.records, calls)
+
+        def factory(logon_info):
+            connection = Connection()
+            connection.logon(logon_info, mock=True)
+            connection.conn = WideTableConnection(self.records, calls)
+            return Result(data=connection)
+
+        pool = ConnectionPool(maxSize=2, connectionFactory=factory)
+        with patch('systemcheck.systems.ABAP.utils.connection_pool._CONNECTION_POOL', pool):
+            result = self.conn.download_table('USR99', fetchsize=10)
+
+            self.assertEqual(result.data['data'], self.records)
+            groups = {fields: transport for transport, fm, fields in calls if fm == 'RFC_READ_TABLE' and fields}
+            self.assertEqual(len(groups), 2)
+            self.assertEqual(len(set(groups.values())), 2)
+
+            # The pooled connection was returned and is handed out again
+            result = pool.acquire(self.conn._logonInfo, timeout=0)
+            self.assertIn(result.data.conn, groups.values())
+            self.assertIsNot(result.data, self.conn)
+
+
+class PagedTableConnection:
+    """ Simulates RFC_READ_TABLE for a table with several pages of records """
+
+    widths = dict(MANDT=3, BNAME=12, NAME_TEXT=40)
+
+    def __init__(self, records):
+        self.records = records
+        self.pages = []
+
+    def call(self, fm, **kwargs):
+        fields = [item['FIELDNAME'] for item in kwargs.get('FIELDS', [])] or list(self.widths)
+        offset = 0
+        tableFields = []
+        for field in fields:
+            tableFields.append({'FIELDNAME': field, 'LENGTH': str(self.widths[field]), 'OFFSET': str(offset)})
+            offset += self.widths[field] + 1
+
+        if kwargs.get('NO_DATA'):
+            return {'DATA': [], 'FIELDS': tableFields}
+
+        skip = kwargs['ROWSKIPS']
+        self.pages.append((skip, tuple(fields)))
+        data = []
+        for record in self.records[skip:skip + kwargs['ROWCOUNT']]:
+            data.append({'WA': '|'.join(record[field].ljust(self.widths[field]) for field in fields)})
+        return {'DATA': data, 'FIELDS': tableFields}
+
+
+class TestPagedTable(TestCase):
+
+    def setUp(self):
+        self.records = [dict(MANDT='001', BNAME='USER{}'.format(counter), NAME_TEXT='User {}'.format(counter))
+                        for counter in range(25)]
+        self.conn = Connection()
+        self.conn.logon({}, mock=True)
+        self.transport = PagedTableConnection(self.records)
+        self.conn.conn = self.transport
+
+    def test_iter_table_pages(self):
+        result = self.conn.iter_table('USR02', fetchsize=10)
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['headers'], ['MANDT', 'BNAME', 'NAME_TEXT'])
+
+        # Two full pages and a short last page
+        self.assertEqual(list(result.data['rows']), self.records)
+        self.assertEqual([skip for skip, fields in self.transport.pages], [0, 10, 20])
+
+    def test_iter_table_batches(self):
+        result = self.conn.iter_table('USR02', fetchsize=10, batchsize=20, prefetch=False)
+        self.assertEqual([len(batch) for batch in result.data['rows']], [20, 5])
+
+    def test_iter_table_close(self):
+        threads = set(threading.enumerate())
+        rows = self.conn.iter_table('USR02', fetchsize=10).data['rows']
+        self.assertEqual(next(rows), self.records[0])
+
+        # Closing the generator waits for the prefetched second page, the third page is never requested
+        rows.close()
+        self.assertEqual([skip for skip, fields in self.transport.pages], [0, 10])
+        self.assertEqual(set(threading.enumerate()) - threads, set())
+
+    def test_count_table(self):
+        result = self.conn.count_table('USR02', fetchsize=10)
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data, 25)
+
+        # Only the narrowest field is requested, page by page
+        self.assertEqual(self.transport.pages, [(0, ('MANDT',)), (10, ('MANDT',)), (20, ('MANDT',))])
+
+    def test_count_table_full_pages(self):
+        self.transport.records = self.records[:20]
+        self.assertEqual(self.conn.count_table('USR02', fetchsize=10).data, 20)
+        self.assertEqual([skip for skip, fields in self.transport.pages], [0, 10, 20])
@@ -0,0 +1,155 @@
+from unittest import TestCase
+from decimal import Decimal
+import datetime
+import shutil
+import tempfile
+import time
+
+from systemcheck.systems.ABAP.utils import Connection, RecordingConnection, ReplayConnection, load_recording, \
+    recording_filename
+from systemcheck.exceptions import ReplayError
+
+
+class FakeRfcConnection:
+    """ Stands in for pyrfc.Connection """
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+
+    def call(self, fm, **params):
+        self.calls += 1
+        if fm == 'TH_GET_START_TIME2':
+            return {'UPTIME': '1157', 'START_TIME': '1484444152', 'TS_LOCALTIME': '20170115013552',
+                    'TS_GMTIME': '20170115013552'}
+        elif fm == 'RFC_READ_TABLE':
+            return {'DATA': [{'WA': '000SAP AG'}, {'WA': '100Standard Client'}],
+                    'FIELDS': [{'FIELDNAME': 'MANDT', 'LENGTH': '000003', 'OFFSET': '000000'},
+                               {'FIELDNAME': 'MTEXT', 'LENGTH': '000025', 'OFFSET': '000003'}],
+                    'OPTIONS': []}
+        elif fm == 'Z_TYPES':
+            return {'AMOUNT': Decimal('12.50'), 'DATE': datetime.date(2017, 1, 15), 'TIME': datetime.time(1, 35),
+                    'RAW': b'\x00\x01'}
+        raise RuntimeError('FU_NOT_FOUND')
+
+    def get_connection_attributes(self):
+        return {'sysId': 'E01', 'kernelRel': '745'}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTableConnection:
+    """ Stands in for pyrfc.Connection, RFC_READ_TABLE returns pages of USR02 """
+
+    def __init__(self, users):
+        self.users = users
+
+    def call(self, fm, **params):
+        fields = [{'FIELDNAME': 'BNAME', 'LENGTH': '000012', 'OFFSET': '000000'}]
+        if params.get('NO_DATA'):
+            return {'DATA': [], 'FIELDS': fields}
+
+        skip = params['ROWSKIPS']
+        return {'DATA': [{'WA': user} for user in self.users[skip:skip + params['ROWCOUNT']]], 'FIELDS': fields}
+
+    def close(self):
+        pass
+
+
+class TestRfcRecording(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = recording_filename(self.directory, dict(ashost='abap001', sysnr='00', client='001',
+                                                                user='TEST', passwd='secret'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self):
+        fake = FakeRfcConnection()
+        recorder = RecordingConnection(fake, self.filename)
+        recorder.call('TH_GET_START_TIME2')
+        recorder.call('RFC_READ_TABLE', QUERY_TABLE='T000', ROWSKIPS=0)
+        recorder.call('Z_TYPES')
+        recorder.get_connection_attributes()
+        with self.assertRaises(RuntimeError):
+            recorder.call('Z_MISSING')
+        recorder.close()
+        self.assertTrue(fake.closed)
+        return fake
+
+    def test_filename(self):
+        self.assertEqual(self.filename, recording_filename(self.directory, dict(ashost='abap001', sysnr='00',
+                                                                                client='001', user='TEST',
+                                                                                passwd='other')))
+
+    def test_roundtrip(self):
+        self.record()
+        self.assertEqual(len(load_recording(self.filename)), 5)
+
+        replay = ReplayConnection.fromFile(self.filename)
+        self.assertEqual(replay.call('Z_TYPES'), {'AMOUNT': Decimal('12.50'), 'DATE': datetime.date(2017, 1, 15),
+                                                  'TIME': datetime.time(1, 35), 'RAW': b'\x00\x01'})
+        self.assertEqual(replay.get_connection_attributes(), {'sysId': 'E01', 'kernelRel': '745'})
+
+        # Falls back to the replies of MockConnection
+        self.assertEqual(len(replay.call('TH_SERVER_LIST')['LIST']), 2)
+
+        with self.assertRaises(ReplayError):
+            replay.call('Z_MISSING')
+        with self.assertRaises(ReplayError):
+            replay.call('RFC_READ_TABLE', QUERY_TABLE='USR02', ROWSKIPS=0)
+
+        replay.strict = False
+        self.assertEqual(len(replay.call('RFC_READ_TABLE', QUERY_TABLE='USR02', ROWSKIPS=0)['DATA']), 2)
+
+    def test_scaleAndLatency(self):
+        self.record()
+        replay = ReplayConnection.fromFile(self.filename, scale=3, latency=0.02)
+
+        start = time.perf_counter()
+        response = replay.call('RFC_READ_TABLE', QUERY_TABLE='T000', ROWSKIPS=0)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+        self.assertEqual(len(response['DATA']), 6)
+        self.assertEqual(len(response['FIELDS']), 2)
+
+        response['DATA'].clear()
+        self.assertEqual(len(replay.call('RFC_READ_TABLE', QUERY_TABLE='T000', ROWSKIPS=0)['DATA']), 6)
+
+    def test_connection(self):
+        self.record()
+        connection = Connection()
+        connection.logon(dict(ashost='abap001'), mock=True)
+        connection.conn = ReplayConnection.fromFile(self.filename)
+
+        result = connection.systemtime
+        self.assertFalse(result.fail)
+        self.assertEqual(result.data['uptime'], 1157)
+
+        result = connection.call_fm('Z_MISSING')
+        self.assertTrue(result.fail)
+        self.assertIn('FU_NOT_FOUND', result.message)
+
+    def test_scaledTableDownload(self):
+        users = ['USER{:04d}'.format(counter) for counter in range(2500)]
+        connection = Connection()
+        connection.logon(dict(ashost='abap001'), mock=True)
+        connection.conn = RecordingConnection(FakeTableConnection(users), self.filename)
+        self.assertEqual(len(connection.download_table('USR02').data['data']), 2500)
+        connection.conn.close()
+
+        replay = ReplayConnection.fromFile(self.filename, scale=2)
+        connection.conn = replay
+        result = connection.download_table('USR02')
+        self.assertFalse(result.fail)
+        self.assertEqual([row['BNAME'] for row in result.data['data']], users + users)
+
+        page = replay.call('RFC_READ_TABLE', QUERY_TABLE='USR02', DELIMITER='|', ROWCOUNT=1000, ROWSKIPS=2000)
+        self.assertEqual([row['WA'] for row in page['DATA']], users[2000:] + users[:500])
+        self.assertEqual(len(page['FIELDS']), 1)
+
+        # Without scaling, the recorded pages are replayed as they are
+        connection.conn = ReplayConnection.fromFile(self.filename)
+        self.assertEqual(len(connection.download_table('USR02').data['data']), 2500)
@@ -0,0 +1,152 @@
+from unittest import TestCase
+from unittest.mock import patch
+from types import SimpleNamespace
+import threading
+
+from systemcheck.checks.models import CheckFailCriteriaOptions
+from systemcheck.systems.ABAP.plugins.actions.action_abap_runtime_parameter import ActionAbapRuntimeParameter
+from systemcheck.systems.ABAP.utils import Connection
+from systemcheck.utils import Result, Fail
+
+
+class InstanceConnection:
+    """ Stands in for pyrfc.Connection to a single application server """
+
+    def __init__(self, values):
+        self.values = values
+        self.parameters = []
+
+    def call(self, fm, **kwargs):
+        self.parameters.append(kwargs['PARAMETER_NAME'])
+        return {'RET': 0, 'PARAMETER_VALUE': self.values[kwargs['PARAMETER_NAME']]}
+
+    def close(self):
+        pass
+
+
+class SystemConnection:
+
+    def call_fm(self, fm, **kwargs):
+        return Result(data={'LIST_IPV6': [{'NAME': 'abap001_E01_00', 'HOSTADDR_V4_STR': '10.0.0.1'},
+                                          {'NAME': 'abap002_E01_01', 'HOSTADDR_V4_STR': '10.0.0.2'}]})
+
+
+class ServerConnection(InstanceConnection):
+    """ Stands in for pyrfc.Connection of the check, logged on to a single application server """
+
+    def call(self, fm, **kwargs):
+        if fm == 'TH_SERVER_LIST':
+            return SystemConnection().call_fm(fm).data
+        return super().call(fm, **kwargs)
+
+
+class TestActionAbapRuntimeParameter(TestCase):
+
+    values = {'10.0.0.1': {'login/min_password_lng': '8', 'rdisp/gui_auto_logout': '3600'},
+              '10.0.0.2': {'login/min_password_lng': '6', 'rdisp/gui_auto_logout': '3600'}}
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.logons = []
+        self.released = []
+        self.transports = {}
+
+        self.plugin = ActionAbapRuntimeParameter()
+        self.plugin.systemConnection = SystemConnection()
+        self.plugin.systemObject = SimpleNamespace(logon_info=lambda: dict(mshost='abapms', msserv='3601',
+                                                                           group='PUBLIC', client='001', user='TEST'))
+        parameterSets = [('Password Length', 'login/min_password_lng', '8'),
+                         ('Auto Logout', 'rdisp/gui_auto_logout', '3600'),
+                         ('Password Length Legacy', 'login/min_password_lng', '6')]
+        self.plugin.checkObject = SimpleNamespace(
+            failcriteria=CheckFailCriteriaOptions.FAIL_IF_ANY_FAILS,
+            params=[SimpleNamespace(param_set_name=name, parameter=parameter, operator='EQ', expected_value=expected)
+                    for name, parameter, expected in parameterSets])
+
+    def getPooledConnection(self, logon_info, timeout=None):
+        with self.lock:
+            self.logons.append((logon_info['ashost'], logon_info['sysnr']))
+        self.assertNotIn('mshost', logon_info)
+
+        connection = Connection()
+        connection.logon(logon_info, mock=True)
+        connection.conn = self.transports[logon_info['ashost']] = InstanceConnection(self.values[logon_info['ashost']])
+        return Result(data=connection)
+
+    def releaseConnection(self, connection, discard=False):
+        with self.lock:
+            self.released.append(connection._logonInfo['ashost'])
+
+    def test_execute(self):
+        with patch('systemcheck.systems.ABAP.utils.get_pooled_connection', self.getPooledConnection), \
+                patch('systemcheck.systems.ABAP.utils.release_connection', self.releaseConnection):
+            self.plugin.execute()
+
+        # One logon per instance for all parameter sets, every parameter is read once
+        self.assertEqual(sorted(self.logons), [('10.0.0.1', '00'), ('10.0.0.2', '01')])
+        self.assertEqual(sorted(self.released), ['10.0.0.1', '10.0.0.2'])
+        for transport in self.transports.values():
+            self.assertEqual(sorted(transport.parameters), ['login/min_password_lng', 'rdisp/gui_auto_logout'])
+
+        ratings = {(record['PARAMETERSET'], record['INSTANCE']): (record['CONFIGURED'], record['RATING'])
+                   for record in self.plugin.actionResult.result}
+        self.assertEqual(ratings, {('Password Length', 'abap001_E01_00'): ('8', 'pass'),
+                                   ('Password Length', 'abap002_E01_01'): ('6', 'fail'),
+                                   ('Auto Logout', 'abap001_E01_00'): ('3600', 'pass'),
+                                   ('Auto Logout', 'abap002_E01_01'): ('3600', 'pass'),
+                                   ('Password Length Legacy', 'abap001_E01_00'): ('8', 'fail'),
+                                   ('Password Length Legacy', 'abap002_E01_01'): ('6', 'pass')})
+        self.assertEqual(self.plugin.actionResult.rating, 'fail')
+
+    def test_logonFails(self):
+        def getPooledConnection(logon_info, timeout=None):
+            if logon_info['ashost'] == '10.0.0.2':
+                return Fail(message='logon failed')
+            return self.getPooledConnection(logon_info, timeout)
+
+        with patch('systemcheck.systems.ABAP.utils.get_pooled_connection', getPooledConnection), \
+                patch('systemcheck.systems.ABAP.utils.release_connection', self.releaseConnection):
+            self.plugin.execute()
+
+        ratings = {(record['PARAMETERSET'], record['INSTANCE']): record['RATING']
+                   for record in self.plugin.actionResult.result}
+        self.assertEqual(ratings[('Auto Logout', 'abap001_E01_00')], 'pass')
+        self.assertEqual(ratings[('Auto Logout', 'abap002_E01_01')], 'error')
+        self.assertEqual(self.released, ['10.0.0.1'])
+        self.assertEqual(self.plugin.actionResult.rating, 'error')
+
+    def test_connectedInstance(self):
+        # Without message server the logon data of every instance equals the logon data of the check
+        logonInfo = dict(ashost='10.0.0.1', sysnr='00', client='001', user='TEST')
+        self.plugin.systemObject = SimpleNamespace(logon_info=lambda: dict(logonInfo))
+        self.plugin.systemConnection = Connection()
+        self.plugin.systemConnection.logon(logonInfo, mock=True)
+        self.plugin.systemConnection.conn = transport = ServerConnection(self.values['10.0.0.1'])
+
+        with patch('systemcheck.systems.ABAP.utils.get_pooled_connection', self.getPooledConnection), \
+                patch('systemcheck.systems.ABAP.utils.release_connection', self.releaseConnection):
+            self.plugin.execute()
+
+        # No nested pooled connection, every parameter is read once over the connection of the check
+        self.assertEqual(self.logons, [])
+        self.assertEqual(self.released, [])
+        self.assertEqual(sorted(transport.parameters), ['login/min_password_lng', 'rdisp/gui_auto_logout'])
+
+        ratings = {(record['PARAMETERSET'], record['INSTANCE']): record['RATING']
+                   for record in self.plugin.actionResult.result}
+        self.assertEqual(ratings[('Password Length', 'abap002_E01_01')], 'pass')
+        self.assertEqual(ratings[('Password Length Legacy', 'abap001_E01_00')], 'fail')
+
+    def test_connectionTimeout(self):
+        timeouts = []
+
+        def getPooledConnection(logon_info, timeout=None):
+            timeouts.append(timeout)
+            return Fail(message='No connection available within {} seconds'.format(timeout))
+
+        with patch('systemcheck.systems.ABAP.utils.get_pooled_connection', getPooledConnection), \
+                patch('systemcheck.systems.ABAP.utils.release_connection', self.releaseConnection):
+            self.plugin.execute()
+
+        self.assertEqual(timeouts, [ActionAbapRuntimeParameter.CONNECTION_TIMEOUT] * 2)
+        self.assertEqual(self.plugin.actionResult.rating, 'error')
@@ -0,0 +1,70 @@
+from unittest import TestCase
+from systemcheck.plugins import ActionResult
+from systemcheck.systems.ABAP.plugins.actions.action_abap_rsusr002 import ActionAbapRsusr002
+from systemcheck.utils import ColumnarTable, Result
+
+
+class SuimParameters(dict):
+    """ Selection options as the SUIM plugins read them from the action result """
+
+    def get(self, key, default=None, raw=False):
+        return super().get(key, default)
+
+
+class SuimActionResult(ActionResult):
+
+    def __init__(self, parameters):
+        super().__init__()
+        self.parameters = SuimParameters(parameters)
+
+    def __getitem__(self, item):
+        return dict(Parameters=self.parameters)[item]
+
+
+class SuimConnection:
+    """ Simulates a system with SUSR_SUIM_API_RSUSR002 """
+
+    def __init__(self, users, messages=()):
+        self.users = users
+        self.messages = list(messages)
+        self.calls = []
+
+    def fm_interface(self, fm):
+        return Result(data={'PARAMS': [{'PARAMETER': 'IT_USER'}, {'PARAMETER': 'IV_USER_LOCK'}]})
+
+    def call_fm(self, fm, **kwargs):
+        self.calls.append((fm, kwargs))
+        return Result(data={'RETURN': self.messages, 'ET_USERS': self.users})
+
+
+class TestActionAbapRsusr002(TestCase):
+
+    def setUp(self):
+        self.plugin = ActionAbapRsusr002()
+        self.plugin.actionResult = SuimActionResult({'IT_USER': [{'SIGN': 'I', 'OPTION': 'CP', 'LOW': 'DDIC*'}],
+                                                     'IV_USER_LOCK': '', 'IT_UNKNOWN': []})
+
+    def test_execute(self):
+        users = [dict(BNAME='DDIC', USTYP='A'), dict(BNAME='DDIC2', USTYP='S')]
+        connection = SuimConnection(users)
+
+        result = self.plugin.execute(connection)
+        self.assertFalse(result.fail)
+        self.assertEqual(connection.calls, [('SUSR_SUIM_API_RSUSR002',
+                                             {'IT_USER': [{'SIGN': 'I', 'OPTION': 'CP', 'LOW': 'DDIC*'}],
+                                              'IV_USER_LOCK': ' '})])
+
+        table = result.data.result
+        self.assertIsInstance(table, ColumnarTable)
+        self.assertEqual(table.column('BNAME'), ['DDIC', 'DDIC2'])
+        self.assertEqual(table[1], users[1])
+        self.assertEqual(result.data.rating, 'fail')
+
+    def test_execute_without_users(self):
+        connection = SuimConnection([], messages=[dict(TYPE='W', MESSAGE='No users selected')])
+
+        result = self.plugin.execute(connection)
+        self.assertIsInstance(result.data.result, ColumnarTable)
+        self.assertEqual(len(result.data.result), 0)
+        self.assertEqual(result.data.rating, 'pass')
+        self.assertIn('Warning: No users selected', result.data.message)
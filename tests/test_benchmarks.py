@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from benchmarks.run import compare, measure, parameter_combinations, parameter_key
+
+
+class Sleeping:
+
+    params = [[1, 2], ['a']]
+    quick_params = [[1], ['a']]
+    param_names = ['count', 'name']
+
+    def setup(self, count, name):
+        self.count = count
+
+    def time_nothing(self, count, name):
+        pass
+
+
+class Skipped:
+
+    def setup(self):
+        raise NotImplementedError('not available')
+
+    def time_nothing(self):
+        pass
+
+
+class TestBenchmarkRunner(TestCase):
+
+    def test_parameters(self):
+        self.assertEqual(parameter_combinations(Sleeping), [(1, 'a'), (2, 'a')])
+        self.assertEqual(parameter_combinations(Sleeping, quick=True), [(1, 'a')])
+        self.assertEqual(parameter_combinations(Skipped), [()])
+        self.assertEqual(parameter_key(Sleeping, (1, 'a')), 'count=1,name=a')
+
+    def test_measure(self):
+        result = measure(Sleeping, 'time_nothing', (1, 'a'), repeat=3)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['repeat'], 3)
+        self.assertLessEqual(result['min'], result['median'])
+
+        self.assertEqual(measure(Skipped, 'time_nothing', (), repeat=3)['status'], 'skipped')
+
+    def test_compare(self):
+        baseline = dict(results={'bench.A.time_a': {'n=1': dict(status='ok', median=1.0),
+                                                    'n=2': dict(status='ok', median=1.0)}})
+        report = dict(results={'bench.A.time_a': {'n=1': dict(status='ok', median=1.1),
+                                                  'n=2': dict(status='ok', median=1.5),
+                                                  'n=3': dict(status='ok', median=9.0)}})
+
+        self.assertEqual(compare(report, baseline, threshold=0.2), [('bench.A.time_a', 'n=2', 1.0, 1.5)])
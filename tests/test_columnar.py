@@ -0,0 +1,50 @@
+from unittest import TestCase
+from systemcheck.utils import ColumnarTable
+
+
+class TestColumnarTable(TestCase):
+
+    def setUp(self):
+        self.rows = [{'MANDT': '000', 'MTEXT': 'SAP AG'},
+                     {'MANDT': '001', 'MTEXT': 'Auslieferungsmandant'},
+                     {'MANDT': '066', 'MTEXT': 'EarlyWatch'}]
+        self.table = ColumnarTable.fromRows(self.rows)
+
+    def test_fromRows(self):
+        self.assertEqual(self.table.headers, ('MANDT', 'MTEXT'))
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.column('MANDT'), ['000', '001', '066'])
+
+    def test_rowView(self):
+        row = self.table[1]
+        self.assertEqual(row['MTEXT'], 'Auslieferungsmandant')
+        self.assertEqual(row.get('MISSING'), None)
+        self.assertEqual(dict(row), self.rows[1])
+        self.assertEqual(self.table[-1], self.rows[-1])
+        with self.assertRaises(IndexError):
+            self.table[3]
+
+    def test_slicing(self):
+        view = self.table[1:]
+        self.assertEqual(len(view), 2)
+        self.assertEqual(view[0], self.rows[1])
+        self.assertEqual(view.column('MANDT'), ['001', '066'])
+        self.assertEqual(view[:1].toDicts(), [self.rows[1]])
+        self.assertEqual(self.table[::2].toDicts(), [self.rows[0], self.rows[2]])
+
+        with self.assertRaises(TypeError):
+            view.append(self.rows[0])
+
+    def test_append(self):
+        self.table.append(['100', 'Test'])
+        self.table.append({'MANDT': '200'})
+        self.assertEqual(self.table.column('MTEXT')[-2:], ['Test', None])
+        self.assertEqual(self.table, self.rows + [{'MANDT': '100', 'MTEXT': 'Test'}, {'MANDT': '200', 'MTEXT': None}])
+
+        with self.assertRaises(ValueError):
+            self.table.append(['300'])
+
+    def test_empty(self):
+        table = ColumnarTable.fromRows([])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.toDicts(), [])
@@ -0,0 +1,167 @@
+from unittest import TestCase
+
+from PyQt5 import QtCore
+from PyQt5.QtTest import QAbstractItemModelTester
+from sqlalchemy import create_engine, event
+
+from systemcheck import models
+from systemcheck.gui.models import GenericTreeModel
+from systemcheck.models.meta.base import scoped_session, sessionmaker, unit_of_work
+from systemcheck.systems.generic.models import GenericSystem, GenericSystemTreeNode
+
+
+class TestGenericTreeModel(TestCase):
+
+    FOLDERS = 20
+    SYSTEMS = 50
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        models.meta.base.Base.metadata.create_all(self.engine)
+        self.session = scoped_session(sessionmaker(bind=self.engine, expire_on_commit=False))
+
+        root = GenericSystemTreeNode(name='RootNode')
+        for folderNr in range(self.FOLDERS):
+            folder = GenericSystem(name='Folder {:02d}'.format(folderNr))
+            root.children.append(folder)
+            for systemNr in range(self.SYSTEMS if folderNr % 2 == 0 else 0):
+                folder.children.append(GenericSystem(name='S{:02d}{:02d}'.format(folderNr, systemNr)))
+        self.session.add(root)
+        self.session.commit()
+        self.session.remove()
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self.countStatement)
+
+    def tearDown(self):
+        event.remove(self.engine, 'before_cursor_execute', self.countStatement)
+        self.session.remove()
+
+    def countStatement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def rootNode(self):
+        return self.session.query(GenericSystemTreeNode).filter_by(parent_id=None).one()
+
+    def test_fetchMore(self):
+        rootnode = self.rootNode()
+        del self.statements[:]
+
+        model = GenericTreeModel(rootnode)
+        root = QtCore.QModelIndex()
+        self.assertEqual(model.rowCount(root), self.FOLDERS)
+
+        for row in range(self.FOLDERS):
+            folder = model.index(row, 0, root)
+            model.data(folder, QtCore.Qt.DisplayRole)
+            self.assertEqual(model.hasChildren(folder), row % 2 == 0)
+            self.assertEqual(model.rowCount(folder), 0)
+            model.parent(folder)
+
+        # One query for the folders and one for the number of their children
+        self.assertEqual(len(self.statements), 2)
+
+        folder = model.index(2, 0, root)
+        self.assertTrue(model.canFetchMore(folder))
+        model.fetchMore(folder)
+        self.assertFalse(model.canFetchMore(folder))
+        self.assertEqual(model.rowCount(folder), self.SYSTEMS)
+
+        system = model.index(self.SYSTEMS - 1, 0, folder)
+        self.assertEqual(model.data(system, QtCore.Qt.DisplayRole), 'S0249')
+        self.assertEqual(model.parent(system), folder)
+        self.assertFalse(model.hasChildren(system))
+        self.assertEqual(len(self.statements), 4)
+
+    def test_modelTester(self):
+        model = GenericTreeModel(self.rootNode())
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+        root = QtCore.QModelIndex()
+        for row in range(model.rowCount(root)):
+            folder = model.index(row, 0, root)
+            if model.canFetchMore(folder):
+                model.fetchMore(folder)
+        self.assertEqual(sum(model.rowCount(model.index(row, 0, root)) for row in range(self.FOLDERS)),
+                         self.FOLDERS // 2 * self.SYSTEMS)
+
+    def test_recursiveCheck(self):
+        model = GenericTreeModel(self.rootNode())
+        folder = model.index(4, 0, QtCore.QModelIndex())
+        model.setData(folder, QtCore.Qt.Checked, QtCore.Qt.CheckStateRole)
+
+        self.assertEqual(len(model.checkedNodes()), self.SYSTEMS + 1)
+
+    def test_row(self):
+        folder = self.rootNode().children[0]
+        systems = list(folder.children)
+        self.assertEqual([system._qt_row() for system in systems], list(range(self.SYSTEMS)))
+
+        folder.children.insert(0, GenericSystem(name='New'))
+        self.assertEqual(systems[10]._qt_row(), 11)
+        folder.children.remove(systems[0])
+        self.assertEqual(systems[10]._qt_row(), 10)
+        self.assertEqual(folder.children[0]._qt_row(), 0)
+
+    def test_insertRows(self):
+        commits = []
+        event.listen(self.session, 'after_commit', commits.append)
+
+        model = GenericTreeModel(self.rootNode(), treenode=GenericSystem)
+        folder = model.index(1, 0, QtCore.QModelIndex())
+        self.assertTrue(model.insertRows(0, 5, folder))
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(model.rowCount(folder), 5)
+
+        self.assertTrue(model.removeRows(1, 3, folder))
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(model.rowCount(folder), 2)
+
+    def test_sessionExpiry(self):
+        model = GenericTreeModel(self.rootNode(), treenode=GenericSystem)
+        root = QtCore.QModelIndex()
+        folder = model.index(2, 0, root)
+        model.fetchMore(folder)
+
+        # A failed unit of work rolls back the session, which expires the fetched nodes
+        with self.assertRaises(ValueError):
+            with unit_of_work(self.session):
+                model.getNode(folder)._qt_insert_child(0, GenericSystem(name='Rolled Back'))
+                raise ValueError
+
+        inserted = []
+        model.rowsAboutToBeInserted.connect(lambda *args: inserted.append(args))
+        self.assertFalse(model.canFetchMore(root))
+        self.assertFalse(model.canFetchMore(folder))
+        self.assertEqual(model.rowCount(root), self.FOLDERS)
+        self.assertEqual(model.rowCount(folder), self.SYSTEMS)
+        model.fetchMore(root)
+        self.assertEqual(inserted, [])
+
+        self.session.commit()
+        self.assertEqual(model.rowCount(folder), self.SYSTEMS)
+
+    def test_unitOfWork(self):
+        commits = []
+        event.listen(self.session, 'after_commit', commits.append)
+        folder = self.rootNode().children[1]
+
+        with unit_of_work(self.session):
+            with unit_of_work(self.session):
+                folder._qt_insert_child(0, GenericSystem(name='A'))
+            folder._qt_insert_child(1, GenericSystem(name='B'))
+            self.assertEqual(commits, [])
+        self.assertEqual(len(commits), 1)
+
+        with self.assertRaises(ValueError):
+            with unit_of_work(self.session):
+                folder._qt_insert_child(2, GenericSystem(name='C'))
+                raise ValueError
+        self.assertEqual(len(commits), 1)
+
+        self.session.expire_all()
+        self.assertEqual([system.name for system in self.rootNode().children[1].children], ['A', 'B'])
@@ -0,0 +1,76 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import create_engine
+
+from systemcheck.checks.models import Check
+from systemcheck.checks.utils import exportChecks, importChecks
+from systemcheck.models.meta import Base
+from systemcheck.models.meta.base import scoped_session, sessionmaker
+from systemcheck.systems.ABAP.models import ActionAbapFolder, ActionAbapCountTableEntries
+from systemcheck.utils import get_or_create
+
+
+def create_session(filename:str):
+    engine = create_engine('sqlite:///{}'.format(filename))
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+    get_or_create(session, Check, parent_id=None, name='RootNode')
+    session.commit()
+    return session
+
+
+class TestImportChecks(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.folder = os.path.join(self.directory, 'dump')
+        os.makedirs(self.folder)
+
+        source = create_session(os.path.join(self.directory, 'source.sqlite'))
+        folder = ActionAbapFolder(name='Folder', parent_node=source.query(Check).filter_by(parent_id=None).one())
+        for counter in range(3):
+            folder.children.append(ActionAbapCountTableEntries(name='Check {}'.format(counter)))
+        source.commit()
+        exportChecks(folder=self.folder, session=source)
+        source.remove()
+        source.bind.dispose()
+
+        self.session = create_session(os.path.join(self.directory, 'target.sqlite'))
+
+    def tearDown(self):
+        self.session.remove()
+        self.session.bind.dispose()
+        shutil.rmtree(self.directory)
+
+    def checkNames(self, session):
+        return sorted(check.name for check in session.query(ActionAbapCountTableEntries))
+
+    def test_import(self):
+        result = importChecks(path=self.folder, session=self.session)
+        self.assertFalse(result.fail)
+        self.assertEqual(len(result.data['successful']), 3)
+        self.assertEqual(result.data['failed'], {})
+        self.assertEqual(self.checkNames(self.session), ['Check 0', 'Check 1', 'Check 2'])
+
+    def test_failedFileIsRolledBack(self):
+        # The name of a check is unique per type, the import of Check 1 fails when it is flushed
+        rootnode = self.session.query(Check).filter_by(parent_id=None).one()
+        rootnode.children.append(ActionAbapCountTableEntries(name='Check 1'))
+        self.session.commit()
+
+        result = importChecks(path=self.folder, session=self.session)
+        self.assertFalse(result.fail)
+        self.assertEqual(result.message, 'Some imports failed!')
+        self.assertEqual(list(result.data['failed']), ['ActionAbapCountTableEntries_Check_1.yaml'])
+        self.assertEqual(sorted(result.data['successful']), ['ActionAbapCountTableEntries_Check_0.yaml',
+                                                             'ActionAbapCountTableEntries_Check_2.yaml'])
+
+        # The other files were committed, the folder was created once
+        self.session.remove()
+        self.assertEqual(self.checkNames(self.session), ['Check 0', 'Check 1', 'Check 2'])
+        self.assertEqual(self.session.query(ActionAbapFolder).filter_by(name='Folder').count(), 1)
+        imported = self.session.query(ActionAbapFolder).filter_by(name='Folder').one()
+        self.assertEqual(sorted(check.name for check in imported.children), ['Check 0', 'Check 2'])
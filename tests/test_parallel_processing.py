@@ -0,0 +1,89 @@
+from unittest import TestCase
+from collections import namedtuple, Counter
+import threading
+import time
+
+from PyQt5 import QtCore
+
+from systemcheck.gui.parallel_processing import CheckExecutionEngine
+
+Task = namedtuple('Task', 'system check')
+
+
+class TestCheckExecutionEngine(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def setUp(self):
+        self.results = []
+        self.failures = []
+
+    def runEngine(self, engine, tasks, func):
+        engine.resultReady.connect(lambda task, result: self.results.append((task, result)))
+        engine.taskFailed.connect(lambda task, message: self.failures.append((task, message)))
+        loop = QtCore.QEventLoop()
+        engine.finished.connect(loop.quit)
+        engine.run(tasks, func)
+        if engine.isRunning():
+            loop.exec_()
+        engine.shutdown()
+
+    def test_run(self):
+        tasks = [Task(system=system, check=check) for system in 'AB' for check in range(4)]
+        engine = CheckExecutionEngine(maxWorkers=3, maxTasksPerSystem=2)
+
+        self.runEngine(engine, tasks, lambda task: task.check * 2)
+
+        self.assertEqual(len(self.results), 8)
+        self.assertEqual(self.failures, [])
+        for task, result in self.results:
+            self.assertEqual(result, task.check * 2)
+
+    def test_maxTasksPerSystem(self):
+        tasks = [Task(system=system, check=check) for system in 'AB' for check in range(4)]
+        engine = CheckExecutionEngine(maxWorkers=4, maxTasksPerSystem=1)
+        lock = threading.Lock()
+        active = Counter()
+        peak = Counter()
+
+        def func(task):
+            with lock:
+                active[task.system] += 1
+                peak[task.system] = max(peak[task.system], active[task.system])
+            time.sleep(0.02)
+            with lock:
+                active[task.system] -= 1
+
+        self.runEngine(engine, tasks, func)
+
+        self.assertEqual(peak['A'], 1)
+        self.assertEqual(peak['B'], 1)
+
+    def test_exception(self):
+        def func(task):
+            raise ValueError('check failed')
+
+        engine = CheckExecutionEngine()
+        self.runEngine(engine, [Task(system='A', check=1)], func)
+
+        self.assertEqual(self.results, [])
+        self.assertEqual(self.failures, [(Task(system='A', check=1), 'check failed')])
+
+    def test_timeout(self):
+        engine = CheckExecutionEngine(taskTimeout=0.1)
+        self.runEngine(engine, [Task(system='A', check=1)], lambda task: time.sleep(0.5))
+
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.failures), 1)
+
+    def test_stop(self):
+        tasks = [Task(system='A', check=check) for check in range(10)]
+        engine = CheckExecutionEngine(maxWorkers=1)
+        engine.resultReady.connect(lambda task, result: engine.stop())
+
+        self.runEngine(engine, tasks, lambda task: task.check)
+
+        self.assertEqual(len(self.results), 1)
+        self.assertFalse(engine.isRunning())
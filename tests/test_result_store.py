@@ -0,0 +1,159 @@
+from unittest import TestCase
+from collections import OrderedDict
+import os
+import shutil
+import tempfile
+import threading
+
+from PyQt5 import QtCore
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from systemcheck.plugins import ActionResult
+from systemcheck.results import ResultHandler, ResultStore
+from systemcheck.utils import ColumnarTable
+
+
+def actionResult(checkName, systeminfo, rating='pass', rows=2):
+    result = ActionResult()
+    result.rating = rating
+    result.resultDefinition = OrderedDict(RATING='Rating', TABLE='Table', COUNT='Count')
+    for row in range(rows):
+        result.addResult(dict(RATING=rating, TABLE='T{:03d}'.format(row), COUNT=row))
+    result.checkName = checkName
+    result.systeminfo = systeminfo
+    return result
+
+
+class TestResultStore(TestCase):
+
+    def setUp(self):
+        self.store = ResultStore(pageSize=10)
+
+    def test_roundtrip(self):
+        runId = self.store.startRun('weekly')
+        original = actionResult('Check A', 'E01, Client 000', rows=25)
+        columnar = actionResult('Check B', 'E01, Client 000', rows=0)
+        columnar.result = ColumnarTable(['TABLE', 'RATING'], [['T000', 'USR02'], ['pass', 'fail']])
+        error = actionResult('Check A', 'E02, Client 000', rating='error', rows=0)
+        error.errorMessage = 'Logon failed'
+
+        resultIds = self.store.addResults(runId, [original, columnar, error])
+        self.assertEqual(self.store.runs()[0]['results'], 3)
+
+        loaded = self.store.loadResult(resultIds[0])
+        self.assertEqual(loaded.checkName, 'Check A')
+        self.assertEqual(list(loaded.resultDefinition.items()), list(original.resultDefinition.items()))
+        self.assertEqual(len(loaded.result), 25)
+        self.assertEqual(loaded.result[23], dict(RATING='pass', TABLE='T023', COUNT=23))
+        self.assertEqual(loaded.result[-1], original.result[-1])
+        self.assertEqual(list(loaded.result), original.result)
+
+        loaded = self.store.loadResult(resultIds[1])
+        self.assertEqual(loaded.result[1], dict(RATING='fail', TABLE='USR02', COUNT=None))
+        self.assertEqual(self.store.loadResult(resultIds[2]).errorMessage, 'Logon failed')
+
+    def test_queries(self):
+        runId = self.store.startRun()
+        otherRun = self.store.startRun()
+        self.store.addResults(runId, [actionResult('Check A', 'E01, Client 000'),
+                                      actionResult('Check A', 'E02, Client 000', rating='fail'),
+                                      actionResult('Check B', 'E01, Client 000')])
+        self.store.addResults(otherRun, [actionResult('Check C', 'E01, Client 000')])
+
+        self.assertEqual(self.store.groups(runId, 'rating'), [('pass', 2), ('fail', 1)])
+        self.assertEqual(self.store.groups(runId, 'checkName', dict(rating='pass')), [('Check A', 1), ('Check B', 1)])
+        results = self.store.results(runId, dict(rating='pass', checkName='Check B'))
+        self.assertEqual([result['system'] for result in results], ['E01, Client 000'])
+
+        self.store.deleteRun(runId)
+        self.assertEqual([run['id'] for run in self.store.runs()], [otherRun])
+        self.assertEqual(self.store.groups(runId, 'rating'), [])
+
+    def test_fromConfig(self):
+        self.assertIsNone(ResultStore.fromConfig({'enable': 'false'}))
+
+        directory = tempfile.mkdtemp()
+        try:
+            store = ResultStore.fromConfig({'enable': 'true',
+                                            'sqlalchemy.url': 'sqlite:///{dbpath}',
+                                            'dbname': os.path.join(directory, 'results.sqlite'),
+                                            'sqlite.journal_mode': 'WAL',
+                                            'sqlite.busy_timeout': '5000',
+                                            'page_size': '10'})
+            self.assertEqual(store.pageSize, 10)
+            store.addResults(store.startRun(), [actionResult('Check A', 'E01, Client 000')])
+
+            # The worker thread that stores results and the GUI thread get connections of their own
+            with store.engine.connect() as connection:
+                self.assertEqual(connection.execute('PRAGMA journal_mode').scalar(), 'wal')
+                self.assertEqual(connection.execute('PRAGMA busy_timeout').scalar(), 5000)
+            thread = threading.Thread(target=lambda: store.addResults(store.startRun(), []))
+            thread.start()
+            thread.join()
+            self.assertEqual(len(store.runs()), 2)
+            store.engine.dispose()
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestStoredResultTreeModel(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def test_lazyTree(self):
+        handler = ResultHandler(batchInterval=0, store=ResultStore())
+        for system in range(5):
+            handler.addResult(actionResult('Check A', 'E{:02d}, Client 000'.format(system)))
+        handler.addResult(actionResult('Check B', 'E01, Client 000', rating='fail'))
+
+        model = handler.buildStoredTreeModel(handler.runId)
+        model.fetchSize = 2
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+        root = QtCore.QModelIndex()
+        self.assertTrue(model.hasChildren(root))
+        while model.canFetchMore(root):
+            model.fetchMore(root)
+        self.assertEqual(model.rowCount(root), 2)
+
+        index = model.findIndexByName('Check A', model.findIndexByName('pass', root))
+        while model.canFetchMore(index):
+            model.fetchMore(index)
+        self.assertEqual(model.rowCount(index), 5)
+
+        node = model.index(3, 0, index).internalPointer()
+        self.assertEqual(node.name, 'E03, Client 000')
+        self.assertEqual(len(node.resultObject.result), 2)
+
+        handler.newRun()
+        handler.addResult(actionResult('Check A', 'E01, Client 000'))
+        handler.waitForStore()
+        self.assertEqual(len(handler.store.runs()), 2)
+
+    def test_storeInBackground(self):
+        threads = []
+
+        class RecordingStore(ResultStore):
+
+            def addResults(self, runId, resultObjects):
+                threads.append(threading.current_thread())
+                return super().addResults(runId, resultObjects)
+
+        handler = ResultHandler(batchInterval=0, store=RecordingStore())
+        stored = []
+        handler.resultsStored_signal.connect(stored.append)
+
+        handler.addResult(actionResult('Check A', 'E01, Client 000'))
+        handler.newRun()
+        handler.addResult(actionResult('Check B', 'E01, Client 000'))
+        handler.waitForStore()
+        self.app.processEvents()
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+        runs = [run['id'] for run in reversed(handler.store.runs())]
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(stored, runs)
+        self.assertEqual(handler.runId, runs[1])
@@ -0,0 +1,89 @@
+from unittest import TestCase
+from collections import OrderedDict
+
+from PyQt5 import QtCore
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from systemcheck.plugins import ActionResult
+from systemcheck.results import ResultStore
+from systemcheck.results.result_handler import ResultTableModel, arrange_rows
+from systemcheck.utils import ColumnarTable
+
+
+USERS = [dict(BNAME='USER{:03d}'.format(number), USTYP='A' if number % 3 else 'S', LOCKED=number % 2 == 0 or None)
+         for number in range(25)]
+
+
+def userResult(rows):
+    result = ActionResult()
+    result.resultDefinition = OrderedDict(BNAME='User', USTYP='Type', LOCKED='Locked')
+    result.result = rows
+    return result
+
+
+class TestArrangeRows(TestCase):
+
+    def test_arrange(self):
+        columns = ['BNAME', 'USTYP', 'LOCKED']
+        table = ColumnarTable.fromRows(USERS)
+
+        for rows in (USERS, table):
+            self.assertEqual(arrange_rows(rows, columns), list(range(25)))
+            self.assertEqual(arrange_rows(rows, columns, filterText='user01'), list(range(10, 20)))
+            self.assertEqual(arrange_rows(rows, columns, filterText='s', filterColumn='USTYP'),
+                             [0, 3, 6, 9, 12, 15, 18, 21, 24])
+
+            # stable, descending keeps the order of equal values, None last
+            order = arrange_rows(rows, columns, sortColumn='USTYP', descending=True)
+            self.assertEqual(order[:3], [0, 3, 6])
+            self.assertEqual(arrange_rows(rows, columns, sortColumn='LOCKED')[-1], 23)
+
+
+class TestResultTableModel(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def waitForArrangement(self, model):
+        loop = QtCore.QEventLoop()
+        model.arranged.connect(loop.quit)
+        QtCore.QTimer.singleShot(5000, loop.quit)
+        if model.isArranging():
+            loop.exec_()
+
+    def test_fetchMore(self):
+        model = ResultTableModel(userResult(USERS), fetchSize=10)
+
+        root = QtCore.QModelIndex()
+        self.assertEqual(model.rowCount(root), 10)
+        model.fetchMore(root)
+        self.assertEqual(model.rowCount(root), 20)
+
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        model.fetchMore(root)
+        self.assertFalse(model.canFetchMore(root))
+        self.assertEqual(model.rowCount(root), 25)
+        self.assertEqual(model.headerData(1, QtCore.Qt.Horizontal, QtCore.Qt.DisplayRole), 'Type')
+
+    def test_sortStoredResult(self):
+        store = ResultStore(pageSize=4)
+        resultId = store.addResults(store.startRun(), [userResult(USERS)])[0]
+        model = ResultTableModel(store.loadResult(resultId), fetchSize=10)
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+        model.sort(0, QtCore.Qt.DescendingOrder)
+        self.waitForArrangement(model)
+        self.assertEqual(model.rowCount(), 10)
+        self.assertEqual(model.data(model.index(0, 0), QtCore.Qt.DisplayRole), 'USER024')
+        self.assertEqual(model.value(9, 0), 'USER015')
+
+        model.setFilter('S', column=1)
+        self.waitForArrangement(model)
+        self.assertEqual(model.rowCount(), 9)
+        self.assertEqual(model.value(0, 0), 'USER024')
+
+        model.setFilter('')
+        model.sort(-1)
+        self.assertFalse(model.isArranging())
+        self.assertEqual(model.value(0, 0), 'USER000')
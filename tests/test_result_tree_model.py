@@ -0,0 +1,147 @@
+from unittest import TestCase
+from collections import OrderedDict
+
+from PyQt5 import QtCore
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from systemcheck.plugins import ActionResult
+from systemcheck.results.result_handler import Node, ResultHandler, ResultTreeModel
+
+
+def actionResult(checkName, systeminfo, rating='pass'):
+    result = ActionResult()
+    result.rating = rating
+    result.resultDefinition = OrderedDict(RATING='Rating', TABLE='Table')
+    result.addResult(dict(RATING=rating, TABLE='T000'))
+    result.checkName = checkName
+    result.systeminfo = systeminfo
+    return result
+
+
+class TestNode(TestCase):
+
+    def test_childIndex(self):
+        root = Node('RootNode')
+        children = [Node(name, root) for name in 'ABC']
+
+        self.assertIs(root.childByName('B'), children[1])
+        self.assertEqual([child.row() for child in children], [0, 1, 2])
+
+        root.insertChild(0, Node('D'))
+        self.assertEqual([child.row() for child in children], [1, 2, 3])
+
+        root.removeChild(2)
+        self.assertIsNone(root.childByName('B'))
+        self.assertEqual(children[2].row(), 2)
+
+        children[2].name = 'E'
+        self.assertIsNone(root.childByName('C'))
+        self.assertIs(root.childByName('E'), children[2])
+
+
+class TestResultTreeModel(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def setUp(self):
+        self.model = ResultTreeModel(header=['Results Overview'], groupBy=['rating', 'checkName', 'systeminfo'])
+        self.tester = QAbstractItemModelTester(self.model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        self.inserted = []
+        self.model.rowsInserted.connect(
+            lambda parent, first, last: self.inserted.append((self.model.data(parent, QtCore.Qt.DisplayRole),
+                                                              first, last)))
+
+    def test_insertResult(self):
+        self.assertTrue(self.model.insertResult(actionResult('Check A', 'E01, Client 000')))
+        self.assertTrue(self.model.insertResult(actionResult('Check A', 'E01, Client 100')))
+        self.assertTrue(self.model.insertResult(actionResult('Check B', 'E01, Client 000')))
+        self.assertTrue(self.model.insertResult(actionResult('Check A', 'E02, Client 000', rating='fail')))
+
+        # New branches are announced once, at the topmost node that already existed
+        self.assertEqual(self.inserted, [(None, 0, 0), ('Check A', 1, 1), ('pass', 1, 1), (None, 1, 1)])
+
+        index = self.model.findIndexByName('pass', QtCore.QModelIndex())
+        index = self.model.findIndexByName('Check A', index)
+        index = self.model.findIndexByName('E01, Client 100', index)
+        self.assertEqual(index.row(), 1)
+        self.assertEqual(self.model.data(index, QtCore.Qt.DisplayRole), 'E01, Client 100')
+        self.assertEqual(self.model.parent(index).row(), 0)
+
+    def test_errorResult(self):
+        result = actionResult('Check A', 'E01, Client 000', rating='error')
+        result.errorMessage = 'Logon failed'
+        self.model.insertResult(result)
+
+        index = self.model.findIndexByName('error', QtCore.QModelIndex())
+        index = self.model.findIndexByName('Check A', index)
+        self.assertIsNotNone(self.model.findIndexByName('E01, Client 000 (Logon failed)', index))
+
+    def test_insertResults(self):
+        self.model.insertResult(actionResult('Check A', 'E01, Client 000'))
+        self.inserted.clear()
+
+        results = [actionResult('Check A', 'E01, Client 100'),
+                   actionResult('Check A', 'E02, Client 000'),
+                   actionResult('Check B', 'E01, Client 000'),
+                   actionResult('Check A', 'E01, Client 000', rating='fail'),
+                   actionResult('Check B', 'E01, Client 000', rating='fail')]
+
+        self.assertEqual(self.model.insertResults(results), 5)
+
+        # One insert per parent that already was part of the model
+        self.assertEqual(self.inserted, [('Check A', 1, 2), ('pass', 1, 1), (None, 1, 1)])
+
+        index = self.model.findIndexByName('fail', QtCore.QModelIndex())
+        self.assertEqual(self.model.rowCount(index), 2)
+        index = self.model.findIndexByName('Check B', index)
+        self.assertIsNotNone(self.model.findIndexByName('E01, Client 000', index))
+
+
+class TestResultHandler(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def test_batchSize(self):
+        handler = ResultHandler(batchInterval=10000, batchSize=3)
+        model = handler.buildTreeModel()
+        batches = []
+        handler.resultsAdded_signal.connect(batches.append)
+
+        for system in range(7):
+            handler.addResult(actionResult('Check A', 'E{:02d}, Client 000'.format(system)))
+
+        self.assertEqual([len(batch) for batch in batches], [3, 3])
+        self.assertEqual(handler.pendingCount(), 1)
+
+        handler.flush()
+        self.assertEqual(handler.pendingCount(), 0)
+        index = model.findIndexByName('pass', QtCore.QModelIndex())
+        self.assertEqual(model.rowCount(model.findIndexByName('Check A', index)), 7)
+
+    def test_batchInterval(self):
+        handler = ResultHandler(batchInterval=20, batchSize=100)
+        added = []
+        handler.resultAdded_signal.connect(added.append)
+
+        handler.addResult(actionResult('Check A', 'E01, Client 000'))
+        handler.addResult(actionResult('Check A', 'E02, Client 000'))
+        self.assertEqual(added, [])
+
+        loop = QtCore.QEventLoop()
+        handler.resultsAdded_signal.connect(lambda results: loop.quit())
+        QtCore.QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+        self.assertEqual(len(added), 2)
+
+    def test_unbatched(self):
+        handler = ResultHandler(batchInterval=0)
+        added = []
+        handler.resultAdded_signal.connect(added.append)
+
+        handler.resultAdd_signal.emit(actionResult('Check A', 'E01, Client 000'))
+        self.assertEqual(len(added), 1)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import text
+
+from systemcheck.session import create_engine_from_config, sqlite_pragmas
+
+
+class TestSqliteEngine(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dbconfig = {'sqlalchemy.url': 'sqlite:///{}'.format(os.path.join(self.directory, 'systems.sqlite')),
+                         'sqlalchemy.pool_size': '2',
+                         'sqlite.journal_mode': 'WAL',
+                         'sqlite.synchronous': 'NORMAL',
+                         'sqlite.busy_timeout': '100',
+                         'sqlite.cache_size': '-4000'}
+        self.engine = create_engine_from_config(self.dbconfig)
+        self.engine.execute('CREATE TABLE system (name VARCHAR(10))')
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_sqlite_pragmas(self):
+        self.assertEqual(sqlite_pragmas(self.dbconfig), ['PRAGMA busy_timeout=100', 'PRAGMA journal_mode=WAL',
+                                                         'PRAGMA synchronous=NORMAL', 'PRAGMA cache_size=-4000'])
+        self.assertEqual(sqlite_pragmas({'sqlite.mmap_size': ''}), [])
+
+    def test_pragmas(self):
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute('PRAGMA journal_mode').scalar(), 'wal')
+            self.assertEqual(connection.execute('PRAGMA synchronous').scalar(), 1)
+            self.assertEqual(connection.execute('PRAGMA cache_size').scalar(), -4000)
+
+    def test_readerDoesNotBlockWriter(self):
+        reader = self.engine.connect()
+        reader.execute('BEGIN')
+        self.assertEqual(reader.execute('SELECT count(*) FROM system').scalar(), 0)
+
+        # The reader still has its transaction open, the writer commits nevertheless
+        with self.engine.begin() as writer:
+            writer.execute(text('INSERT INTO system (name) VALUES (:name)'), name='E01')
+
+        self.assertEqual(reader.execute('SELECT count(*) FROM system').scalar(), 0)
+        reader.execute('COMMIT')
+        reader.close()
+
+        # Pooled connections are used by worker threads as well
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            counts = list(executor.map(lambda _: self.engine.execute('SELECT count(*) FROM system').scalar(),
+                                       range(4)))
+        self.assertEqual(counts, [1, 1, 1, 1])
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event
+
+from systemcheck import models
+from systemcheck.checks.models import CheckFailCriteriaOptions
+from systemcheck.models.meta import Snapshot, snapshot
+from systemcheck.models.meta.base import scoped_session, sessionmaker
+from systemcheck.systems.ABAP.models import SystemAbap, SystemAbapClient, ActionAbapCountTableEntries, \
+    ActionAbapCountTableEntries__params
+
+from benchmarks.common import use_memory_keyring
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        use_memory_keyring()
+        self.engine = create_engine('sqlite://')
+        models.meta.base.Base.metadata.create_all(self.engine)
+        self.session = scoped_session(sessionmaker(bind=self.engine))
+
+        system = SystemAbap(sid='E01', name='E01', tier='Dev', rail='N', enabled=True, use_snc=False,
+                            default_client='100', as_hostname='e01.example.com', as_sysnr='00')
+        system.children.append(SystemAbapClient(client='100', username='CHECK', password='secret', use_sso=False))
+        check = ActionAbapCountTableEntries(name='Count T000', description='Clients')
+        check.failcriteria = CheckFailCriteriaOptions.FAIL_IF_ANY_FAILS
+        for table in ('T000', 'USR02'):
+            check.params.append(ActionAbapCountTableEntries__params(param_set_name=table, table_name=table,
+                                                                    expected_count=0, operator='GE'))
+        self.session.add_all([system, check])
+        self.session.commit()
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self.countStatement)
+
+    def tearDown(self):
+        event.remove(self.engine, 'before_cursor_execute', self.countStatement)
+        self.session.remove()
+
+    def countStatement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_snapshot(self):
+        client = self.session.query(SystemAbapClient).one()
+        check = self.session.query(ActionAbapCountTableEntries).one()
+        systemSnapshot = snapshot(client)
+        checkSnapshot = snapshot(check)
+        self.session.expire_all()
+        del self.statements[:]
+
+        def read(_):
+            return (systemSnapshot.logon_info()['ashost'], systemSnapshot.parent_node.sid, systemSnapshot.client,
+                    checkSnapshot.name, checkSnapshot.failcriteria,
+                    [parameterSet.table_name for parameterSet in checkSnapshot.params])
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            values = list(executor.map(read, range(2)))
+
+        self.assertEqual(values[0], ('e01.example.com', 'E01', '100', 'Count T000',
+                                     CheckFailCriteriaOptions.FAIL_IF_ANY_FAILS, ['T000', 'USR02']))
+        self.assertEqual(values[0], values[1])
+        self.assertEqual(self.statements, [])
+
+    def test_immutable(self):
+        systemSnapshot = snapshot(self.session.query(SystemAbapClient).one())
+        self.assertIsInstance(systemSnapshot, Snapshot)
+        self.assertIs(snapshot(systemSnapshot), systemSnapshot)
+
+        with self.assertRaises(AttributeError):
+            systemSnapshot.client = '000'
+        with self.assertRaises(AttributeError):
+            systemSnapshot.children
+
+        systemSnapshot.logon_info()['client'] = '000'
+        self.assertEqual(systemSnapshot.logon_info()['client'], '100')